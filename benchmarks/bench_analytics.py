@@ -0,0 +1,56 @@
+# benchmarks/bench_analytics.py
+"""Benchmark statystyk: czysty Python kontra NumPy.
+
+Dla każdego rozmiaru mierzone są: python_stats na liście WorkEntry,
+numpy_stats na tej samej liście oraz numpy_stats na kolumnach EntryStore.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.bench_analytics [rozmiar ...]
+"""
+from datetime import date, timedelta
+import sys
+import time
+from models.entry import WorkEntry
+from services.entry_store import EntryStore
+from services import analytics
+from utils.lazy_import import optional_import
+
+SIZES = (10_000, 1_000_000, 10_000_000)
+
+
+def make_entries(n):
+    """Generuje n wpisów; napisy pochodzą z puli, by oszczędzić pamięć."""
+    first = date(2015, 1, 1)
+    dates = [(first + timedelta(days=d)).isoformat() for d in range(3650)]
+    starts = [f"{h:02d}:{m:02d}" for h in range(6, 11) for m in (0, 30)]
+    ends = [f"{h:02d}:{m:02d}" for h in range(13, 20) for m in (0, 15)]
+    return [WorkEntry(dates[i % 3650], starts[i % 10], ends[i % 14])
+            for i in range(n)]
+
+
+def timed(func, *args):
+    t0 = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - t0
+
+
+def main(sizes=SIZES):
+    numpy_ok = optional_import("numpy") is not None
+    if not numpy_ok:
+        print("NumPy niedostępny - mierzony jest tylko wariant Pythona.")
+    print(f"{'wpisy':>10}{'python':>10}{'numpy':>10}{'numpy+store':>13}")
+    for n in sizes:
+        entries = make_entries(n)
+        py = timed(analytics.python_stats, entries)
+        row = f"{n:>10}{py:>9.2f}s"
+        if numpy_ok:
+            np_list = timed(analytics.numpy_stats, entries)
+            store = EntryStore(entries)
+            np_store = timed(analytics.numpy_stats, store)
+            row += f"{np_list:>9.2f}s{np_store:>12.3f}s"
+        print(row)
+        del entries
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or SIZES)
@@ -0,0 +1,123 @@
+# benchmarks/bench_api.py
+"""Test obciążeniowy serwera HTTP API (services/api_server.py).
+
+Uruchamia serwer w osobnym procesie na danych testowych, a następnie
+wiele współbieżnych klientów (połączenia keep-alive) wysyła mieszankę
+żądań: wyszukiwanie po dacie, statystyki i dodawanie wpisów. Wypisuje
+percentyle p50/p99 opóźnień oraz liczbę żądań na sekundę.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.bench_api [klienci] [żądania_na_klienta]
+"""
+import asyncio
+from datetime import date, timedelta
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.bench_analytics import make_entries
+from services.data_manager import DataManager
+
+ENTRIES = 100_000
+# Udział rodzajów żądań w mieszance (suma = 1)
+MIX = (("search", 0.7), ("analyze", 0.1), ("add", 0.2))
+
+
+async def request(reader, writer, method, path, body=None):
+    """Wysyła żądanie HTTP/1.1 i zwraca (kod, treść JSON)."""
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+def pick(rng):
+    """Losuje rodzaj żądania zgodnie z MIX."""
+    x = rng.random()
+    for kind, share in MIX:
+        if x < share:
+            return kind
+        x -= share
+    return MIX[-1][0]
+
+
+async def client(host, port, count, seed, latencies):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    for i in range(count):
+        kind = pick(rng)
+        day = f"20{rng.randint(15, 21)}-{rng.randint(1, 12):02d}-" \
+              f"{rng.randint(1, 28):02d}"
+        t0 = time.perf_counter()
+        if kind == "search":
+            status, _ = await request(reader, writer, "GET",
+                                      f"/entries?date={day}")
+        elif kind == "analyze":
+            status, _ = await request(reader, writer, "GET", "/analyze")
+        else:
+            # Każde dodanie w innym dniu (po danych testowych), bo wpisy
+            # nachodzące na istniejące są odrzucane (409)
+            free = date(2030, 1, 1) + timedelta(days=seed * count + i)
+            status, _ = await request(reader, writer, "POST", "/entries", {
+                "date": free.isoformat(), "start": "08:00", "end": "16:00"})
+        latencies[kind].append(time.perf_counter() - t0)
+        if status >= 400:
+            raise RuntimeError(f"Błąd serwera: {status}")
+    writer.close()
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def load(host, port, clients, per_client):
+    latencies = {kind: [] for kind, _ in MIX}
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(host, port, per_client, seed, latencies)
+                           for seed in range(clients)))
+    return time.perf_counter() - t0, latencies
+
+
+def main(clients=50, per_client=200):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "log.json")
+        source = DataManager(path)
+        source.entries = make_entries(ENTRIES)
+        source.save()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "services.api_server", "--port", "0",
+             "--data", path], stdout=subprocess.PIPE, text=True)
+        try:
+            address = json.loads(server.stdout.readline())
+            elapsed, latencies = asyncio.run(load(
+                address["host"], address["port"], clients, per_client))
+        finally:
+            server.terminate()
+            server.wait()
+    total = sum(len(v) for v in latencies.values())
+    print(f"Wpisy: {ENTRIES}, klienci: {clients}, żądania: {total}")
+    print(f"Przepustowość: {total / elapsed:.0f} żądań/s")
+    print(f"{'rodzaj':<10}{'liczba':>8}{'p50':>10}{'p99':>10}")
+    everything = [x for v in latencies.values() for x in v]
+    for kind, values in list(latencies.items()) + [("razem", everything)]:
+        print(f"{kind:<10}{len(values):>8}"
+              f"{percentile(values, 50) * 1000:>8.2f}ms"
+              f"{percentile(values, 99) * 1000:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
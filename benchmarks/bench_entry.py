@@ -0,0 +1,72 @@
+# benchmarks/bench_entry.py
+"""Mikrobenchmark WorkEntry.duration().
+
+Porównuje dawną wersję (strptime przy każdym wywołaniu) z wersją
+korzystającą z minut wyliczonych przy tworzeniu obiektu.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.bench_entry [liczba_wpisów]
+"""
+from datetime import datetime
+import sys
+import time
+import tracemalloc
+from models.entry import WorkEntry
+
+
+class LegacyWorkEntry:
+    """Dawna implementacja wpisu (bez __slots__ i pamięci podręcznej)."""
+
+    def __init__(self, date, start, end):
+        self.date = date
+        self.start = start
+        self.end = end
+
+    def duration(self):
+        fmt = "%H:%M"
+        tdelta = datetime.strptime(
+            self.end, fmt) - datetime.strptime(self.start, fmt)
+        return tdelta.total_seconds() / 3600
+
+
+def make_rows(n):
+    """Generuje n przykładowych krotek (data, start, koniec)."""
+    return [(f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+             f"{i % 10 + 6:02d}:{i % 4 * 15:02d}",
+             f"{i % 6 + 16:02d}:{i % 2 * 30:02d}") for i in range(n)]
+
+
+def measure(cls, rows, passes=3):
+    """Zwraca (czas tworzenia, czas `passes` przebiegów duration, pamięć)."""
+    # Pamięć mierzona osobno - tracemalloc spowalnia samo tworzenie
+    tracemalloc.start()
+    entries = [cls(*row) for row in rows]
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del entries
+    t0 = time.perf_counter()
+    entries = [cls(*row) for row in rows]
+    build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(passes):
+        for e in entries:
+            e.duration()
+    return build, time.perf_counter() - t0, memory
+
+
+def main(n=1_000_000):
+    rows = make_rows(n)
+    print(f"Liczba wpisów: {n}, 3 przebiegi duration()")
+    print(f"{'wersja':<10}{'tworzenie':>12}{'duration':>12}{'pamięć':>12}")
+    results = {}
+    for name, cls in (("dawna", LegacyWorkEntry), ("nowa", WorkEntry)):
+        build, calls, memory = measure(cls, rows)
+        results[name] = calls
+        print(f"{name:<10}{build:>11.2f}s{calls:>11.2f}s"
+              f"{memory / 2 ** 20:>10.1f}MB")
+    print(f"Przyspieszenie duration(): "
+          f"{results['dawna'] / results['nowa']:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,77 @@
+# benchmarks/bench_load.py
+"""Benchmark wczytywania dużego dziennika pracy.
+
+Porównuje pełne wczytanie pliku (json.load + lista WorkEntry) z trybem
+leniwym, w którym analiza czyta plik strumieniowo. Każdy wariant
+uruchamiany jest w osobnym procesie, aby zmierzyć szczytowe RSS.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.bench_load [liczba_wpisów]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = {
+    "pełne (.json)": ("json", False),
+    "leniwe (.json)": ("json", True),
+    "leniwe (.jsonl)": ("jsonl", True),
+}
+
+
+def generate(directory, n):
+    """Tworzy pliki .json i .jsonl z n wpisami; zwraca ścieżki."""
+    paths = {"json": os.path.join(directory, "log.json"),
+             "jsonl": os.path.join(directory, "log.jsonl")}
+    with open(paths["json"], "w") as fj, open(paths["jsonl"], "w") as fl:
+        fj.write("[\n")
+        for i in range(n):
+            record = {"date": f"20{i % 20 + 10}-{i % 12 + 1:02d}-"
+                              f"{i % 28 + 1:02d}",
+                      "start": f"{i % 4 + 7:02d}:00",
+                      "end": f"{i % 5 + 14:02d}:30"}
+            line = json.dumps(record)
+            fj.write(("    " if i == 0 else ",\n    ") + line)
+            fl.write(line + "\n")
+        fj.write("\n]")
+    return paths
+
+
+def run_mode(path, lazy):
+    """Mierzy wariant w bieżącym procesie i wypisuje wynik jako JSON."""
+    from services.data_manager import DataManager
+    t0 = time.perf_counter()
+    manager = DataManager(path, lazy=lazy)
+    startup = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    total = sum(e.duration() for e in manager.iter_entries())
+    analysis = time.perf_counter() - t0
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"startup": startup, "analysis": analysis,
+                      "peak_mb": peak_kb / 1024, "total": total}))
+
+
+def main(n=5_000_000):
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Generowanie {n} wpisów...")
+        paths = generate(directory, n)
+        print(f"{'tryb':<18}{'start':>10}{'analiza':>10}{'RSS':>10}")
+        for name, (fmt, lazy) in MODES.items():
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_load", "--run",
+                 paths[fmt], str(int(lazy))],
+                capture_output=True, text=True, check=True).stdout
+            r = json.loads(out.splitlines()[-1])
+            print(f"{name:<18}{r['startup']:>9.2f}s{r['analysis']:>9.2f}s"
+                  f"{r['peak_mb']:>8.0f}MB")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--run":
+        run_mode(sys.argv[2], bool(int(sys.argv[3])))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000)
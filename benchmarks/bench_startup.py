@@ -0,0 +1,90 @@
+# benchmarks/bench_startup.py
+"""Benchmark czasu startu aplikacji.
+
+Pokazuje rozbicie czasu importu modułów (python -X importtime) oraz
+czas od uruchomienia `python main.py` do wyświetlenia menu głównego
+(mediana z kilku uruchomień, dla porównania także pusty interpreter).
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.bench_startup [liczba_uruchomień]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Ostatnia pozycja menu - po niej aplikacja czeka na wybór opcji
+MENU_END = "0. Wyjście"
+TOP = 15
+
+
+def import_times(module="main"):
+    """Zwraca listę (moduł, własny czas, łączny czas) w mikrosekundach."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((name.rstrip(), int(self_us), int(cumulative)))
+    return rows
+
+
+def time_to_menu():
+    """Mierzy czas od uruchomienia main.py do wyświetlenia menu.
+
+    Zgłasza RuntimeError, gdy menu się nie pojawiło lub program
+    zakończył się błędem (np. uruchomiony z innego katalogu).
+    """
+    env = dict(os.environ, PYTHONUNBUFFERED="1", PYTHONIOENCODING="utf-8")
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "main.py"], env=env,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            text=True, encoding="utf-8")
+    shown = False
+    for line in proc.stdout:
+        if MENU_END in line:
+            shown = True
+            break
+    elapsed = time.perf_counter() - t0
+    proc.communicate("0\n" if shown else None)
+    if not shown:
+        raise RuntimeError("Menu się nie pojawiło "
+                           f"(kod wyjścia {proc.returncode})")
+    if proc.returncode != 0:
+        raise RuntimeError(f"main.py zakończył się kodem {proc.returncode}")
+    return elapsed
+
+
+def time_empty():
+    """Czas uruchomienia pustego interpretera (punkt odniesienia)."""
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return time.perf_counter() - t0
+
+
+def main(runs=5):
+    rows = import_times()
+    total = sum(self_us for _, self_us, _ in rows)
+    print(f"Import main: {total / 1000:.1f}ms, modułów: {len(rows)}")
+    print(f"\n{'moduł':<44}{'własny':>10}{'łącznie':>10}")
+    for name, self_us, cumulative in sorted(
+            rows, key=lambda r: r[2], reverse=True)[:TOP]:
+        print(f"{name[:44]:<44}{self_us / 1000:>8.1f}ms"
+              f"{cumulative / 1000:>8.1f}ms")
+    packages = {name.strip().split(".")[0] for name, _, _ in rows}
+    heavy = sorted(packages & {"numpy", "matplotlib", "sqlite3"})
+    if heavy:
+        print(f"\n❌ Przy starcie ładowane są: {', '.join(heavy)}")
+
+    menu = statistics.median(time_to_menu() for _ in range(runs))
+    empty = statistics.median(time_empty() for _ in range(runs))
+    print(f"\nCzas do wyświetlenia menu: {menu * 1000:.1f}ms "
+          f"(pusty interpreter: {empty * 1000:.1f}ms, mediana z {runs})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
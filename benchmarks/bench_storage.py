@@ -0,0 +1,58 @@
+# benchmarks/bench_storage.py
+"""Benchmark magazynów: plik JSON kontra SQLite.
+
+Mierzy czas otwarcia (wczytania) danych oraz opóźnienie typowych
+zapytań: wpisy z miesiąca, filtr czasu trwania (opcja 10 menu) i sumy
+miesięczne. Dla JSON pierwsze zapytanie o daty buduje indeks.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.bench_storage [liczba_wpisów]
+"""
+import os
+import sys
+import tempfile
+import time
+from benchmarks.bench_analytics import make_entries
+from services.data_manager import DataManager
+from services.storage import migrate_json_to_sqlite
+
+
+def timed(func, *args):
+    t0 = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - t0, result
+
+
+def scenario(path):
+    """Zwraca słownik czasów dla magazynu wybranego po rozszerzeniu."""
+    results = {}
+    results["otwarcie"], manager = timed(DataManager, path)
+    results["miesiąc (1.)"], _ = timed(manager.find_month, "2020-03")
+    results["miesiąc (2.)"], _ = timed(manager.find_month, "2021-07")
+    results["filtr >= 12h"], _ = timed(manager.filter_min_hours, 12)
+    results["sumy"], agg = timed(manager.aggregates)
+    results["sumy miesięcy"], _ = timed(agg.monthly_hours)
+    if manager.storage is not None:
+        manager.storage.close()
+    return results
+
+
+def main(n=500_000):
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "log.json")
+        db_path = os.path.join(directory, "log.db")
+        source = DataManager(json_path)
+        source.entries = make_entries(n)
+        source.save()
+        migrate_seconds, _ = timed(migrate_json_to_sqlite, json_path, db_path)
+        print(f"Wpisy: {n}, migracja JSON -> SQLite: {migrate_seconds:.2f}s")
+        json_times = scenario(json_path)
+        sqlite_times = scenario(db_path)
+        print(f"{'operacja':<16}{'JSON':>10}{'SQLite':>10}")
+        for name in json_times:
+            print(f"{name:<16}{json_times[name] * 1000:>8.1f}ms"
+                  f"{sqlite_times[name] * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
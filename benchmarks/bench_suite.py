@@ -0,0 +1,206 @@
+# benchmarks/bench_suite.py
+"""Zestaw benchmarków głównych ścieżek aplikacji.
+
+Dla każdego rozmiaru generowany jest syntetyczny zbiór (generator.py,
+zapis do JSON i CSV w katalogu tymczasowym), a następnie mierzone są
+scenariusze: wczytanie i zapis DataManagera, analyze i plot Analyzera,
+import i eksport CSV, recursive_sum, filter_entries oraz budowa drzewa
+podsumowań okresów (rollup). Czas to najlepszy i medianowy z `--repeat`
+przebiegów (bez przygotowania scenariusza); szczyt pamięci mierzy
+tracemalloc w osobnym przebiegu (do rozmiaru `--memory-max`, bo
+śledzenie wielokrotnie spowalnia kod).
+
+Wyniki trafiają do pliku JSON; `--compare` porównuje je z wcześniejszym
+plikiem i kończy program kodem 1, gdy któryś scenariusz zwolnił
+o więcej niż `--tolerance`.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.bench_suite [--sizes 1000 100000 1000000
+        10000000] [--only SCENARIUSZ ...] [--output PLIK]
+        [--compare PLIK]
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from benchmarks.generator import generate_entries, write_csv, write_json
+from main import (export_to_csv, filter_entries, import_from_csv,
+                  recursive_sum)
+from services.analyzer import Analyzer
+from services.data_manager import DataManager
+from services.rollups import Rollup
+from utils.lazy_import import optional_import
+
+SIZES = (1_000, 100_000)
+MEMORY_MAX = 1_000_000
+OUTPUT = "bench_results.json"
+TOLERANCE = 0.2
+# Krótsze czasy bazowe (w sekundach) są zbyt zaszumione do porównań
+MIN_TIME = 0.001
+
+
+# Scenariusz to para funkcji: przygotowanie(dane) zwraca argumenty
+# mierzonej funkcji; przygotowanie nie wlicza się do pomiaru.
+
+def _data(data):
+    return (data["entries"],)
+
+
+def _load(path):
+    return len(DataManager(path).entries)
+
+
+def _save_setup(data):
+    manager = DataManager(os.path.join(data["dir"], "save.json"))
+    manager.entries = data["entries"]
+    return (manager,)
+
+
+def _import_setup(data):
+    path = os.path.join(data["dir"], "import.json")
+    if os.path.exists(path):
+        os.remove(path)
+    return DataManager(path), data["csv"]
+
+
+def _plot(entries, path):
+    return Analyzer().plot(entries, path, headless=True)
+
+
+SCENARIOS = {
+    "data.load": (lambda data: (data["json"],), _load),
+    "data.save": (_save_setup, lambda manager: manager.save()),
+    "analyzer.analyze": (_data, lambda entries: Analyzer().analyze(entries)),
+    "analyzer.plot": (lambda data: (data["entries"],
+                                    os.path.join(data["dir"], "plot.png")),
+                      _plot),
+    "csv.import": (_import_setup, import_from_csv),
+    "csv.export": (lambda data: (data["entries"],
+                                 os.path.join(data["dir"], "export.csv")),
+                   export_to_csv),
+    "recursive_sum": (_data, recursive_sum),
+    "filter_entries": (_data, lambda entries: filter_entries(
+        entries, lambda e: e.duration() >= 4)),
+    "rollup": (_data, lambda entries: Rollup.from_entries(entries).table(
+        "biweek")),
+}
+
+
+def measure(setup, run, data, repeat, memory):
+    """Mierzy scenariusz; zwraca (czasy przebiegów, szczyt MB lub None).
+
+    Komunikaty mierzonych funkcji są wyciszane.
+    """
+    times, peak = [], None
+    with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+        for _ in range(repeat):
+            args = setup(data)
+            t0 = time.perf_counter()
+            run(*args)
+            times.append(time.perf_counter() - t0)
+        if memory:
+            args = setup(data)
+            tracemalloc.start()
+            try:
+                run(*args)
+                peak = tracemalloc.get_traced_memory()[1] / 2**20
+            finally:
+                tracemalloc.stop()
+    return times, peak
+
+
+def run_suite(sizes, names, repeat=3, memory_max=MEMORY_MAX, **options):
+    """Uruchamia scenariusze `names` dla każdego rozmiaru; zwraca listę
+    wyników (słowników). `options` trafiają do generate_entries."""
+    results = []
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            print(f"\nGenerowanie {n} wpisów...")
+            data = {"dir": directory,
+                    "json": os.path.join(directory, "log.json"),
+                    "csv": os.path.join(directory, "log.csv")}
+            write_json(generate_entries(n, **options), data["json"])
+            write_csv(generate_entries(n, **options), data["csv"])
+            data["entries"] = list(generate_entries(n, **options))
+            for name in names:
+                setup, run = SCENARIOS[name]
+                times, peak = measure(setup, run, data, repeat,
+                                      n <= memory_max)
+                result = {"scenario": name, "entries": n,
+                          "best": min(times),
+                          "median": statistics.median(times),
+                          "peak_mb": peak}
+                results.append(result)
+                memory = "-" if peak is None else f"{peak:.1f}"
+                print(f"{name:<18}{n:>10}{result['best']:>10.3f}s"
+                      f"{result['median']:>10.3f}s{memory:>10}")
+            del data
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Porównuje najlepsze czasy z wynikami bazowymi; zwraca listę
+    regresji (scenariusz, rozmiar, stosunek czasów)."""
+    old = {(r["scenario"], r["entries"]): r["best"]
+           for r in baseline["results"]}
+    slower = []
+    for r in results:
+        before = old.get((r["scenario"], r["entries"]))
+        if before and before >= MIN_TIME \
+                and r["best"] > before * (1 + tolerance):
+            slower.append((r["scenario"], r["entries"], r["best"] / before))
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmarki głównych ścieżek aplikacji")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--only", nargs="+", choices=SCENARIOS,
+                        default=list(SCENARIOS), metavar="SCENARIUSZ")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--memory-max", type=int, default=MEMORY_MAX,
+                        help="największy rozmiar z pomiarem tracemalloc")
+    parser.add_argument("--projects", type=int, default=5)
+    parser.add_argument("--overlap", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=OUTPUT)
+    parser.add_argument("--compare", metavar="PLIK",
+                        help="wcześniejszy plik wyników do porównania")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args(argv)
+    names = args.only
+    if "analyzer.plot" in names and optional_import("matplotlib") is None:
+        print("matplotlib niedostępny - pomijam scenariusz analyzer.plot.")
+        names = [name for name in names if name != "analyzer.plot"]
+    print(f"{'scenariusz':<18}{'wpisy':>10}{'najlepszy':>11}"
+          f"{'mediana':>11}{'pamięć MB':>10}")
+    results = run_suite(args.sizes, names, args.repeat, args.memory_max,
+                        projects=args.projects, overlap=args.overlap,
+                        seed=args.seed)
+    report = {"created": datetime.now().isoformat(timespec="seconds"),
+              "python": platform.python_version(),
+              "platform": platform.platform(),
+              "repeat": args.repeat, "results": results}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"\nWyniki zapisano do pliku {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            slower = compare(results, json.load(f), args.tolerance)
+        for name, n, ratio in slower:
+            print(f"❌ {name} ({n} wpisów): {ratio:.2f}x wolniej")
+        if slower:
+            return 1
+        print("✅ Brak regresji względem pliku bazowego.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,87 @@
+# benchmarks/bench_validators.py
+"""Porównanie walidacji dat i godzin: strptime, szybki parser, pamięć
+podręczna i walidacja całych kolumn.
+
+Kolumny przypominają import CSV: wiele wierszy, niewiele różnych wartości
+(daty z 10 lat, godziny co 15 minut). Wypisuje czas na wiersz.
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.bench_validators [liczba_wierszy]
+"""
+from datetime import date, datetime, timedelta
+import random
+import sys
+import time
+from utils import validators
+
+ROWS = 1_000_000
+
+
+def strptime_date(date_str):
+    """Walidacja daty jak przed wprowadzeniem szybkiego parsera."""
+    try:
+        datetime.strptime(date_str, "%Y-%m-%d")
+        return True
+    except ValueError:
+        return False
+
+
+def strptime_time(time_str):
+    try:
+        datetime.strptime(time_str, "%H:%M")
+        return True
+    except ValueError:
+        return False
+
+
+def make_columns(n, seed=1):
+    """Kolumny dat i godzin z ~1% błędnych wartości."""
+    rng = random.Random(seed)
+    first = date(2015, 1, 1)
+    dates = [(first + timedelta(days=d)).isoformat() for d in range(3650)]
+    times = [f"{h:02d}:{m:02d}" for h in range(24) for m in (0, 15, 30, 45)]
+    bad_dates, bad_times = ["2023-02-29", "2024-13-01"], ["24:00", "8:60"]
+    date_col = [rng.choice(bad_dates if rng.random() < 0.01 else dates)
+                for _ in range(n)]
+    time_col = [rng.choice(bad_times if rng.random() < 0.01 else times)
+                for _ in range(n)]
+    return date_col, time_col
+
+
+def timed(func, column):
+    t0 = time.perf_counter()
+    result = func(column)
+    return time.perf_counter() - t0, result
+
+
+def main(n=ROWS):
+    date_col, time_col = make_columns(n)
+    to_ordinal, to_minutes = validators.date_to_ordinal, \
+        validators.time_to_minutes
+    variants = [
+        ("strptime", lambda c: [strptime_date(s) for s in c],
+         lambda c: [strptime_time(s) for s in c]),
+        # Szybki parser bez pamięci podręcznej
+        ("szybki parser", lambda c: [to_ordinal(s) is not None for s in c],
+         lambda c: [to_minutes(s) is not None for s in c]),
+        ("validate_* (cache)",
+         lambda c: list(map(validators.validate_date, c)),
+         lambda c: list(map(validators.validate_time, c))),
+        ("kolumny", validators.validate_dates, validators.validate_times),
+    ]
+    print(f"Wiersze: {n}")
+    print(f"{'wariant':<20}{'daty':>14}{'godziny':>14}")
+    expected = None
+    for name, dates_func, times_func in variants:
+        t_dates, r_dates = timed(dates_func, date_col)
+        t_times, r_times = timed(times_func, time_col)
+        if expected is None:
+            expected = (r_dates, r_times)
+        elif (r_dates, r_times) != expected:
+            raise RuntimeError(f"Wariant {name} daje inne wyniki")
+        print(f"{name:<20}{t_dates / n * 1e9:>11.0f} ns"
+              f"{t_times / n * 1e9:>11.0f} ns")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,139 @@
+# benchmarks/generator.py
+"""Generator syntetycznych danych o czasie pracy.
+
+Tworzy powtarzalny (zależny tylko od ziarna) zbiór wpisów: zadana liczba
+wpisów rozłożona na kolejne dni, opcjonalne projekty i zadany udział
+wpisów nachodzących na poprzedni wpis. Wpisy mają id 1..n i zapisywane
+są w bieżących formatach aplikacji: JSON (jak DataManager, także .jsonl)
+i CSV (jak eksport).
+
+Uruchomienie (z katalogu głównego projektu):
+    python -m benchmarks.generator liczba_wpisów [--json PLIK]
+        [--csv PLIK] [--start RRRR-MM-DD] [--days DNI] [--projects N]
+        [--overlap UDZIAŁ] [--seed ZIARNO]
+"""
+import argparse
+import json
+import random
+from datetime import date
+from models.entry import make_entry
+from services.exporter import export_csv
+
+START = "2020-01-01"
+# Domyślna liczba wpisów na dzień (gdy nie podano liczby dni)
+PER_DAY = 8
+# Najwięcej wpisów na dzień: przedziały co najmniej 30-minutowe
+MAX_PER_DAY = 48
+# Najdłuższy przedział na jeden wpis (w minutach)
+MAX_SLOT = 480
+PROJECTS = 5
+# Godziny co 15 minut - napisy z puli oszczędzają pamięć
+TIMES = [f"{m // 60:02d}:{m % 60:02d}" for m in range(0, 1440, 15)]
+
+
+def generate_entries(n, start=START, days=None, projects=PROJECTS,
+                     overlap=0.0, seed=0):
+    """Generator n wpisów (z id 1..n) rozłożonych na `days` dni.
+
+    Każdy dzień dzielony jest na równe przedziały, po jednym na wpis,
+    więc wpisy się nie nakładają. Z prawdopodobieństwem `overlap` wpis
+    zamiast własnego przedziału zaczyna się w połowie poprzedniego
+    wpisu (może wtedy przejść przez północ). `projects` = 0 oznacza
+    wpisy bez projektu. Wpisy powstają leniwie, więc zapis nawet
+    dziesiątek milionów wpisów nie wymaga listy w pamięci.
+    """
+    if not 0 <= overlap <= 1:
+        raise ValueError("Udział nakładających się wpisów musi być z "
+                         "przedziału 0-1")
+    if days is None:
+        days = max(1, -(-n // PER_DAY))
+    per_day = max(1, -(-n // days))
+    if per_day > MAX_PER_DAY:
+        raise ValueError(f"Za mało dni: najwyżej {MAX_PER_DAY} wpisów "
+                         f"na dzień")
+    rng = random.Random(seed)
+    names = [f"Projekt-{k + 1:02d}" for k in range(projects)]
+    slot = min(MAX_SLOT, 1440 // per_day) // 15 * 15
+    # Przedziały dnia wyśrodkowane (np. jeden wpis zaczyna się o 08:00)
+    offset = (1440 - per_day * slot) // 30 * 15
+    ordinal = date.fromisoformat(start).toordinal()
+    prev = None
+    for i in range(n):
+        k = i % per_day
+        if k == 0:
+            day = date.fromordinal(ordinal + i // per_day).isoformat()
+        length = rng.randrange(slot // 30, slot // 15 + 1) * 15
+        if prev is not None and rng.random() < overlap:
+            # Początek w połowie poprzedniego wpisu (ten sam dzień)
+            entry_date, prev_start, prev_length = prev
+            begin = prev_start + prev_length // 30 * 15
+        else:
+            entry_date, begin = day, offset + k * slot
+            prev = (day, begin, length)
+        project = names[rng.randrange(projects)] if projects else None
+        yield make_entry(entry_date, TIMES[begin // 15],
+                         TIMES[(begin + length) % 1440 // 15], project,
+                         i + 1)
+
+
+def write_json(entries, path):
+    """Zapisuje wpisy jak DataManager: lista JSON z wcięciem 4 lub
+    (dla plików .jsonl) jeden obiekt JSON na wiersz. Zwraca liczbę."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for e in entries:
+                f.write(json.dumps(e.to_dict()) + "\n")
+                count += 1
+            return count
+        f.write("[")
+        for e in entries:
+            item = json.dumps(e.to_dict(), indent=4).replace("\n", "\n    ")
+            f.write(("\n    " if not count else ",\n    ") + item)
+            count += 1
+        f.write("\n]" if count else "]")
+    return count
+
+
+def write_csv(entries, path):
+    """Zapisuje wpisy w formacie eksportu CSV; zwraca liczbę wierszy."""
+    count, _ = export_csv(entries, path)
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generator syntetycznych danych o czasie pracy")
+    parser.add_argument("n", type=int, help="liczba wpisów")
+    parser.add_argument("--json", help="plik JSON (.json lub .jsonl)")
+    parser.add_argument("--csv", help="plik CSV (.gz/.zst - kompresja)")
+    parser.add_argument("--start", default=START,
+                        help="data pierwszego dnia")
+    parser.add_argument("--days", type=int,
+                        help=f"liczba dni (domyślnie ~{PER_DAY} wpisów "
+                             f"na dzień)")
+    parser.add_argument("--projects", type=int, default=PROJECTS,
+                        help="liczba projektów (0 = bez projektów)")
+    parser.add_argument("--overlap", type=float, default=0.0,
+                        help="udział wpisów nachodzących na poprzedni")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    if not (args.json or args.csv):
+        parser.error("podaj --json i/lub --csv")
+    options = dict(start=args.start, days=args.days,
+                   projects=args.projects, overlap=args.overlap,
+                   seed=args.seed)
+    try:
+        for path, write in ((args.json, write_json),
+                            (args.csv, write_csv)):
+            if path:
+                count = write(generate_entries(args.n, **options), path)
+                print(f"✅ Zapisano {count} wpisów do pliku {path}")
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
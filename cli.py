@@ -0,0 +1,355 @@
+# cli.py
+"""Nieinteraktywny interfejs wiersza poleceń (do skryptów i crona).
+
+Przykłady:
+    python main.py add 2024-06-01 08:00 16:00 --project ProjX
+    python main.py add --batch wpisy.jsonl      (lub "-" = stdin)
+    python main.py edit 42 09:00 17:00
+    python main.py remove 42
+    python main.py import dane.csv
+    python main.py export wynik.csv.gz --from 2024-01-01 --to 2024-06-30
+    python main.py analyze --detailed
+    python main.py sum
+    python main.py filter --min-hours 8
+    python main.py audit
+    python main.py report --period quarter --metric average
+    python main.py payroll --period biweek --norm 7.5 --from 2024-01-01
+    python main.py plot --by project --dir data/charts
+
+Wynik każdego polecenia to jeden obiekt JSON na stdout; komunikaty dla
+człowieka trafiają na stderr. Kod wyjścia 0 oznacza sukces.
+"""
+import argparse
+from contextlib import redirect_stdout
+from itertools import islice
+import json
+import sys
+from models.entry import make_entry
+from services.aggregates import Aggregates
+from services.analytics import compute_stats
+from services.analyzer import Analyzer, PLOT_PATH, CHARTS_DIR
+from services.charts import MAX_POINTS
+from services.data_manager import ConflictError, DataManager
+from services.exporter import COLUMNS, DEFAULT_COLUMNS
+from services.importer import BATCH_SIZE, validate_batch
+from services.reports import METRICS, PERIODS, pivot
+from services.rollups import BIWEEK_ANCHOR, DAILY_NORM, LEVELS
+from utils import instrumentation
+from utils.validators import validate_date, validate_time
+
+DEFAULT_DATA = "data/work_log.json"
+
+
+def read_records(f):
+    """Czyta wpisy JSON Lines; zwraca krotki jak importer.read_batches.
+
+    Wiersz, którego nie da się odczytać, zwracany jest od razu jako para
+    (nr wiersza, powód), jak odrzucone z validate_batch.
+    """
+    for line_num, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            d = json.loads(line)
+        except ValueError:
+            yield (line_num, "niepoprawny JSON")
+            continue
+        if not isinstance(d, dict):
+            yield (line_num, "oczekiwano obiektu JSON")
+            continue
+        yield (line_num, d.get("date"), d.get("start"), d.get("end"),
+               d.get("project"), d.get("id"))
+
+
+def cmd_add(data_manager, args):
+    """Dodaje wpis z argumentów lub porcje wpisów z pliku/stdin."""
+    if args.batch:
+        f = sys.stdin if args.batch == "-" else open(args.batch,
+                                                     encoding="utf-8")
+        with f:
+            return _add_batches(data_manager, read_records(f))
+    if not (args.date and args.start and args.end):
+        raise ValueError("Podaj datę, start i koniec albo --batch PLIK")
+    return _add_batches(data_manager, [(1, args.date, args.start,
+                                        args.end, args.project, None)])
+
+
+def _add_batches(data_manager, records):
+    """Dodaje poprawne wpisy porcjami; każda porcja to jeden zapis."""
+    added, rejected, ids = 0, [], []
+    records = iter(records)
+    while True:
+        batch = list(islice(records, BATCH_SIZE))
+        if not batch:
+            break
+        # Pary (nr wiersza, powód) to wiersze odrzucone przy odczycie
+        rejected.extend(row for row in batch if len(row) == 2)
+        valid, bad = validate_batch([row for row in batch if len(row) > 2],
+                                    lines=True)
+        entries, overlapping = data_manager.partition_overlaps(
+            [make_entry(*row[1:]) for row in valid])
+        rejected.extend(bad)
+        rejected.extend((valid[i][0], reason) for i, reason in overlapping)
+        if entries:
+            data_manager.add_entries(entries, checked=True)
+            data_manager.save()
+            added += len(entries)
+            # Id odczytywane po zapisie (scalanie może je zmienić)
+            ids.extend(entry.id for entry in entries)
+    rejected.sort()
+    return {"added": added, "ids": ids, "rejected": _rejected(rejected)}
+
+
+def _by_id(action, data_manager, entry_id, *args):
+    """Wykonuje zmianę wpisu o podanym id i zapisuje dane."""
+    try:
+        entry = action(entry_id, *args)
+    except KeyError:
+        raise ValueError(f"Brak wpisu o id {entry_id}")
+    data_manager.save()
+    return entry
+
+
+def cmd_edit(data_manager, args):
+    """Zmienia godziny wpisu o podanym id."""
+    if not (validate_time(args.start) and validate_time(args.end)):
+        raise ValueError("Niepoprawny format godziny")
+    entry = _by_id(data_manager.edit_by_id, data_manager, args.id,
+                   args.start, args.end)
+    return {"edited": entry.to_dict()}
+
+
+def cmd_remove(data_manager, args):
+    """Usuwa wpis o podanym id."""
+    entry = _by_id(data_manager.remove_by_id, data_manager, args.id)
+    return {"removed": entry.to_dict()}
+
+
+def _rejected(rejected):
+    return [{"line": line, "reason": reason} for line, reason in rejected]
+
+
+def cmd_import(data_manager, args):
+    """Importuje pliki CSV ("-" = stdin); zapis raz na plik."""
+    from main import import_from_csv
+    result = {"imported": 0, "rejected": []}
+    for filename in args.files:
+        source = sys.stdin if filename == "-" else filename
+        outcome = import_from_csv(data_manager, source, workers=args.workers)
+        if outcome is None:
+            raise ValueError(f"Nie udało się zaimportować {filename}")
+        count, rejected = outcome
+        data_manager.save()
+        result["imported"] += count
+        result["rejected"] += [dict(r, file=filename)
+                               for r in _rejected(rejected)]
+    return result
+
+
+def _selected(data_manager, args):
+    """Wpisy z zakresu --from/--to (strumieniowo) lub wszystkie."""
+    if args.date_from or args.date_to:
+        return data_manager.iter_range(args.date_from or "0001-01-01",
+                                       args.date_to or "9999-12-31")
+    return data_manager.iter_entries()
+
+
+def cmd_export(data_manager, args):
+    """Eksportuje wpisy do pliku CSV (.gz/.zst = kompresja)."""
+    from main import export_to_csv
+    count = export_to_csv(_selected(data_manager, args), args.file,
+                          columns=args.columns.split(","))
+    if count is None:
+        raise ValueError(f"Nie udało się wyeksportować do {args.file}")
+    return {"exported": count, "file": args.file}
+
+
+def cmd_analyze(data_manager, args):
+    """Zwraca statystyki: sumy z agregatów lub (--detailed) pełne."""
+    if args.detailed:
+        return compute_stats(_selected(data_manager, args),
+                             overtime_threshold=args.overtime)
+    if args.date_from or args.date_to:
+        agg = Aggregates(_selected(data_manager, args))
+    else:
+        agg = data_manager.aggregates()
+    return agg.summary()
+
+
+def cmd_sum(data_manager, args):
+    """Zwraca łączną liczbę godzin."""
+    from main import recursive_sum
+    return {"total_hours": recursive_sum(_selected(data_manager, args),
+                                         workers=args.workers)}
+
+
+def cmd_filter(data_manager, args):
+    """Zwraca wpisy trwające co najmniej --min-hours godzin."""
+    if args.date_from or args.date_to:
+        entries = [e for e in _selected(data_manager, args)
+                   if e.duration() >= args.min_hours]
+    else:
+        entries = data_manager.filter_min_hours(args.min_hours)
+    return {"count": len(entries), "entries": [e.to_dict() for e in entries]}
+
+
+def cmd_audit(data_manager, args):
+    """Zwraca pary nakładających się wpisów (z id i pozycjami)."""
+    conflicts = data_manager.audit()
+    entries = data_manager.entries if conflicts else []
+    return {"count": len(conflicts), "conflicts": [
+        {"a": dict(entries[a].to_dict(), index=a),
+         "b": dict(entries[b].to_dict(), index=b), "minutes": minutes}
+        for a, b, minutes in conflicts]}
+
+
+def cmd_report(data_manager, args):
+    """Zwraca tabelę przestawną projekt × okres dla wybranej miary."""
+    if args.date_from or args.date_to:
+        report = pivot(_selected(data_manager, args), args.period)
+    else:
+        report = data_manager.project_report(args.period)
+    return report.to_dict(args.metric)
+
+
+def cmd_payroll(data_manager, args):
+    """Zwraca godziny i nadgodziny wg okresów rozliczeniowych."""
+    rollup = data_manager.rollup(args.norm, args.anchor)
+    return rollup.to_dict(args.period, args.date_from, args.date_to)
+
+
+def cmd_plot(data_manager, args):
+    """Zapisuje wykres (lub wykresy wg --by) bez otwierania okna."""
+    analyzer = Analyzer()
+    if args.by:
+        files = analyzer.plot_batch(data_manager.iter_entries(), by=args.by,
+                                    directory=args.dir,
+                                    max_points=args.max_points,
+                                    workers=args.workers)
+    else:
+        path = analyzer.plot(data_manager.aggregates(), path=args.output,
+                             max_points=args.max_points, headless=True)
+        files = [path] if path else []
+    if not files:
+        raise ValueError("Nie zapisano żadnego wykresu")
+    return {"files": files}
+
+
+def _date(value):
+    if not validate_date(value):
+        raise argparse.ArgumentTypeError(f"niepoprawna data '{value}'")
+    return value
+
+
+def _columns(value):
+    unknown = [c for c in value.split(",") if c not in COLUMNS]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"nieznane kolumny: {', '.join(unknown)}")
+    return value
+
+
+def build_parser():
+    """Buduje parser argumentów z podpoleceniami."""
+    parser = argparse.ArgumentParser(
+        prog="main.py", description="Rejestr czasu pracy - tryb wsadowy")
+    parser.add_argument("--data", default=DEFAULT_DATA,
+                        help="plik danych (.json, .jsonl, .db)")
+    parser.add_argument("--indent", type=int, default=None,
+                        help="wcięcie wyniku JSON")
+    parser.add_argument("--trace", metavar="PLIK",
+                        help="zapisuj pomiary wydajności (JSON Lines), "
+                             "podsumowanie na stderr")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def command(name, func, help_text, ranged=False, workers=False):
+        p = sub.add_parser(name, help=help_text)
+        p.set_defaults(func=func)
+        if ranged:
+            p.add_argument("--from", dest="date_from", type=_date)
+            p.add_argument("--to", dest="date_to", type=_date)
+        if workers:
+            p.add_argument("--workers", type=int, default=None)
+        return p
+
+    p = command("add", cmd_add, "dodaj wpis lub porcję wpisów")
+    p.add_argument("date", nargs="?")
+    p.add_argument("start", nargs="?")
+    p.add_argument("end", nargs="?")
+    p.add_argument("--project")
+    p.add_argument("--batch", metavar="PLIK",
+                   help="wpisy JSON Lines z pliku ('-' = stdin)")
+
+    p = command("edit", cmd_edit, "zmień godziny wpisu o podanym id")
+    p.add_argument("id", type=int)
+    p.add_argument("start")
+    p.add_argument("end")
+
+    p = command("remove", cmd_remove, "usuń wpis o podanym id")
+    p.add_argument("id", type=int)
+
+    p = command("import", cmd_import, "importuj pliki CSV", workers=True)
+    p.add_argument("files", nargs="+", metavar="PLIK")
+
+    p = command("export", cmd_export, "eksportuj do CSV", ranged=True)
+    p.add_argument("file")
+    p.add_argument("--columns", type=_columns,
+                   default=",".join(DEFAULT_COLUMNS))
+
+    p = command("analyze", cmd_analyze, "statystyki czasu pracy",
+                ranged=True)
+    p.add_argument("--detailed", action="store_true")
+    p.add_argument("--overtime", type=float, default=8.0)
+
+    command("sum", cmd_sum, "suma godzin", ranged=True, workers=True)
+
+    p = command("filter", cmd_filter, "wpisy >= N godzin", ranged=True)
+    p.add_argument("--min-hours", type=float, required=True)
+
+    command("audit", cmd_audit, "znajdź nakładające się wpisy")
+
+    p = command("report", cmd_report, "raport projekt × okres", ranged=True)
+    p.add_argument("--period", choices=PERIODS, default="month")
+    p.add_argument("--metric", choices=METRICS, default="hours")
+
+    p = command("payroll", cmd_payroll, "godziny i nadgodziny wg okresów",
+                ranged=True)
+    p.add_argument("--period", choices=LEVELS, default="month")
+    p.add_argument("--norm", type=float, default=DAILY_NORM,
+                   help="dzienna norma godzin (nadgodziny ponad nią)")
+    p.add_argument("--anchor", type=_date, default=BIWEEK_ANCHOR,
+                   help="pierwszy dzień okresów dwutygodniowych")
+
+    p = command("plot", cmd_plot, "zapisz wykres(y)", workers=True)
+    p.add_argument("--output", default=PLOT_PATH)
+    p.add_argument("--by", choices=("project", "month"))
+    p.add_argument("--dir", default=CHARTS_DIR)
+    p.add_argument("--max-points", type=int, default=MAX_POINTS)
+    return parser
+
+
+def run(argv=None, out=None):
+    """Wykonuje polecenie; wypisuje wynik JSON i zwraca kod wyjścia."""
+    out = out or sys.stdout
+    args = build_parser().parse_args(argv)
+    if args.trace:
+        instrumentation.enable(args.trace)
+    try:
+        # Komunikaty funkcji interaktywnych nie mogą mieszać się z JSON
+        with redirect_stdout(sys.stderr):
+            data_manager = DataManager(args.data, journal=True, lazy=True)
+            result = args.func(data_manager, args)
+        code = 0
+    except (OSError, ValueError, ConflictError) as e:
+        result, code = {"error": str(e)}, 1
+    if args.trace:
+        print(instrumentation.format_summary(), file=sys.stderr)
+        instrumentation.disable()
+    json.dump(result, out, ensure_ascii=False, indent=args.indent)
+    out.write("\n")
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(run())
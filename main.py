@@ -1,13 +1,25 @@
 # main.py
-from services.data_manager import DataManager
+from services.data_manager import DataManager, OverlapError
 from services.analyzer import Analyzer
-from models.entry import WorkEntry
+from models.entry import make_entry
+from services.summation import total_hours
+from services.importer import import_csv
+from services.exporter import export_csv, DEFAULT_COLUMNS
+from services.reports import METRICS, PERIODS
+from services.rollups import DAILY_NORM, LEVELS
+from services.listing import EntryPager
+from utils import instrumentation
 from utils.validators import validate_date, validate_time, log_operation
-import csv
+from itertools import islice
 import sys
 
 # Zmienna globalna (przykład użycia zmiennej globalnej)
 GLOBAL_USER = "admin"
+# Ile odrzuconych wierszy importu pokazać na ekranie
+MAX_REJECTED_SHOWN = 20
+# Polecenia przeglądania listy wpisów (opcje 2, 3, 8 i wyniki wyszukiwania)
+PAGER_HELP = ("[Enter] dalej, p = wstecz, d RRRR-MM-DD = skok do daty, "
+              "s tekst = szukaj, w = wszystkie, q = koniec")
 
 
 def print_header():
@@ -33,6 +45,13 @@ def print_menu():
         "11. Operacje na stringach (dzielenie, wyszukiwanie)",
         "12. Eksport do CSV",
         "13. Import z CSV",
+        "14. Szukaj wpisów w zakresie dat",
+        "15. Statystyki szczegółowe",
+        "16. Wykresy zbiorcze (projekty/miesiące)",
+        "17. Audyt nakładających się wpisów",
+        "18. Raport projektów (projekt × okres)",
+        "19. Pomiary wydajności (włącz/wyłącz, podsumowanie)",
+        "20. Rozliczenie okresów (tydzień/miesiąc/..., nadgodziny)",
         "0. Wyjście"
     ]
     for item in menu:
@@ -56,16 +75,25 @@ def add_entry(data_manager):
     if not validate_time(end):
         print("❌ Niepoprawny format godziny zakończenia!")
         return
-    entry = WorkEntry(date, start, end)
-    data_manager.entries.append(entry)
-    print("✅ Dodano wpis.")
+    project = input("Projekt (Enter = bez projektu): ").strip()
+    entry = make_entry(date, start, end, project)
+    try:
+        entry_id = data_manager.add_entry(entry)
+    except OverlapError as e:
+        print(f"❌ Nie dodano: {e}")
+        return
+    print(f"✅ Dodano wpis nr {entry_id}.")
 
 
-def recursive_sum(entries, idx=0):
-    """Rekurencyjnie sumuje czas pracy ze wszystkich wpisów."""
-    if idx >= len(entries):
-        return 0
-    return entries[idx].duration() + recursive_sum(entries, idx + 1)
+def recursive_sum(entries, idx=0, workers=None):
+    """Sumuje czas pracy wpisów (od pozycji idx) w godzinach.
+
+    Wpisy dzielone są na bloki, a wyniki bloków sumowane rekurencyjnie
+    parami, więc głębokość rekurencji to O(log n), a nie O(n).
+    """
+    if idx:
+        entries = islice(entries, idx, None)
+    return total_hours(entries, workers=workers)
 
 
 def filter_entries(entries, predicate):
@@ -76,51 +104,40 @@ def filter_entries(entries, predicate):
 
 @log_operation
 def remove_entry(data_manager):
-    """Usuwa wpis czasu pracy na podstawie numeru."""
-    if not data_manager.entries:
-        print("Brak wpisów do usunięcia.")
-        return
+    """Usuwa wpis wybrany z listy stronicowanej."""
     print("\n--- Usuń wpis ---")
-    for i, e in enumerate(data_manager.entries):
-        print(f"{i + 1}. {e}")
+    entry_id = browse_entries(data_manager.entries, data_manager,
+                              select="numer wpisu do usunięcia")
+    if entry_id is None:
+        return
     try:
-        index = int(input("Podaj numer wpisu do usunięcia: ")) - 1
-        if 0 <= index < len(data_manager.entries):
-            removed = data_manager.entries.pop(index)
-            print(f"✅ Usunięto wpis: {removed}")
-        else:
-            print("❌ Niepoprawny indeks.")
+        removed = data_manager.remove_by_id(entry_id)
+        print(f"✅ Usunięto wpis: {removed}")
     except Exception as e:
         print(f"Błąd usuwania: {e}")
 
 
 @log_operation
 def edit_entry(data_manager):
-    """Edycja wybranego wpisu czasu pracy."""
-    if not data_manager.entries:
-        print("Brak wpisów do edycji.")
-        return
+    """Edycja wpisu wybranego z listy stronicowanej."""
     print("\n--- Edycja wpisu ---")
-    for i, e in enumerate(data_manager.entries):
-        print(f"{i + 1}. {e}")
+    entry_id = browse_entries(data_manager.entries, data_manager,
+                              select="numer wpisu do edycji")
+    if entry_id is None:
+        return
     try:
-        index = int(input("Podaj numer wpisu do edycji: ")) - 1
-        if 0 <= index < len(data_manager.entries):
-            entry = data_manager.entries[index]
-            print(f"Edytujesz: {entry}")
-            new_start = input("Nowa godzina rozpoczęcia (HH:MM): ").strip()
-            if not validate_time(new_start):
-                print("❌ Niepoprawny format godziny!")
-                return
-            new_end = input("Nowa godzina zakończenia (HH:MM): ").strip()
-            if not validate_time(new_end):
-                print("❌ Niepoprawny format godziny!")
-                return
-            entry.start = new_start
-            entry.end = new_end
-            print("✅ Zmieniono wpis.")
-        else:
-            print("❌ Niepoprawny indeks.")
+        entry = data_manager.get_entry(entry_id)
+        print(f"Edytujesz: {entry}")
+        new_start = input("Nowa godzina rozpoczęcia (HH:MM): ").strip()
+        if not validate_time(new_start):
+            print("❌ Niepoprawny format godziny!")
+            return
+        new_end = input("Nowa godzina zakończenia (HH:MM): ").strip()
+        if not validate_time(new_end):
+            print("❌ Niepoprawny format godziny!")
+            return
+        data_manager.edit_by_id(entry_id, new_start, new_end)
+        print("✅ Zmieniono wpis.")
     except Exception as e:
         print(f"Błąd edycji: {e}")
 
@@ -139,73 +156,173 @@ def string_operations_demo():
         print(f"❌ Nie znaleziono '{search}' w tekście.")
 
 
-def export_to_csv(entries, filename):
-    """Eksportuje wpisy do pliku CSV."""
+@log_operation
+def export_to_csv(entries, filename, columns=DEFAULT_COLUMNS,
+                  compression="auto"):
+    """Eksportuje wpisy do pliku CSV (strumieniowo, .gz/.zst kompresuje)."""
     try:
-        with open(filename, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["date", "start", "end"])
-            for e in entries:
-                writer.writerow([e.date, e.start, e.end])
-        print(f"✅ Wyeksportowano do pliku {filename}")
+        count, seconds = export_csv(entries, filename, columns,
+                                    compression=compression)
+        rate = count / seconds if seconds else count
+        print(f"✅ Wyeksportowano {count} wpisów do pliku {filename} "
+              f"({rate:.0f} wierszy/s)")
+        return count
     except Exception as e:
         print(f"Błąd eksportu CSV: {e}")
 
 
-def import_from_csv(data_manager, filename):
-    """Importuje wpisy z pliku CSV."""
+@log_operation
+def import_from_csv(data_manager, filename, workers=None):
+    """Importuje wpisy z pliku CSV (porcjami, z raportem odrzuconych)."""
     try:
-        with open(filename, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            count = 0
-            for row in reader:
-                if (
-                        validate_date(row["date"]) and
-                        validate_time(row["start"]) and
-                        validate_time(row["end"])
-                ):
-                    data_manager.entries.append(
-                        WorkEntry(row["date"], row["start"], row["end"]))
-                    count += 1
-        print(f"✅ Zaimportowano {count} wpisów z pliku {filename}")
+        count, rejected = import_csv(data_manager, filename, workers=workers)
+        name = getattr(filename, "name", filename)
+        print(f"✅ Zaimportowano {count} wpisów z pliku {name}")
+        if rejected:
+            print(f"❌ Odrzucono {len(rejected)} wierszy:")
+            for line, reason in rejected[:MAX_REJECTED_SHOWN]:
+                print(f"   wiersz {line}: {reason}")
+            if len(rejected) > MAX_REJECTED_SHOWN:
+                print(f"   ... i {len(rejected) - MAX_REJECTED_SHOWN} "
+                      f"kolejnych")
+        return count, rejected
     except Exception as e:
         print(f"Błąd importu CSV: {e}")
 
 
-def print_entries(entries):
-    """Ładnie wyświetla wszystkie wpisy."""
-    if not entries:
-        print("Brak wpisów do wyświetlenia.")
+@log_operation
+def audit_entries(data_manager):
+    """Wyświetla pary nakładających się wpisów z całego rejestru."""
+    conflicts = data_manager.audit()
+    if not conflicts:
+        print("✅ Brak nakładających się wpisów.")
+        return conflicts
+    print(f"❌ Nakładające się wpisy: {len(conflicts)}")
+    entries = data_manager.entries
+    for a, b, minutes in conflicts[:MAX_REJECTED_SHOWN]:
+        print(f"   {entries[a].id}. {entries[a]}\n"
+              f"   {entries[b].id}. {entries[b]}"
+              f"\n      wspólne minuty: {minutes}")
+    if len(conflicts) > MAX_REJECTED_SHOWN:
+        print(f"   ... i {len(conflicts) - MAX_REJECTED_SHOWN} kolejnych")
+    return conflicts
+
+
+def payroll_report(data_manager, analyzer):
+    """Pyta o okres, normę i zakres dat, po czym wyświetla rozliczenie."""
+    period = input(f"Okres ({'/'.join(LEVELS)}): ").strip() or "month"
+    if period not in LEVELS:
+        print("❌ Niepoprawny okres!")
+        return None
+    try:
+        norm = float(input(f"Dzienna norma godzin (Enter = "
+                           f"{DAILY_NORM:g}): ") or DAILY_NORM)
+    except ValueError:
+        print("❌ Podano niepoprawną wartość.")
+        return None
+    dates = input("Zakres dat 'YYYY-MM-DD YYYY-MM-DD' "
+                  "(Enter = wszystkie): ").split()
+    if dates and not (len(dates) == 2 and all(map(validate_date, dates))):
+        print("❌ Niepoprawny zakres dat!")
+        return None
+    return analyzer.payroll(data_manager.rollup(norm), period, *dates)
+
+
+def toggle_instrumentation():
+    """Włącza pomiary albo wyświetla ich podsumowanie i je wyłącza."""
+    if not instrumentation.enabled():
+        instrumentation.enable(instrumentation.DEFAULT_LOG)
+        print(f"✅ Włączono pomiary (log: {instrumentation.DEFAULT_LOG}).")
         return
+    print("\n" + instrumentation.format_summary())
+    if input("Wyłączyć pomiary? (t/n): ").strip().lower() == "t":
+        instrumentation.disable()
+        print("✅ Wyłączono pomiary.")
+
+
+def print_entries(entries, data_manager=None):
+    """Wyświetla wpisy stronami (jeden zapis na stronę)."""
     print("\n--- Lista wpisów ---")
-    for i, e in enumerate(entries, 1):
-        print(f"{str(i).rjust(2)}. {e}")
+    browse_entries(entries, data_manager)
+
+
+def browse_entries(entries, data_manager=None, select=None):
+    """Przegląda wpisy stronami: przewijanie, skok do daty, wyszukiwanie.
+
+    Przy `data_manager` (lista całego rejestru) skok do daty korzysta
+    z indeksu dat. Z `select` (treść pytania) i `data_manager` pozwala
+    wybrać wpis numerem (id) i zwraca to id, w przeciwnym razie None.
+    """
+    if not len(entries):
+        print("Brak wpisów do wyświetlenia.")
+        return None
+    full = pager = EntryPager(entries)
+    while True:
+        sys.stdout.write(pager.render())
+        if select is None and full.pages == 1:
+            return None
+        command = input(PAGER_HELP + (f", numer = {select}" if select
+                                      else "") + ": ").strip()
+        if not command:
+            if pager.page == pager.pages - 1 and select is None:
+                return None
+            pager.next()
+        elif command == "p":
+            pager.previous()
+        elif command == "q":
+            return None
+        elif command == "w":
+            pager = full
+        elif command.startswith("s "):
+            pager = pager.search(command[2:].strip())
+        elif command.startswith("d "):
+            date = command[2:].strip()
+            if not validate_date(date):
+                print("❌ Niepoprawna data!")
+            elif pager is full and data_manager is not None:
+                position = data_manager.position_from_date(date)
+                if position is None:
+                    print("Brak wpisów od tej daty.")
+                else:
+                    pager.show_position(position)
+            elif not pager.show_date(date):
+                print("Brak wpisów od tej daty.")
+        elif select and data_manager is not None and command.isdigit():
+            try:
+                data_manager.get_entry(int(command))
+                return int(command)
+            except KeyError:
+                print("❌ Niepoprawny numer wpisu.")
+        else:
+            print("❌ Nieznane polecenie.")
 
 
 def main():
     # Zmienna lokalna (przykład)
-    data_manager = DataManager("data/work_log.json")
+    data_manager = DataManager("data/work_log.json", journal=True,
+                               lazy=True)
     analyzer = Analyzer()
 
     while True:
         print_header()
         print_menu()
         choice = input("\nWybierz opcję: ").strip()
+        # Ponowne wczytanie tylko, gdy dane zmienił inny proces
+        if data_manager.refresh():
+            print("ℹ️ Wczytano zmiany zapisane przez inny proces.")
         if choice == "1":
             add_entry(data_manager)
         elif choice == "2":
-            print_entries(data_manager.entries)
+            print_entries(data_manager.entries, data_manager)
         elif choice == "3":
             edit_entry(data_manager)
         elif choice == "4":
             print("\n--- Wyszukiwanie wpisów po dacie ---")
             search_date = input(
                 "Podaj datę do wyszukania (YYYY-MM-DD): ").strip()
-            found = list(filter(lambda e: e.date ==
-                         search_date, data_manager.entries))
-            print_entries(found)
+            print_entries(data_manager.find_by_date(search_date))
         elif choice == "5":
-            analyzer.analyze(data_manager.entries)
+            analyzer.analyze(data_manager.aggregates())
         elif choice == "6":
             try:
                 data_manager.save()
@@ -213,30 +330,67 @@ def main():
             except Exception as e:
                 print(f"Błąd zapisu: {e}")
         elif choice == "7":
-            analyzer.plot(data_manager.entries)
+            analyzer.plot(data_manager.aggregates())
         elif choice == "8":
             remove_entry(data_manager)
         elif choice == "9":
-            total = recursive_sum(data_manager.entries)
+            total = recursive_sum(data_manager.iter_entries())
             print(f"\n🔢 Rekurencyjna suma godzin: {total:.2f}h")
         elif choice == "10":
             print("\n--- Filtruj wpisy ---")
             try:
                 min_hours = float(
                     input("Pokaż wpisy z czasem pracy >= (godz): "))
-                filtered = filter_entries(
-                    data_manager.entries, lambda e: e.duration() >= min_hours)
+                filtered = data_manager.filter_min_hours(min_hours)
                 print_entries(filtered)
             except ValueError:
                 print("❌ Podano niepoprawną wartość.")
         elif choice == "11":
             string_operations_demo()
         elif choice == "12":
-            filename = input("Podaj nazwę pliku CSV do eksportu: ").strip()
-            export_to_csv(data_manager.entries, filename)
+            filename = input("Podaj nazwę pliku CSV do eksportu "
+                             "(.gz/.zst = kompresja): ").strip()
+            dates = input("Zakres dat 'YYYY-MM-DD YYYY-MM-DD' "
+                          "(Enter = wszystkie): ").split()
+            if len(dates) == 2 and all(map(validate_date, dates)):
+                export_to_csv(data_manager.iter_range(*dates), filename)
+            elif not dates:
+                export_to_csv(data_manager.iter_entries(), filename)
+            else:
+                print("❌ Niepoprawny zakres dat!")
         elif choice == "13":
             filename = input("Podaj nazwę pliku CSV do importu: ").strip()
             import_from_csv(data_manager, filename)
+        elif choice == "14":
+            print("\n--- Wyszukiwanie wpisów w zakresie dat ---")
+            start = input("Data początkowa (YYYY-MM-DD): ").strip()
+            end = input("Data końcowa (YYYY-MM-DD): ").strip()
+            if validate_date(start) and validate_date(end):
+                print_entries(data_manager.find_range(start, end))
+            else:
+                print("❌ Niepoprawna data!")
+        elif choice == "15":
+            analyzer.detailed(data_manager.iter_entries())
+        elif choice == "16":
+            by = input("Grupuj wg (project/month): ").strip() or "project"
+            if by in ("project", "month"):
+                analyzer.plot_batch(data_manager.iter_entries(), by=by)
+            else:
+                print("❌ Niepoprawne grupowanie!")
+        elif choice == "17":
+            audit_entries(data_manager)
+        elif choice == "18":
+            period = input("Okres (day/week/month/quarter/year): ").strip()
+            metric = input("Miara (hours/count/average): ").strip()
+            if period in PERIODS and metric in METRICS:
+                analyzer.project_report(
+                    data_manager.project_report(period), metric)
+            else:
+                print("❌ Niepoprawny okres lub miara!")
+        elif choice == "19":
+            toggle_instrumentation()
+        elif choice == "20":
+            payroll_report(data_manager, analyzer)
         elif choice == "0":
             print("\nDziękujemy za skorzystanie z systemu. Do zobaczenia!")
             sys.exit(0)
@@ -245,4 +399,8 @@ def main():
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Z argumentami: tryb wsadowy (cli.py), bez - menu interaktywne
+        from cli import run
+        sys.exit(run(sys.argv[1:]))
     main()
@@ -1,35 +1,81 @@
 # models/entry.py
-from datetime import datetime
+from functools import lru_cache
+from utils.validators import time_to_minutes
+
+# Możliwych godzin HH:MM jest tylko 1440, więc wyniki parsowania
+# są zapamiętywane (a obiekty int współdzielone między wpisami)
+parse_minutes = lru_cache(maxsize=4096)(time_to_minutes)
+MINUTES_PER_DAY = 24 * 60
+
+
+def span_minutes(start, end):
+    """Zwraca minuty od `start` do `end` (minuty od północy).
+
+    Koniec wcześniejszy niż początek oznacza zmianę przez północ,
+    np. 22:00 - 06:00 to 480 minut.
+    """
+    return (end - start) % MINUTES_PER_DAY
 
 
 class WorkEntry:
     """Reprezentuje pojedynczy wpis czasu pracy."""
 
+    # __slots__ zmniejsza rozmiar każdego obiektu (brak __dict__)
+    __slots__ = ("date", "_start", "_end", "_start_min", "_end_min", "id")
+
     def __init__(self, date, start, end):
-        # Konstruktor klasy WorkEntry
+        # Konstruktor klasy WorkEntry; id nadaje DataManager przy dodaniu
         self.date = date
         self.start = start
         self.end = end
+        self.id = None
+
+    # Godziny parsowane są raz, przy przypisaniu (także w edit_entry)
+    @property
+    def start(self):
+        return self._start
+
+    @start.setter
+    def start(self, value):
+        self._start = value
+        self._start_min = parse_minutes(value)
+
+    @property
+    def end(self):
+        return self._end
+
+    @end.setter
+    def end(self, value):
+        self._end = value
+        self._end_min = parse_minutes(value)
+
+    def minutes(self):
+        """Zwraca liczbę minut między start a end (None gdy błędne)."""
+        if self._start_min is None or self._end_min is None:
+            return None
+        return span_minutes(self._start_min, self._end_min)
 
     def duration(self):
-        """Zwraca liczbę godzin między start a end."""
-        try:
-            fmt = "%H:%M"
-            tdelta = datetime.strptime(
-                self.end, fmt) - datetime.strptime(self.start, fmt)
-            return tdelta.total_seconds() / 3600
-        except Exception as e:
-            print(f"Błąd w obliczaniu czasu: {e}")
+        """Zwraca liczbę godzin między start a end (także przez północ)."""
+        if self._start_min is None or self._end_min is None:
+            bad = self._start if self._start_min is None else self._end
+            print(f"Błąd w obliczaniu czasu: niepoprawna godzina '{bad}'")
             return 0
+        return span_minutes(self._start_min, self._end_min) / 60
 
     def to_dict(self):
-        """Konwertuje wpis do słownika."""
-        return {"date": self.date, "start": self.start, "end": self.end}
+        """Konwertuje wpis do słownika (z id, jeśli zostało nadane)."""
+        d = {"date": self.date, "start": self.start, "end": self.end}
+        if self.id is not None:
+            d["id"] = self.id
+        return d
 
     @staticmethod
     def from_dict(d):
         """Tworzy wpis na podstawie słownika."""
-        return WorkEntry(d["date"], d["start"], d["end"])
+        entry = WorkEntry(d["date"], d["start"], d["end"])
+        entry.id = parse_id(d.get("id"))
+        return entry
 
     def __str__(self):
         # Formatowanie stringa (przykład operacji na stringach)
@@ -43,6 +89,8 @@ class ProjectWorkEntry(WorkEntry):
     """Wpis czasu pracy z informacją o
     projekcie (dziedziczenie po WorkEntry)."""
 
+    __slots__ = ("project",)
+
     def __init__(self, date, start, end, project):
         # Konstruktor klasy dziedziczącej
         super().__init__(date, start, end)
@@ -57,11 +105,42 @@ class ProjectWorkEntry(WorkEntry):
     @staticmethod
     def from_dict(d):
         # Tworzenie obiektu z dodatkowym polem
-        return ProjectWorkEntry(d["date"], d["start"],
-                                d["end"], d.get("project", ""))
+        entry = ProjectWorkEntry(d["date"], d["start"],
+                                 d["end"], d.get("project", ""))
+        entry.id = parse_id(d.get("id"))
+        return entry
 
     def __str__(self):
         # Formatowanie stringa z informacją o projekcie
         return (f"{self.date}: {self.start} - "
                 f"{self.end} ({self.duration():.2f}h) "
                 f"[Projekt: {self.project}]")
+
+
+def parse_id(value):
+    """Zwraca id wpisu jako liczbę całkowitą >= 1 (także z napisu cyfr);
+    None, gdy brak id lub wartość jest niepoprawna."""
+    if isinstance(value, str) and value.isascii() and value.isdigit():
+        value = int(value)
+    if isinstance(value, int) and not isinstance(value, bool) \
+            and value >= 1:
+        return value
+    return None
+
+
+def make_entry(date, start, end, project=None, entry_id=None):
+    """Tworzy ProjectWorkEntry, gdy podano projekt, a w przeciwnym razie
+    WorkEntry (z podanym id, np. z pliku lub importu)."""
+    if project:
+        entry = ProjectWorkEntry(date, start, end, project)
+    else:
+        entry = WorkEntry(date, start, end)
+    entry.id = entry_id
+    return entry
+
+
+def entry_from_dict(d):
+    """Tworzy wpis odpowiedniej klasy na podstawie słownika z pliku
+    (ProjectWorkEntry, gdy słownik ma niepusty projekt)."""
+    return make_entry(d["date"], d["start"], d["end"], d.get("project"),
+                      parse_id(d.get("id")))
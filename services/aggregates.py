@@ -0,0 +1,126 @@
+# services/aggregates.py
+from datetime import date
+from functools import lru_cache
+from services.date_index import ordinal_of
+
+# Wymiary, w których utrzymywane są sumy; "project_month" to kubełki
+# projekt × miesiąc o kluczach "YYYY-MM/projekt" (raporty przestawne)
+DIMENSIONS = ("day", "week", "month", "project", "project_month")
+
+
+def project_month_key(month, project):
+    """Klucz kubełka projekt × miesiąc (miesiąc ma stałą długość)."""
+    return f"{month}/{project}"
+
+
+def split_project_month(key):
+    """Rozdziela klucz kubełka na (miesiąc YYYY-MM, projekt)."""
+    return key[:7], key[8:]
+
+
+@lru_cache(maxsize=8192)
+def week_key(ordinal):
+    """Zwraca klucz tygodnia ISO (YYYY-Www) dla numeru dnia."""
+    year, week, _ = date.fromordinal(ordinal).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class Aggregates:
+    """Bieżące sumy czasu pracy wg dnia, tygodnia ISO, miesiąca, projektu
+    oraz projektu w miesiącu.
+
+    Każdy kubełek to para [minuty, liczba wpisów]. Dodanie lub usunięcie
+    wpisu aktualizuje sumy w czasie O(1), bez ponownego liczenia historii.
+    """
+
+    def __init__(self, entries=()):
+        # Konstruktor: sumy liczone w jednym przebiegu po wpisach
+        self.count = 0
+        self.minutes = 0
+        self.buckets = {dim: {} for dim in DIMENSIONS}
+        for e in entries:
+            self.add(e)
+
+    @staticmethod
+    def _keys(entry):
+        """Zwraca pary (wymiar, klucz) kubełków, do których trafia wpis."""
+        project = getattr(entry, "project", None) or ""
+        keys = [("day", entry.date), ("month", entry.date[:7]),
+                ("project", project),
+                ("project_month", project_month_key(entry.date[:7],
+                                                    project))]
+        ordinal = ordinal_of(entry.date)
+        if ordinal is not None:
+            keys.append(("week", week_key(ordinal)))
+        return keys
+
+    def _update(self, entry, sign):
+        minutes = sign * (entry.minutes() or 0)
+        self.count += sign
+        self.minutes += minutes
+        for dim, key in self._keys(entry):
+            bucket = self.buckets[dim].setdefault(key, [0, 0])
+            bucket[0] += minutes
+            bucket[1] += sign
+            if bucket[1] == 0:
+                del self.buckets[dim][key]
+
+    def merge(self, dim, key, minutes, count):
+        """Dolicza gotowe sumy (minuty, liczba wpisów) do kubełka."""
+        bucket = self.buckets[dim].setdefault(key, [0, 0])
+        bucket[0] += minutes
+        bucket[1] += count
+
+    def add(self, entry):
+        """Dolicza wpis do sum."""
+        self._update(entry, 1)
+
+    def remove(self, entry):
+        """Odejmuje wpis od sum."""
+        self._update(entry, -1)
+
+    # --- odczyt (ten sam interfejs co EntryStore) ---
+
+    def __len__(self):
+        return self.count
+
+    def total_minutes(self):
+        """Zwraca łączny czas pracy w minutach."""
+        return self.minutes
+
+    def hours(self, dim):
+        """Zwraca słownik klucz -> suma godzin dla wymiaru `dim`."""
+        return {key: bucket[0] / 60
+                for key, bucket in self.buckets[dim].items()}
+
+    def daily_hours(self):
+        """Zwraca słownik data YYYY-MM-DD -> suma godzin."""
+        return self.hours("day")
+
+    def monthly_hours(self):
+        """Zwraca słownik miesiąc YYYY-MM -> suma godzin."""
+        return self.hours("month")
+
+    def summary(self):
+        """Zwraca podsumowanie: suma, liczba, średnia godzin i miesiące."""
+        total = self.minutes / 60
+        return {"total": total, "count": self.count,
+                "average": total / self.count if self.count else 0.0,
+                "monthly": self.monthly_hours()}
+
+    # --- zapis i odczyt ---
+
+    def to_dict(self):
+        """Konwertuje sumy do słownika (do zapisu w JSON)."""
+        return {"count": self.count, "minutes": self.minutes,
+                "buckets": self.buckets}
+
+    @staticmethod
+    def from_dict(d):
+        """Odtwarza sumy ze słownika."""
+        agg = Aggregates()
+        agg.count = d["count"]
+        agg.minutes = d["minutes"]
+        for dim in DIMENSIONS:
+            agg.buckets[dim] = d["buckets"].get(dim, {})
+        return agg
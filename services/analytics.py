@@ -0,0 +1,133 @@
+# services/analytics.py
+# Statystyki czasu pracy liczone wektorowo (NumPy) lub w czystym Pythonie.
+# Oba warianty zwracają słownik o tej samej postaci: total, count, average,
+# monthly, daily, percentiles, overtime, weekday.
+from collections import defaultdict
+from datetime import date
+import math
+from models.entry import MINUTES_PER_DAY
+from services.date_index import ordinal_of, ordinal_to_str
+from services.entry_store import EntryStore
+from utils.lazy_import import optional_import
+
+# Numer dnia 1970-01-01 (początek skali datetime64)
+EPOCH = date(1970, 1, 1).toordinal()
+WEEKDAYS = ("pon", "wt", "śr", "czw", "pt", "sob", "nd")
+
+
+def _percentile(sorted_values, p):
+    """Percentyl z interpolacją liniową (jak domyślnie w NumPy)."""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (
+        k - lo)
+
+
+def _result(total, count, monthly, daily, percentiles, overtime, weekday):
+    return {
+        "total": total,
+        "count": count,
+        "average": total / count if count else 0.0,
+        "monthly": monthly,
+        "daily": daily,
+        "percentiles": percentiles,
+        "overtime": overtime,
+        "weekday": dict(zip(WEEKDAYS, weekday)),
+    }
+
+
+def python_stats(entries, overtime_threshold=8.0, percentiles=(50, 90, 99)):
+    """Liczy statystyki pętlami w Pythonie (wariant zapasowy).
+
+    Nadgodziny to suma nadwyżek dziennego czasu pracy ponad
+    `overtime_threshold` godzin. Wpisy z błędną datą liczą się tylko
+    do sumy, średniej i percentyli.
+    """
+    durations = []
+    daily_minutes = defaultdict(int)
+    for e in entries:
+        minutes = e.minutes() or 0
+        durations.append(minutes)
+        ordinal = ordinal_of(e.date)
+        if ordinal is not None:
+            daily_minutes[ordinal] += minutes
+    # Sumy liczone w minutach (liczby całkowite), godziny na końcu
+    monthly = defaultdict(int)
+    weekday = [0] * 7
+    daily = {}
+    excess = []
+    for ordinal in sorted(daily_minutes):
+        minutes = daily_minutes[ordinal]
+        day = ordinal_to_str(ordinal)
+        daily[day] = minutes / 60
+        monthly[day[:7]] += minutes
+        weekday[(ordinal - 1) % 7] += minutes
+        excess.append(max(minutes / 60 - overtime_threshold, 0.0))
+    hours_sorted = sorted(m / 60 for m in durations)
+    return _result(sum(durations) / 60, len(durations),
+                   {m: v / 60 for m, v in monthly.items()}, daily,
+                   {p: _percentile(hours_sorted, p) for p in percentiles},
+                   math.fsum(excess), [w / 60 for w in weekday])
+
+
+def to_arrays(entries):
+    """Zamienia wpisy na tablice NumPy (numer dnia, minuty pracy).
+
+    Dla EntryStore wykorzystywane są kolumny bez kopiowania wpisów.
+    Błędna data ma numer dnia -1, błędne godziny dają 0 minut.
+    """
+    np = optional_import("numpy")
+    if isinstance(entries, EntryStore):
+        cols = entries.as_numpy()
+        minutes = (cols["end"].astype(np.int64) - cols["start"]) \
+            % MINUTES_PER_DAY
+        return cols["date"].astype(np.int64), minutes
+    if not isinstance(entries, (list, tuple)):
+        entries = list(entries)
+    ordinals = np.fromiter((ordinal_of(e.date) or -1 for e in entries),
+                           dtype=np.int64, count=len(entries))
+    minutes = np.fromiter((e.minutes() or 0 for e in entries),
+                          dtype=np.int64, count=len(entries))
+    return ordinals, minutes
+
+
+def numpy_stats(entries, overtime_threshold=8.0, percentiles=(50, 90, 99)):
+    """Liczy statystyki wektorowo (NumPy); wynik jak python_stats."""
+    np = optional_import("numpy")
+    if np is None:
+        raise RuntimeError("NumPy nie jest zainstalowany")
+    ordinals, minutes = to_arrays(entries)
+    count = len(minutes)
+    valid = ordinals >= 0
+    # Sumy dzienne (w minutach): unikalne dni + bincount z wagami
+    days, inverse = np.unique(ordinals[valid], return_inverse=True)
+    day_minutes = np.bincount(inverse, weights=minutes[valid],
+                              minlength=len(days))
+    # Miesiące jako datetime64[M]; numer dnia 1 to poniedziałek
+    months = (days - EPOCH).astype("datetime64[D]").astype("datetime64[M]")
+    month_keys, month_inv = np.unique(months, return_inverse=True)
+    month_minutes = np.zeros(len(month_keys))
+    np.add.at(month_minutes, month_inv, day_minutes)
+    weekday = np.bincount((days - 1) % 7, weights=day_minutes, minlength=7)
+    day_hours = day_minutes / 60
+    excess = np.clip(day_hours - overtime_threshold, 0, None)
+    pct = (np.percentile(minutes / 60, list(percentiles)) if count
+           else np.zeros(len(percentiles)))
+    return _result(
+        int(minutes.sum()) / 60, count,
+        {str(m): float(v) / 60 for m, v in zip(month_keys, month_minutes)},
+        {ordinal_to_str(int(d)): float(h) for d, h in zip(days, day_hours)},
+        {p: float(v) for p, v in zip(percentiles, pct)},
+        math.fsum(excess.tolist()), [float(w) / 60 for w in weekday])
+
+
+def compute_stats(entries, backend="auto", **options):
+    """Liczy statystyki wybranym wariantem ("numpy", "python" lub "auto")."""
+    if backend == "auto":
+        backend = "numpy" if optional_import("numpy") else "python"
+    if backend == "numpy":
+        return numpy_stats(entries, **options)
+    return python_stats(entries, **options)
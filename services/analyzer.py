@@ -1,57 +1,202 @@
 # services/analyzer.py
 from collections import defaultdict
-import matplotlib.pyplot as plt
 from functools import reduce
+import os
+import re
+from services.entry_store import EntryStore
+from services.aggregates import Aggregates
+from services.analytics import compute_stats
+from services import charts
+from services.charts import MAX_POINTS
+from utils.instrumentation import instrument
+
+# Kontenery udostępniające gotowe sumy (bez liczenia wpis po wpisie)
+PRECOMPUTED = (EntryStore, Aggregates)
+PLOT_PATH = "data/work_plot.png"
+CHARTS_DIR = "data/charts"
+
+
+def _sized(result, args):
+    """Liczba wpisów przekazanych do analizy (None dla generatorów)."""
+    entries = args[1]
+    return len(entries) if hasattr(entries, "__len__") else None
+
+
+def safe_name(key):
+    """Zamienia nazwę projektu/miesiąca na bezpieczną nazwę pliku."""
+    return re.sub(r"[^\w.-]+", "_", key) or "_"
 
 
 class Analyzer:
     """Analizuje dane o czasie pracy."""
 
+    @instrument("analyzer.analyze", entries=_sized)
     def analyze(self, entries):
-        """Wyświetla statystyki i analizę czasu pracy."""
-        if not entries:
+        """Wyświetla statystyki i analizę czasu pracy.
+
+        `entries` może być listą, EntryStore, Aggregates lub generatorem
+        wpisów (dane przetwarzane są w jednym przebiegu).
+        """
+        if isinstance(entries, PRECOMPUTED):
+            # Sumy z kolumn magazynu lub utrzymywanych agregatów
+            total = entries.total_minutes() / 60
+            count = len(entries)
+            monthly = entries.monthly_hours()
+        else:
+            # słownik miesięcy, krotki (przykład użycia kontenerów)
+            monthly = defaultdict(float)
+
+            def accumulate(acc, e):
+                hours = e.duration()
+                monthly[e.date[:7]] += hours
+                return acc[0] + hours, acc[1] + 1
+
+            # reduce - suma godzin (programowanie funkcyjne)
+            total, count = reduce(accumulate, entries, (0, 0))
+
+        if not count:
             print("Brak danych do analizy.")
             return
 
-        # reduce - suma godzin (programowanie funkcyjne)
-        total = reduce(lambda acc, e: acc + e.duration(), entries, 0)
-        avg = total / len(entries)
+        avg = total / count
         print("\nStatystyki czasu pracy:")
         print(f" - Łączny czas pracy: {total:.2f}h")
         print(f" - Średni czas na wpis: {avg:.2f}h")
 
-        # słownik miesięcy, krotki, zbiór miesięcy (przykład użycia kontenerów)
-        monthly = defaultdict(float)
-        for e in entries:
-            monthly[e.date[:7]] += e.duration()
-
         print("\nCzas pracy wg miesięcy:")
         for month, hours in monthly.items():
             tup = (month, hours)  # krotka
             print(f" - {tup[0]}: {tup[1]:.2f}h")
 
-    def plot(self, entries):
-        """Generuje i zapisuje wykres czasu pracy."""
-        if not entries:
-            print("Brak danych do wykresu.")
+    @instrument("analyzer.detailed", entries=_sized)
+    def detailed(self, entries, overtime_threshold=8.0, backend="auto"):
+        """Wyświetla rozszerzone statystyki (percentyle, nadgodziny,
+        rozkład wg dni tygodnia)."""
+        stats = compute_stats(entries, backend=backend,
+                              overtime_threshold=overtime_threshold)
+        if not stats["count"]:
+            print("Brak danych do analizy.")
             return
+        print("\nStatystyki szczegółowe:")
+        for p, hours in stats["percentiles"].items():
+            print(f" - Percentyl {p}. czasu wpisu: {hours:.2f}h")
+        print(f" - Nadgodziny (ponad {overtime_threshold:g}h dziennie): "
+              f"{stats['overtime']:.2f}h")
+        print("\nCzas pracy wg dni tygodnia:")
+        for day, hours in stats["weekday"].items():
+            print(f" - {day}: {hours:.2f}h")
+        return stats
+
+    def project_report(self, report, metric="hours", max_rows=20,
+                       max_periods=12):
+        """Wyświetla tabelę projekt × okres (PivotReport).
 
+        Pokazuje `max_rows` projektów o największej sumie godzin i ostatnie
+        `max_periods` okresów; pełne dane zwraca report.to_dict().
+        """
+        if not report.cells:
+            print("Brak danych do raportu.")
+            return
+        totals = report.totals("hours")
+        projects = sorted(totals, key=totals.get, reverse=True)[:max_rows]
+        periods = report.periods[-max_periods:]
+        row_totals = report.totals(metric)
+        width = max(len("Projekt"),
+                    *(len(p or "(brak)") for p in projects)) + 2
+        print(f"\nRaport projektów ({metric}, okres: {report.period}):")
+        print("Projekt".ljust(width) +
+              "".join(k.rjust(10) for k in periods) + "Razem".rjust(10))
+        for project in projects:
+            cells = "".join(
+                f"{report.value(project, k, metric):>10.2f}"
+                for k in periods)
+            print((project or "(brak)").ljust(width) + cells +
+                  f"{row_totals[project]:>10.2f}")
+        if len(totals) > max_rows:
+            print(f"... i {len(totals) - max_rows} kolejnych projektów")
+
+    def payroll(self, rollup, period="month", start=None, end=None,
+                max_periods=12):
+        """Wyświetla godziny, dni pracy i nadgodziny wg okresów (Rollup).
+
+        Pokazuje ostatnie `max_periods` okresów i sumę całego zakresu;
+        pełne dane zwraca rollup.to_dict().
+        """
+        report = rollup.to_dict(period, start, end)
+        periods = list(report["periods"].items())
+        if not periods:
+            print("Brak danych do rozliczenia.")
+            return report
+        print(f"\nRozliczenie (okres: {period}, norma: "
+              f"{rollup.norm:g}h dziennie):")
+        print("Okres".ljust(12) + "Godziny".rjust(10) + "Wpisy".rjust(8) +
+              "Dni".rjust(6) + "Nadgodziny".rjust(12))
+        rows = periods[-max_periods:] + [("Razem", report["total"])]
+        for key, row in rows:
+            print(f"{key:<12}{row['hours']:>10.2f}{row['count']:>8}"
+                  f"{row['days']:>6}{row['overtime']:>12.2f}")
+        return report
+
+    @instrument("analyzer.plot", entries=_sized)
+    def plot(self, entries, path=PLOT_PATH, max_points=MAX_POINTS,
+             headless=None):
+        """Generuje i zapisuje wykres czasu pracy.
+
+        Przy więcej niż `max_points` dniach słupki sumowane są do tygodni
+        lub miesięcy. W trybie `headless` (domyślnie, gdy brak ekranu)
+        wykres jest tylko zapisywany do pliku `path`.
+        """
         # Słownik z sumą godzin dla każdej daty
-        daily = defaultdict(float)
-        for e in entries:
-            daily[e.date] += e.duration()
-
-        dates = sorted(daily.keys())
-        hours = [daily[d] for d in dates]
-
-        # Tworzenie wykresu słupkowego
-        plt.figure(figsize=(10, 5))
-        plt.bar(dates, hours, color='skyblue')
-        plt.xlabel("Data")
-        plt.ylabel("Godziny pracy")
-        plt.title("Czas pracy dzienny")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig("data/work_plot.png")
-        plt.show()
-        print("Wykres zapisano jako data/work_plot.png")
+        if isinstance(entries, PRECOMPUTED):
+            daily = entries.daily_hours()
+        else:
+            daily = defaultdict(float)
+            for e in entries:
+                daily[e.date] += e.duration()
+
+        if not daily:
+            print("Brak danych do wykresu.")
+            return
+
+        if headless is None:
+            headless = not charts.has_display()
+        # matplotlib ładowany dopiero przy pierwszym wykresie
+        plt = charts.pyplot(headless)
+        if plt is None:
+            print("❌ Wykres wymaga pakietu matplotlib.")
+            return
+
+        fig = plt.figure(figsize=(10, 5))
+        charts.draw(fig, charts.chart_job(daily, path, "Czas pracy",
+                                          max_points))
+        if headless:
+            plt.close(fig)
+        else:
+            plt.show()
+        print(f"Wykres zapisano jako {path}")
+        return path
+
+    @instrument("analyzer.plot_batch", entries=_sized)
+    def plot_batch(self, entries, by="project", directory=CHARTS_DIR,
+                   max_points=MAX_POINTS, workers=None):
+        """Zapisuje osobny wykres dla każdego projektu lub miesiąca.
+
+        Wpisy grupowane są w jednym przebiegu, a wykresy renderowane bez
+        okna (opcjonalnie w puli `workers` procesów). Zwraca listę ścieżek.
+        """
+        groups = charts.group_daily(entries, by)
+        jobs = []
+        for key, daily in sorted(groups.items()):
+            path = os.path.join(directory, f"{by}_{safe_name(key)}.png")
+            jobs.append(charts.chart_job(daily, path, f"Czas pracy: {key}",
+                                         max_points))
+        if not jobs:
+            print("Brak danych do wykresu.")
+            return []
+        try:
+            paths = charts.render_batch(jobs, workers)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return []
+        print(f"✅ Zapisano {len(paths)} wykresów w {directory}")
+        return paths
@@ -0,0 +1,484 @@
+# services/api_server.py
+"""Serwer HTTP (asyncio, bez zewnętrznych bibliotek) nad DataManagerem.
+
+Wszystkie zmiany przechodzą przez jedno zadanie zapisujące (kolejka),
+które stosuje oczekujące zmiany porcjami i zapisuje je jednym save()
+w wątku. Odczyty obsługiwane są w pętli zdarzeń z niezmiennego widoku
+danych (ReadSnapshot), podmienianego po zapisie każdej porcji, więc nie
+czekają na zapis i nigdy nie sięgają do DataManagera zmienianego w tym
+czasie w wątku.
+
+Punkty końcowe (odpowiedzi w JSON):
+    GET    /entries?date=D | ?from=D&to=D | ?min_hours=H [&limit=N]
+    POST   /entries            dodanie wpisu (obiekt) lub wpisów (lista);
+                               409, gdy wpisy nachodzą na istniejące;
+                               zwraca id dodanych wpisów
+    GET    /entries/<id>       odczyt wpisu
+    PUT    /entries/<id>       zmiana godzin {"start": .., "end": ..}
+    DELETE /entries/<id>       usunięcie wpisu
+    GET    /analyze[?detailed=1]   statystyki
+
+Uruchomienie:
+    python -m services.api_server [--host H] [--port P] [--data PLIK]
+"""
+import argparse
+import asyncio
+from bisect import bisect_left, bisect_right
+from itertools import islice
+import json
+from urllib.parse import parse_qs, urlsplit
+from models.entry import make_entry
+from services.analytics import compute_stats
+from services.data_manager import ConflictError, DataManager, OverlapError
+from services.date_index import ordinal_of
+from services.importer import validate_batch
+from utils.validators import validate_date, validate_time
+
+# Największy przyjmowany rozmiar treści żądania (w bajtach)
+MAX_BODY = 1 << 20
+# Domyślnie najwięcej wpisów zwracanych przez wyszukiwanie
+SEARCH_LIMIT = 1000
+# Najwięcej zmian zapisywanych jednym save()
+WRITE_BATCH = 256
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request",
+           404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 413: "Payload Too Large",
+           422: "Unprocessable Entity", 500: "Internal Server Error"}
+
+
+class ApiError(Exception):
+    """Błąd żądania zwracany klientowi z podanym kodem HTTP."""
+
+    def __init__(self, status, message, details=None):
+        super().__init__(message)
+        self.status = status
+        self.details = details
+
+
+def entry_json(entry):
+    """Wpis jako słownik JSON z id (do edycji i usuwania)."""
+    return entry.to_dict()
+
+
+def _copy(entry):
+    return make_entry(entry.date, entry.start, entry.end,
+                      getattr(entry, "project", None), entry.id)
+
+
+class ReadSnapshot:
+    """Niezmienny widok danych, z którego obsługiwane są odczyty.
+
+    Zawiera kopie wpisów (id -> wpis, w kolejności wpisów), indeks dni
+    (numer dnia -> krotka id) i podsumowanie statystyk. Kolejny widok
+    kopiuje tylko wpisy zmienione w porcji; od nowa budowany jest, gdy
+    DataManager wczytał dane ponownie (zmiany innego procesu, konflikt).
+    Szczegółowe statystyki liczone są przy pierwszym żądaniu.
+    """
+
+    def __init__(self, by_id, days, summary, reloads):
+        # Konstruktor: słowniki przekazane na własność widoku
+        self.by_id = by_id
+        self.days = days
+        self.day_keys = sorted(days)
+        self.summary = summary
+        self.reloads = reloads
+        self.stats = None
+
+    @staticmethod
+    def build(data_manager):
+        """Buduje widok ze wszystkich wpisów DataManagera."""
+        by_id, days = {}, {}
+        for entry in data_manager.entries:
+            copy = by_id[entry.id] = _copy(entry)
+            ordinal = ordinal_of(copy.date)
+            if ordinal is not None:
+                days.setdefault(ordinal, []).append(copy.id)
+        days = {ordinal: tuple(ids) for ordinal, ids in days.items()}
+        return ReadSnapshot(by_id, days, data_manager.aggregates().summary(),
+                            data_manager.reloads)
+
+    def updated(self, data_manager, changed):
+        """Zwraca nowy widok z wpisami o id z `changed` wziętymi
+        z DataManagera (brak wpisu = usunięty)."""
+        if data_manager.reloads != self.reloads:
+            return ReadSnapshot.build(data_manager)
+        by_id, days = dict(self.by_id), dict(self.days)
+        for entry_id in changed:
+            old = by_id.get(entry_id)
+            try:
+                entry = _copy(data_manager.get_entry(entry_id))
+            except KeyError:
+                entry = None
+            if entry is None:
+                by_id.pop(entry_id, None)
+            else:
+                by_id[entry_id] = entry
+            if old is not None and (entry is None or entry.date != old.date):
+                ordinal = ordinal_of(old.date)
+                if ordinal is not None:
+                    ids = tuple(i for i in days[ordinal] if i != entry_id)
+                    if ids:
+                        days[ordinal] = ids
+                    else:
+                        del days[ordinal]
+            if entry is not None and (old is None or entry.date != old.date):
+                ordinal = ordinal_of(entry.date)
+                if ordinal is not None:
+                    days[ordinal] = days.get(ordinal, ()) + (entry_id,)
+        return ReadSnapshot(by_id, days, data_manager.aggregates().summary(),
+                            self.reloads)
+
+    def in_range(self, first, last):
+        """Wpisy z dni o numerach od `first` do `last` włącznie."""
+        keys = self.day_keys[bisect_left(self.day_keys, first):
+                             bisect_right(self.day_keys, last)]
+        return [self.by_id[i] for day in keys for i in self.days[day]]
+
+
+class ApiServer:
+    """Serwer HTTP z jednym zadaniem zapisującym zmiany.
+
+    DataManager używany jest tylko w wątku zadania zapisującego (jedna
+    porcja naraz); odczyty korzystają z bieżącego widoku `snapshot`.
+    """
+
+    def __init__(self, data_manager, write_batch=WRITE_BATCH):
+        # Konstruktor: dane, kolejka zapisu i widok tworzone w start()
+        self.data_manager = data_manager
+        self.write_batch = write_batch
+        self.snapshot = None
+        self._rebuild = False
+        self._changed = []
+        self.queue = None
+        self.server = None
+        self._writer_task = None
+        self.routes = {
+            ("GET", False): self.search,
+            ("POST", False): self.add,
+            ("GET", True): self.get,
+            ("PUT", True): self.edit,
+            ("DELETE", True): self.remove,
+        }
+
+    async def start(self, host="127.0.0.1", port=8080):
+        """Uruchamia serwer; zwraca (host, port), na którym nasłuchuje."""
+        self.snapshot = await asyncio.get_running_loop().run_in_executor(
+            None, ReadSnapshot.build, self.data_manager)
+        self.queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._write_loop())
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        """Zamyka serwer po zapisaniu zmian oczekujących w kolejce."""
+        self.server.close()
+        await self.server.wait_closed()
+        await self.queue.join()
+        self._writer_task.cancel()
+
+    # --- zapis: jedno zadanie, porcje zmian, jeden save() na porcję ---
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.write_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                results, snapshot = await loop.run_in_executor(
+                    None, self._write_batch, batch)
+                self.snapshot = snapshot
+                self._rebuild = False
+            except Exception as e:
+                # Nieudana budowa widoku: zostaje poprzedni, a kolejna
+                # porcja zbuduje widok od nowa
+                self._rebuild = True
+                results = [(future, None, ApiError(500, f"Błąd serwera: {e}"))
+                           for _, _, future in batch]
+            # Odpowiedzi dopiero po podmianie widoku: klient od razu
+            # odczyta własne zmiany
+            for future, result, error in results:
+                if not future.done():
+                    if error is None:
+                        future.set_result(result)
+                    else:
+                        future.set_exception(error)
+                self.queue.task_done()
+
+    def _write_batch(self, batch):
+        """Stosuje porcję zmian, zapisuje ją i buduje nowy widok (w wątku
+        zadania zapisującego); zwraca (lista (future, wynik, błąd), widok).
+        """
+        self._changed = []
+        try:
+            results = self._apply_batch(batch)
+        except Exception as e:
+            # Błąd odświeżania lub zapisu: odrzucana jest cała porcja
+            # (z ponownym wczytaniem danych)
+            self._discard_changes()
+            results = [(future, None, ApiError(500, f"Błąd zapisu: {e}"))
+                       for _, _, future in batch]
+        if self._rebuild:
+            return results, ReadSnapshot.build(self.data_manager)
+        changed = {entry.id for entry in self._changed}
+        return results, self.snapshot.updated(self.data_manager, changed)
+
+    def _apply_batch(self, batch):
+        # Zmiany zapisane w międzyczasie przez inne procesy
+        self.data_manager.refresh()
+        results = []
+        for op, args, future in batch:
+            try:
+                results.append((future, op(*args), None))
+            except ApiError as e:
+                results.append((future, None, e))
+            except Exception as e:
+                # Nieoczekiwany błąd jednej zmiany nie zatrzymuje zadania
+                results.append((future, None,
+                                ApiError(500, f"Błąd serwera: {e}")))
+        if all(error is not None for _, _, error in results):
+            return results
+        try:
+            self.data_manager.save()
+        except ConflictError as e:
+            # Edycja wpisu usuniętego przez inny proces: porcja
+            # jest odrzucana, a dane wczytywane ponownie
+            self._discard_changes()
+            conflict = ApiError(409, str(e))
+            return [(future, None, error or conflict)
+                    for future, _, error in results]
+        done = []
+        for future, result, error in results:
+            if error is None and callable(result):
+                # Wynik zależny od zapisu (id wpisów po scaleniu ze
+                # zmianami innego procesu) liczony po save()
+                try:
+                    result = result()
+                except Exception as e:
+                    result, error = None, ApiError(500, f"Błąd serwera: {e}")
+            done.append((future, result, error))
+        return done
+
+    def _discard_changes(self):
+        """Porzuca niezapisane zmiany, wczytując dane ponownie."""
+        try:
+            self.data_manager.reload()
+        except Exception as e:
+            print(f"❌ Błąd ponownego wczytania danych: {e}")
+
+    async def _submit(self, op, *args):
+        """Przekazuje zmianę do zadania zapisującego i czeka na wynik."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((op, args, future))
+        return await future
+
+    def _get(self, entry_id):
+        try:
+            return self.data_manager.get_entry(entry_id)
+        except KeyError:
+            raise ApiError(404, f"Brak wpisu o id {entry_id}")
+
+    def _add(self, entries):
+        _, overlapping = self.data_manager.partition_overlaps(entries)
+        if overlapping:
+            raise ApiError(409, "Wpisy nachodzą na istniejące", [
+                {"item": i, "reason": reason} for i, reason in overlapping])
+        self.data_manager.add_entries(entries, checked=True)
+        self._changed.extend(entries)
+        return lambda: {"added": len(entries),
+                        "ids": [entry.id for entry in entries]}
+
+    def _edit(self, entry_id, start, end):
+        self._get(entry_id)
+        try:
+            entry = self.data_manager.edit_by_id(entry_id, start, end)
+        except OverlapError as e:
+            raise ApiError(409, str(e))
+        self._changed.append(entry)
+        return entry_json(entry)
+
+    def _remove(self, entry_id):
+        self._get(entry_id)
+        entry = self.data_manager.remove_by_id(entry_id)
+        self._changed.append(entry)
+        return entry_json(entry)
+
+    # --- obsługa punktów końcowych ---
+
+    async def search(self, query, body, entry_id):
+        """Wyszukuje wpisy wg daty, zakresu dat lub czasu trwania."""
+        snapshot = self.snapshot
+        if "date" in query or "from" in query or "to" in query:
+            start = query.get("from", query.get("date"))
+            end = query.get("to", query.get("date"))
+            if not (start and end and validate_date(start)
+                    and validate_date(end)):
+                raise ApiError(400, "Niepoprawna data")
+            found = snapshot.in_range(ordinal_of(start), ordinal_of(end))
+        else:
+            found = snapshot.by_id.values()
+        if "min_hours" in query:
+            try:
+                minimum = float(query["min_hours"])
+            except ValueError:
+                raise ApiError(400, "Niepoprawna wartość min_hours")
+            found = [e for e in found if e.duration() >= minimum]
+        try:
+            limit = int(query.get("limit", SEARCH_LIMIT))
+        except ValueError:
+            limit = -1
+        if limit < 0:
+            raise ApiError(400, "Niepoprawna wartość limit")
+        return 200, {"count": len(found),
+                     "entries": [entry_json(e) for e in islice(found, limit)]}
+
+    async def add(self, query, body, entry_id):
+        """Dodaje wpis lub listę wpisów (wszystkie albo żaden)."""
+        records = body if isinstance(body, list) else [body]
+        if not all(isinstance(d, dict) for d in records):
+            raise ApiError(400, "Oczekiwano obiektu lub listy obiektów")
+        # Id nadaje serwer (pole "id" w treści jest pomijane)
+        rows = [(i, d.get("date"), d.get("start"), d.get("end"),
+                 d.get("project"), None) for i, d in enumerate(records)]
+        valid, rejected = validate_batch(rows)
+        if rejected:
+            raise ApiError(422, "Niepoprawne wpisy", [
+                {"item": i, "reason": reason} for i, reason in rejected])
+        entries = [make_entry(*row) for row in valid]
+        return 201, await self._submit(self._add, entries)
+
+    async def get(self, query, body, entry_id):
+        entry = self.snapshot.by_id.get(entry_id)
+        if entry is None:
+            raise ApiError(404, f"Brak wpisu o id {entry_id}")
+        return 200, entry_json(entry)
+
+    async def edit(self, query, body, entry_id):
+        """Zmienia godziny wpisu."""
+        if not isinstance(body, dict):
+            raise ApiError(400, "Oczekiwano obiektu JSON")
+        start, end = body.get("start"), body.get("end")
+        if not (isinstance(start, str) and validate_time(start) and
+                isinstance(end, str) and validate_time(end)):
+            raise ApiError(422, "Niepoprawny format godziny")
+        return 200, await self._submit(self._edit, entry_id, start, end)
+
+    async def remove(self, query, body, entry_id):
+        return 200, await self._submit(self._remove, entry_id)
+
+    async def analyze(self, query):
+        """Statystyki bieżącego widoku (szczegółowe liczone w wątku przy
+        pierwszym żądaniu i zapamiętywane w widoku)."""
+        snapshot = self.snapshot
+        if query.get("detailed") not in ("1", "true"):
+            return 200, snapshot.summary
+        if snapshot.stats is None:
+            loop = asyncio.get_running_loop()
+            snapshot.stats = await loop.run_in_executor(
+                None, compute_stats, list(snapshot.by_id.values()))
+        return 200, snapshot.stats
+
+    async def dispatch(self, method, target, body):
+        """Wybiera obsługę żądania; zwraca (kod HTTP, obiekt JSON)."""
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        parts = url.path.strip("/").split("/")
+        try:
+            if parts == ["analyze"]:
+                if method != "GET":
+                    raise ApiError(405, "Niedozwolona metoda")
+                return await self.analyze(query)
+            if parts[0] != "entries" or len(parts) > 2:
+                raise ApiError(404, "Nieznany adres")
+            entry_id = None
+            if len(parts) == 2:
+                try:
+                    entry_id = int(parts[1])
+                except ValueError:
+                    raise ApiError(404, "Niepoprawne id wpisu")
+            handler = self.routes.get((method, entry_id is not None))
+            if handler is None:
+                raise ApiError(405, "Niedozwolona metoda")
+            if body:
+                try:
+                    body = json.loads(body)
+                except ValueError:
+                    raise ApiError(400, "Niepoprawny JSON")
+            return await handler(query, body, entry_id)
+        except ApiError as e:
+            error = {"error": str(e)}
+            if e.details is not None:
+                error["details"] = e.details
+            return e.status, error
+        except Exception as e:
+            return 500, {"error": f"Błąd serwera: {e}"}
+
+    # --- protokół HTTP/1.1 (z utrzymywaniem połączenia) ---
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    method, target, _ = request_line.decode(
+                        "latin-1").split(" ", 2)
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    status, payload = 400, {"error": "Niepoprawne żądanie"}
+                    keep_alive = False
+                else:
+                    if length > MAX_BODY:
+                        status, payload = 413, {"error": "Za duże żądanie"}
+                        keep_alive = False
+                    else:
+                        body = await reader.readexactly(length)
+                        status, payload = await self.dispatch(
+                            method, target, body)
+                data = json.dumps(payload, ensure_ascii=False).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    "Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}"
+                    "\r\n\r\n".encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(filepath, host, port):
+    """Uruchamia serwer do przerwania (Ctrl+C)."""
+    server = ApiServer(DataManager(filepath, journal=True))
+    host, port = await server.start(host, port)
+    # Pierwsza linia wyjścia: adres serwera (m.in. dla benchmarku)
+    print(json.dumps({"host": host, "port": port}), flush=True)
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serwer HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--data", default="data/work_log.json")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.data, args.host, args.port))
+    except KeyboardInterrupt:
+        print("Serwer zatrzymany.")
@@ -0,0 +1,137 @@
+# services/charts.py
+# Renderowanie wykresów czasu pracy bez okna (backend Agg), z automatycznym
+# sumowaniem do tygodni lub miesięcy przy dużej liczbie dni oraz
+# wsadowym zapisem wielu wykresów (jedna figura na proces).
+from collections import defaultdict
+import os
+from services.aggregates import week_key
+from services.date_index import ordinal_of
+from utils.lazy_import import optional_import
+
+# Powyżej tylu słupków dane sumowane są do większych okresów
+MAX_POINTS = 120
+# Najwięcej podpisów na osi X
+MAX_LABELS = 24
+GRANULARITIES = ("day", "week", "month")
+LABELS = {"day": "dzienny", "week": "tygodniowy", "month": "miesięczny"}
+
+
+def has_display():
+    """Czy dostępny jest ekran (okno wykresu może zostać pokazane)."""
+    if os.name == "nt":
+        return True
+    return bool(os.environ.get("DISPLAY") or
+                os.environ.get("WAYLAND_DISPLAY"))
+
+
+def pyplot(headless=True):
+    """Zwraca moduł matplotlib.pyplot (lub None, gdy brak pakietu).
+
+    W trybie `headless` wybierany jest backend Agg, który tylko zapisuje
+    pliki i nie wymaga ekranu.
+    """
+    matplotlib = optional_import("matplotlib")
+    if matplotlib is None:
+        return None
+    if headless:
+        matplotlib.use("Agg")
+    return optional_import("matplotlib.pyplot")
+
+
+def downsample(daily, granularity):
+    """Sumuje godziny dzienne (data -> godziny) do tygodni lub miesięcy."""
+    if granularity == "day":
+        return dict(daily)
+    summed = defaultdict(float)
+    for day, hours in daily.items():
+        if granularity == "month":
+            summed[day[:7]] += hours
+        else:
+            ordinal = ordinal_of(day)
+            if ordinal is not None:
+                summed[week_key(ordinal)] += hours
+    return summed
+
+
+def choose_granularity(daily, max_points=MAX_POINTS):
+    """Wybiera najdrobniejszy okres, w którym wykres ma <= max_points."""
+    for granularity in GRANULARITIES[:-1]:
+        if len(downsample(daily, granularity)) <= max_points:
+            return granularity
+    return GRANULARITIES[-1]
+
+
+def chart_job(daily, path, title, max_points=MAX_POINTS):
+    """Przygotowuje zadanie wykresu (słownik) z danych dziennych."""
+    granularity = choose_granularity(daily, max_points)
+    series = downsample(daily, granularity)
+    keys = sorted(series)
+    return {"path": path, "keys": keys,
+            "hours": [series[k] for k in keys],
+            "title": f"{title} ({LABELS[granularity]})"}
+
+
+def draw(fig, job):
+    """Rysuje zadanie na (wyczyszczonej) figurze i zapisuje do pliku."""
+    fig.clf()
+    ax = fig.add_subplot()
+    positions = range(len(job["keys"]))
+    ax.bar(positions, job["hours"], color="skyblue")
+    step = max(1, -(-len(job["keys"]) // MAX_LABELS))
+    ax.set_xticks(positions[::step])
+    ax.set_xticklabels(job["keys"][::step], rotation=45, ha="right")
+    ax.set_xlabel("Okres")
+    ax.set_ylabel("Godziny pracy")
+    ax.set_title(job["title"])
+    fig.tight_layout()
+    directory = os.path.dirname(job["path"])
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fig.savefig(job["path"])
+
+
+def render_jobs(jobs):
+    """Renderuje zadania na jednej, wielokrotnie używanej figurze."""
+    plt = pyplot(headless=True)
+    fig = plt.figure(figsize=(10, 5))
+    try:
+        for job in jobs:
+            draw(fig, job)
+    finally:
+        plt.close(fig)
+    return [job["path"] for job in jobs]
+
+
+def render_batch(jobs, workers=None):
+    """Renderuje wiele wykresów; zwraca listę zapisanych ścieżek.
+
+    Przy `workers` > 1 zadania dzielone są między procesy, a każdy
+    proces używa własnej figury.
+    """
+    if pyplot(headless=True) is None:
+        raise RuntimeError("Wykresy wymagają pakietu matplotlib")
+    jobs = list(jobs)
+    if not workers or workers <= 1 or len(jobs) <= 1:
+        return render_jobs(jobs)
+    from concurrent.futures import ProcessPoolExecutor
+    parts = [jobs[i::workers] for i in range(workers)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        done = pool.map(render_jobs, [part for part in parts if part])
+        return sorted(path for paths in done for path in paths)
+
+
+def group_daily(entries, by):
+    """Grupuje godziny dzienne wg projektu lub miesiąca.
+
+    Zwraca słownik grupa -> (data -> godziny), liczony w jednym przebiegu.
+    """
+    groups = defaultdict(lambda: defaultdict(float))
+    for e in entries:
+        if by == "project":
+            key = getattr(e, "project", None) or "bez_projektu"
+        elif by == "month":
+            key = e.date[:7]
+        else:
+            raise ValueError(f"Nieznane grupowanie: {by}")
+        groups[key][e.date] += e.duration()
+    return groups
@@ -1,36 +1,1215 @@
 # services/data_manager.py
 import json
 import os
-from models.entry import WorkEntry
+import tempfile
+from models.entry import MINUTES_PER_DAY, WorkEntry, entry_from_dict
+from services.entry_store import EntryStore, NO_DAY
+from services.date_index import DateIndex, ordinal_of, month_bounds
+from services.aggregates import Aggregates, DIMENSIONS
+from services.interval_index import IntervalIndex, find_overlaps, interval_of
+from services.storage import SqliteStorage, is_sqlite_path
+from services.locking import FileLock
+from services.reports import MONTHLY_PERIODS, pivot, pivot_from_aggregates
+from services.rollups import BIWEEK_ANCHOR, DAILY_NORM, Rollup
+from services.slots import SlotTable
+from utils.instrumentation import instrument
+
+
+def atomic_write(path, write):
+    """Zapisuje plik atomowo: plik tymczasowy + fsync + rename.
+
+    `write` to funkcja przyjmująca otwarty plik tekstowy. Przy awarii
+    w trakcie zapisu poprzednia wersja pliku pozostaje nienaruszona.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "w") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    sync_directory(directory)
+
+
+def sync_directory(directory):
+    """Utrwala wpisy katalogu (zmiany nazw, usunięcia) na dysku."""
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class ConflictError(Exception):
+    """Dane w pliku zmienił inny proces, a lokalnych zmian nie da się
+    z nimi scalić (np. edytowany wpis usunął inny proces)."""
+
+
+class OverlapError(ValueError):
+    """Wpis nachodzi na inny wpis (przedziały czasu się pokrywają)."""
+
+
+def iter_json_array(f, chunk_size=1 << 16):
+    """Strumieniowo zwraca kolejne elementy tablicy JSON z pliku.
+
+    Plik czytany jest porcjami po `chunk_size` znaków, więc pamięć nie
+    zależy od rozmiaru całej tablicy.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof, started = "", 0, False, False
+    while True:
+        # Pominięcie białych znaków i przecinków między elementami
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buf):
+            if not started:
+                if buf[pos] != "[":
+                    raise ValueError("Oczekiwano tablicy JSON")
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                obj, pos = decoder.raw_decode(buf, pos)
+            except ValueError:
+                # Element niekompletny - trzeba doczytać kolejną porcję
+                if eof:
+                    raise
+            else:
+                yield obj
+                continue
+        elif eof:
+            raise ValueError("Niekompletna tablica JSON")
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+
+
+def _loaded_count(result, args):
+    """Liczba wpisów w pamięci DataManagera (do pomiarów save)."""
+    manager = args[0]
+    return len(manager._table) if manager.loaded else None
+
+
+def iter_json_lines(f):
+    """Strumieniowo zwraca rekordy z pliku JSON Lines."""
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _as_entry(value):
+    """Zwraca wpis z rekordu zmiany (słownik z dziennika lub obiekt)."""
+    return entry_from_dict(value) if isinstance(value, dict) else value
+
+
+def _position(table, record):
+    """Pozycja wpisu z rekordu edycji lub usunięcia: wg id, a w dzienniku
+    sprzed wprowadzenia id - wg indeksu na liście bez nagrobków."""
+    if "id" in record:
+        return table.position(record["id"])
+    table.reclaim()
+    return record["index"]
+
+
+def _last_line_start(f, end, chunk_size=1 << 16):
+    """Zwraca pozycję początku ostatniego wiersza pliku binarnego."""
+    pos = end
+    while pos > 0:
+        size = min(chunk_size, pos)
+        f.seek(pos - size)
+        newline = f.read(size).rfind(b"\n")
+        if newline >= 0:
+            return pos - size + newline + 1
+        pos -= size
+    return 0
+
+
+def _added(record):
+    """Zwraca wpisy dodawane przez rekord zmiany (pusta lista dla edycji
+    i usunięcia)."""
+    if "entry" in record:
+        return [record["entry"]]
+    return record.get("entries", [])
+
+
+def _days_around(entries):
+    """Numery dni, na których mogą leżeć wpisy nachodzące na `entries`
+    (dzień wpisu oraz dni sąsiednie)."""
+    days = set()
+    for entry in entries:
+        interval = interval_of(entry)
+        if interval is not None:
+            day = interval[0] // MINUTES_PER_DAY
+            days.update((day - 1, day, day + 1))
+    return days
+
+
+def _serialize(record):
+    """Zamienia rekord zmiany na wiersz JSON dziennika."""
+    record = dict(record)
+    if "entry" in record:
+        record["entry"] = record["entry"].to_dict()
+    if "entries" in record:
+        record["entries"] = [e.to_dict() for e in record["entries"]]
+    return json.dumps(record)
 
 
 class DataManager:
     """Zarządza zapisem i odczytem wpisów czasu pracy."""
 
-    def __init__(self, filepath):
+    def __init__(self, filepath, columnar=False, journal=False,
+                 compact_every=1000, lazy=False, storage=None,
+                 allow_overlaps=False):
         # Konstruktor klasy DataManager
         self.filepath = filepath
-        self.entries = self.load()
+        # Zewnętrzny magazyn (np. SQLite dla plików *.db); None = plik JSON
+        if storage is None and is_sqlite_path(filepath):
+            storage = SqliteStorage(filepath)
+        self.storage = storage
+        self._replace_storage = False
+        # Tryb kolumnowy: wpisy w EntryStore zamiast listy obiektów
+        self.columnar = columnar
+        # Tryb dziennika: save() dopisuje tylko zmiany (JSON Lines)
+        self.journal = journal
+        self.journal_path = filepath + ".journal"
+        # Nowa migawka przed usunięciem scalonego dziennika; jeśli istnieje,
+        # to ona (a nie plik główny z dziennikiem) jest aktualnym stanem
+        self.compacting_path = filepath + ".compacting"
+        # Po tylu rekordach dziennik jest scalany do pliku głównego
+        self.compact_every = compact_every
+        self._pending = []
+        self._journal_size = 0
+        # Następne id dla wpisów dopisywanych bez wczytywania pliku
+        # (potwierdzane pod blokadą wyłączną przy zapisie)
+        self._append_id = 0
+        # Koniec ostatniego poprawnego rekordu dziennika, gdy za nim jest
+        # urwany rekord (obcinany przed dopisaniem kolejnych)
+        self._journal_tear = None
+        # Blokada między procesami i numer generacji danych (plik *.lock);
+        # _seen to stan plików z chwili ostatniego wczytania lub zapisu
+        self._lock = FileLock(filepath + ".lock")
+        self._seen = None
+        self._replaced = False
+        # Plik *.jsonl przechowuje po jednym wpisie w wierszu
+        self.json_lines = filepath.endswith(".jsonl")
+        # Indeks dat budowany przy pierwszym wyszukiwaniu
+        self._date_index = None
+        # Indeks przedziałów czasu (wykrywanie nakładających się wpisów);
+        # allow_overlaps wyłącza sprawdzanie przy dodawaniu i edycji
+        self._interval_index = None
+        self.allow_overlaps = allow_overlaps
+        # Sumy czasu pracy zapisywane obok migawki (plik *.agg)
+        self.aggregates_path = filepath + ".agg"
+        self._aggregates = None
+        # Stan plików, z którego policzono sumy przed wczytaniem wpisów
+        # (nieaktualne sumy są porzucane przy wczytaniu lub refresh())
+        self._aggregates_stamp = None
+        # Wersja danych rośnie przy każdej zmianie wpisów; pod nią
+        # zapamiętywane jest drzewo podsumowań okresów (rollup)
+        self.version = 0
+        self._rollup = None
+        # Liczba podmian całej tablicy wpisów (wczytanie z pliku lub
+        # przypisanie entries); pozwala odróżnić je od pojedynczych zmian
+        self.reloads = 0
+        # Tryb leniwy: wpisy wczytywane dopiero przy pierwszym użyciu
+        # (magazyn zewnętrzny zawsze działa leniwie)
+        lazy = lazy or storage is not None
+        self._table = None if lazy else self.load()
 
-    def load(self):
-        """Wczytuje dane z pliku."""
+    def _loaded(self):
+        """Zwraca SlotTable z wpisami, wczytując je przy pierwszym użyciu
+        (kontener może zawierać nagrobki usuniętych wpisów)."""
+        if self._table is None:
+            if self._pending:
+                # Wpisy dopisane przed wczytaniem (_appending) trafiają
+                # na wczytane dane jak przy scalaniu
+                self._reload_merged()
+            else:
+                self._table = self.load()
+            if self.storage is None and self._aggregates_stamp != self._seen:
+                # Sumy sprzed zmian innego procesu nie obejmują ich
+                self._drop_aggregates()
+        return self._table
+
+    def _drop_aggregates(self):
+        """Porzuca sumy i drzewo podsumowań (policzone zostaną od nowa)."""
+        self._aggregates = None
+        self._aggregates_stamp = None
+        self._rollup = None
+
+    def _drop_stale_aggregates(self):
+        """Porzuca sumy policzone przed wczytaniem wpisów, jeśli od tego
+        czasu dane zmienił inny proces; zwraca True, gdy je porzucono."""
+        if self._aggregates is None or \
+                self._aggregates_stamp == self._stamp():
+            return False
+        self._drop_aggregates()
+        return True
+
+    @property
+    def entries(self):
+        """Lista wpisów (w trybie leniwym wczytywana przy pierwszym użyciu).
+
+        Pozycje na liście mogą się zmieniać przy usuwaniu wpisów; stałym
+        identyfikatorem wpisu jest jego id (get_entry, edit_by_id,
+        remove_by_id).
+        """
+        table = self._loaded()
+        if table.reclaim():
+            # Pozycje się przesunęły - indeksy zostaną zbudowane od nowa
+            self._date_index = None
+            self._interval_index = None
+        return table.entries
+
+    @entries.setter
+    def entries(self, value):
+        # Id usuniętych wpisów nie wracają także po zastąpieniu listy
+        self._table = SlotTable(value, self._id_floor())
+        self.reloads += 1
+        self._date_index = None
+        self._interval_index = None
+        self._aggregates = None
+        self.version += 1
+        # Całą zawartość pliku zastąpi ta lista (bez scalania)
+        self._replaced = True
+        # Magazyn zostanie nadpisany całą listą przy najbliższym save()
+        self._replace_storage = self.storage is not None
+
+    def _in_memory(self):
+        """Czy zmiany trzeba nanosić na listę wpisów w pamięci."""
+        return self.storage is None or self.loaded
+
+    @property
+    def loaded(self):
+        """Czy wpisy zostały już wczytane do pamięci."""
+        return self._table is not None
+
+    def iter_entries(self):
+        """Zwraca wpisy do odczytu bez wczytywania całego pliku do pamięci.
+
+        Gdy wpisy są już w pamięci lub istnieje dziennik zmian (wymagający
+        odtworzenia na pełnej liście), zwraca kontener wpisów, a w
+        przeciwnym razie generator czytający plik strumieniowo.
+        """
+        if self.loaded or self._pending or \
+                os.path.exists(self.journal_path) or \
+                os.path.exists(self.compacting_path):
+            return self.entries
+        if self.storage is not None:
+            return self.storage.iter_entries()
+        return self._stream_entries()
+
+    def _stream_entries(self):
+        """Generator wpisów czytanych strumieniowo z pliku."""
         if not os.path.exists(self.filepath):
-            return []
+            return
         try:
             with open(self.filepath, "r") as f:
-                data = json.load(f)
-                # Tworzenie listy obiektów WorkEntry
-                # na podstawie danych z pliku
-                return [WorkEntry.from_dict(e) for e in data]
+                for d in self._iter_records(f):
+                    yield entry_from_dict(d)
+        except Exception as e:
+            print(f"Błąd wczytywania danych: {e}")
+
+    def _iter_records(self, f):
+        """Strumieniowo zwraca słowniki wpisów z otwartego pliku."""
+        if self.json_lines:
+            return iter_json_lines(f)
+        return iter_json_array(f)
+
+    def _empty(self):
+        """Zwraca pusty kontener wpisów dla bieżącego trybu."""
+        return EntryStore() if self.columnar else []
+
+    @instrument("data.load", entries=lambda result, args: len(result))
+    def load(self):
+        """Wczytuje dane z pliku (migawka + ewentualny dziennik zmian).
+
+        Zwraca SlotTable; wpisy bez id (pliki sprzed wprowadzenia id)
+        dostają kolejne id w kolejności z pliku.
+        """
+        self.reloads += 1
+        if self.storage is not None:
+            floor = self.storage.next_id()
+            if self.columnar:
+                return SlotTable(EntryStore(self.storage.iter_entries()),
+                                 floor)
+            return SlotTable(list(self.storage.iter_entries()), floor)
+        if not (os.path.exists(self.filepath) or
+                os.path.exists(self.journal_path) or
+                os.path.exists(self.compacting_path)):
+            # Brak danych: nie ma czego chronić blokadą
+            self._seen = self._stamp()
+            return SlotTable(self._empty(), self._lock.next_id())
+        with self._lock.hold():
+            if os.path.exists(self.compacting_path):
+                # Przerwane kompaktowanie: nowa migawka zawiera już cały
+                # dziennik (dokończy je najbliższy zapis)
+                table = SlotTable(self._load_snapshot(self.compacting_path),
+                                  self._lock.next_id())
+                self._journal_size = 0
+            else:
+                table = SlotTable(self._load_snapshot(),
+                                  self._lock.next_id())
+                self._journal_size = self._replay_journal(table)
+            self._seen = self._stamp()
+        return table
+
+    def _load_snapshot(self, path=None):
+        """Wczytuje migawkę danych z pliku głównego (lub z `path`)."""
+        path = path or self.filepath
+        if not os.path.exists(path):
+            return self._empty()
+        try:
+            with open(path, "r") as f:
+                if self.json_lines:
+                    data = iter_json_lines(f)
+                else:
+                    data = json.load(f)
+                return self._build(data)
         except Exception as e:
             print(f"Błąd wczytywania danych: {e}")
+            return self._empty()
+
+    def _build(self, records):
+        """Tworzy kontener wpisów na podstawie słowników z pliku."""
+        # Tworzenie listy obiektów WorkEntry/ProjectWorkEntry
+        # na podstawie danych z pliku
+        if not self.columnar:
+            return [entry_from_dict(e) for e in records]
+        # Błędne wpisy zostają w magazynie (jak na liście), by zapis
+        # ich nie usunął
+        return EntryStore(entry_from_dict(d) for d in records)
+
+    def _replay_journal(self, table):
+        """Odtwarza zmiany z dziennika; zwraca liczbę rekordów.
+
+        Przy urwanym rekordzie zapamiętuje pozycję (w bajtach) końca
+        ostatniego poprawnego, by _append_journal() obciął tam plik.
+        """
+        self._journal_tear = None
+        if not os.path.exists(self.journal_path):
+            return 0
+        count = good = 0
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Urwany ostatni rekord (awaria w trakcie zapisu)
+                    print("Pominięto uszkodzony rekord dziennika.")
+                    self._journal_tear = good
+                    break
+                self._apply(table, record)
+                count += 1
+                good += len(line)
+        return count
+
+    def _repair_journal(self):
+        """Obcina urwany rekord z końca dziennika i uzupełnia brakujący
+        znak nowego wiersza (wywoływane pod blokadą wyłączną)."""
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, "rb+") as f:
+            if self._journal_tear is not None:
+                f.truncate(self._journal_tear)
+                self._journal_tear = None
+            end = f.seek(0, os.SEEK_END)
+            if end:
+                f.seek(end - 1)
+                if f.read(1) != b"\n":
+                    # Dziennik nieodtworzony (dopisywanie bez wczytania):
+                    # ostatni wiersz bez znaku nowego wiersza sprawdzany
+                    # jest tutaj
+                    start = _last_line_start(f, end)
+                    f.seek(start)
+                    try:
+                        json.loads(f.read())
+                    except ValueError:
+                        f.truncate(start)
+                    else:
+                        f.write(b"\n")
+
+    def _scan(self, days):
+        """Zwraca wpisy z dni o numerach ze zbioru `days` (zbiór lub
+        range), czytane
+        strumieniowo z migawki i dziennika (w pamięci tylko te wpisy).
+
+        Zwraca None, gdy dziennika nie da się odtworzyć na części wpisów
+        (rekordy wg pozycji lub wpisy bez id z plików sprzed wprowadzenia
+        id) albo pliku nie da się przeczytać - wtedy potrzebne jest pełne
+        wczytanie.
+        """
+        found = {}
+        try:
+            with self._lock.hold():
+                compacting = os.path.exists(self.compacting_path)
+                path = self.compacting_path if compacting else self.filepath
+                if os.path.exists(path):
+                    with open(path, "r") as f:
+                        for d in self._iter_records(f):
+                            if not self._scan_add(found, d, days):
+                                return None
+                if compacting or not os.path.exists(self.journal_path):
+                    return list(found.values())
+                with open(self.journal_path, "rb") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            break  # urwany ostatni rekord
+                        if not self._scan_record(found, record, days):
+                            return None
+        except (OSError, ValueError):
+            return None
+        return list(found.values())
+
+    @staticmethod
+    def _scan_add(found, d, days):
+        if d.get("id") is None:
+            return False
+        ordinal = ordinal_of(d.get("date"))
+        if ordinal is not None and ordinal in days:
+            found[d["id"]] = entry_from_dict(d)
+        return True
+
+    def _scan_record(self, found, record, days):
+        """Nanosi rekord dziennika na wpisy z wybranych dni; zwraca False,
+        gdy rekord wskazuje wpis pozycją (wymaga pełnego wczytania)."""
+        op = record["op"]
+        if op in ("add", "add_many"):
+            return all(self._scan_add(found, d, days)
+                       for d in _added(record))
+        if "id" not in record:
+            return False
+        if op == "edit" and record["id"] in found:
+            entry = found[record["id"]]
+            entry.start = record["start"]
+            entry.end = record["end"]
+        elif op == "remove":
+            found.pop(record["id"], None)
+        return True
+
+    @staticmethod
+    def _apply(table, record):
+        """Stosuje pojedynczy rekord zmiany do SlotTable.
+
+        Rekordy z dziennika zawierają słowniki wpisów, a niezapisane
+        zmiany (scalane po zmianach innego procesu) - obiekty wpisów.
+        Edycja nieistniejącego wpisu zgłasza KeyError.
+        """
+        op = record["op"]
+        if op == "add":
+            table.append(_as_entry(record["entry"]))
+        elif op == "add_many":
+            for d in record["entries"]:
+                table.append(_as_entry(d))
+        elif op == "edit":
+            pos = _position(table, record)
+            entry = table.entries[pos]
+            entry.start = record["start"]
+            entry.end = record["end"]
+            table.entries[pos] = entry
+        elif op == "remove":
+            # Wpis usunięty już wcześniej (np. przez inny proces) pomijamy
+            if "id" not in record or record["id"] in table:
+                table.remove_at(_position(table, record))
+        else:
+            raise ValueError(f"Nieznana operacja dziennika: {op}")
+
+    def _record(self, op, **fields):
+        """Przekazuje zmianę do magazynu lub zapamiętuje ją do zapisu
+        przy najbliższym save() (dziennik lub scalanie przy konflikcie).
+
+        Wpisy serializowane są dopiero przy zapisie dziennika, więc id
+        zmienione przy scalaniu trafia i do pliku, i do obiektu wpisu.
+        """
+        self.version += 1
+        if self.storage is not None:
+            if not self._replace_storage:
+                self.storage.apply(dict(op=op, **fields))
+            return
+        self._pending.append(dict(op=op, **fields))
+
+    # --- indeks dat ---
+
+    def _index(self):
+        """Zwraca indeks dat, budując go przy pierwszym użyciu.
+
+        Pozycje w indeksie to sloty SlotTable (usunięte wpisy są z niego
+        wyjmowane, więc nagrobki nie są zwracane).
+        """
+        if self._date_index is None:
+            entries = self.entries  # bez nagrobków
+            if isinstance(entries, EntryStore):
+                ordinals = (None if o == NO_DAY else o
+                            for o in entries.ordinals())
+            else:
+                ordinals = (ordinal_of(e.date) for e in entries)
+            self._date_index = DateIndex(ordinals)
+        return self._date_index
+
+    def find_by_date(self, date_str):
+        """Zwraca wpisy z podanego dnia (YYYY-MM-DD)."""
+        return self.find_range(date_str, date_str)
+
+    def find_range(self, start, end):
+        """Zwraca wpisy z dni od `start` do `end` włącznie (YYYY-MM-DD)."""
+        first, last = ordinal_of(start), ordinal_of(end)
+        if first is None or last is None:
             return []
+        return list(self._iter_ordinals(first, last))
+
+    def iter_range(self, start, end):
+        """Generator wpisów z dni od `start` do `end` włącznie.
 
+        Przed wczytaniem wpisów plik JSON czytany jest strumieniowo (wpisy
+        w kolejności z pliku), więc pamięć nie zależy od rozmiaru rejestru;
+        przy dzienniku zmian w pamięci trzymane są tylko wpisy z zakresu
+        (zwracane wg dni).
+        """
+        first, last = ordinal_of(start), ordinal_of(end)
+        if first is None or last is None:
+            return
+        if self.storage is None and not self.loaded and not self._pending:
+            if not (os.path.exists(self.journal_path) or
+                    os.path.exists(self.compacting_path)):
+                for entry in self._stream_entries():
+                    ordinal = ordinal_of(entry.date)
+                    if ordinal is not None and first <= ordinal <= last:
+                        yield entry
+                return
+            found = self._scan(range(first, last + 1))
+            if found is not None:
+                found.sort(key=lambda e: ordinal_of(e.date))
+                yield from found
+                return
+        yield from self._iter_ordinals(first, last)
+
+    def positions_in_range(self, start, end):
+        """Zwraca indeksy wpisów (w self.entries) z dni od `start` do `end`."""
+        first, last = ordinal_of(start), ordinal_of(end)
+        if first is None or last is None:
+            return []
+        self.entries  # usunięcie nagrobków: pozycje jak w self.entries
+        return list(self._index().find_range(first, last))
+
+    def position_from_date(self, date_str):
+        """Zwraca pozycję pierwszego wpisu z dnia >= `date_str` (indeks dat;
+        None, gdy takiego wpisu nie ma lub data jest błędna)."""
+        ordinal = ordinal_of(date_str)
+        if ordinal is None:
+            return None
+        self.entries
+        return self._index().first_from(ordinal)
+
+    def _iter_ordinals(self, first, last):
+        """Wpisy z dni o numerach od `first` do `last` włącznie."""
+        if self.storage is not None and not self._replace_storage:
+            # Zapytanie SQL korzystające z indeksu na kolumnie ordinal
+            yield from self.storage.find_range(first, last)
+            return
+        index = self._index()
+        entries = self._table.entries
+        for p in index.find_range(first, last):
+            yield entries[p]
+
+    def find_month(self, month):
+        """Zwraca wpisy z miesiąca YYYY-MM."""
+        try:
+            first, last = month_bounds(month)
+        except ValueError:
+            return []
+        return list(self._iter_ordinals(first, last))
+
+    def filter_min_hours(self, hours):
+        """Zwraca wpisy trwające co najmniej `hours` godzin."""
+        if self.storage is not None and not self._replace_storage:
+            return list(self.storage.filter_min_minutes(hours * 60))
+        return [e for e in self.iter_entries() if e.duration() >= hours]
+
+    # --- nakładające się wpisy ---
+
+    def _intervals(self):
+        """Zwraca indeks przedziałów, budując go przy pierwszym użyciu
+        (pozycje to sloty SlotTable, jak w indeksie dat)."""
+        if self._interval_index is None:
+            self._interval_index = IntervalIndex(self.entries)
+        return self._interval_index
+
+    def overlaps(self, entry, ignore=None):
+        """Zwraca wpisy nachodzące na `entry` (bez wpisu o id `ignore`).
+
+        W pamięci korzysta z indeksu przedziałów (O(log n)); w magazynie
+        zewnętrznym i przed wczytaniem pliku (_appending) pobiera tylko
+        wpisy z sąsiednich dni.
+        """
+        nearby = None
+        if not self._in_memory():
+            interval = interval_of(entry)
+            if interval is None:
+                return []
+            day = interval[0] // MINUTES_PER_DAY
+            nearby = list(self.storage.find_range(day - 1, day + 1))
+        elif self._appending([entry]):
+            nearby = self._scan(_days_around([entry]))
+        if nearby is None:
+            index = self._intervals()
+            table = self._table
+            skip = None if ignore is None else table.position(ignore)
+            return [table.entries[p] for p in index.conflicts(entry, skip)]
+        nearby = [e for e in nearby if ignore is None or e.id != ignore]
+        return [nearby[p] for p in IntervalIndex(nearby).conflicts(entry)]
+
+    @staticmethod
+    def _overlap_reason(entry, found):
+        return (f"wpis {entry.date} {entry.start}-{entry.end} nachodzi "
+                f"na wpis {found[0]}")
+
+    def _check_overlap(self, entry, ignore=None):
+        """Zgłasza OverlapError, gdy wpis nachodzi na istniejący."""
+        if self.allow_overlaps:
+            return
+        found = self.overlaps(entry, ignore)
+        if found:
+            raise OverlapError(self._overlap_reason(entry, found))
+
+    def partition_overlaps(self, entries):
+        """Dzieli nowe wpisy na (przyjęte, odrzucone).
+
+        Odrzucone to pary (nr na liście `entries`, powód) dla wpisów
+        nachodzących na istniejące lub na wcześniejsze z tej samej listy.
+        """
+        if self.allow_overlaps:
+            return list(entries), []
+        accepted, rejected = [], []
+        batch = IntervalIndex()
+        # Przed wczytaniem pliku: jeden odczyt dni sąsiednich dla porcji
+        known = None
+        if self._appending(entries):
+            known = self._scan(_days_around(entries))
+        if known is not None:
+            existing = IntervalIndex(known)
+        elif self._in_memory():
+            existing, known = self._intervals(), self._table.entries
+        else:
+            existing = None
+        for i, entry in enumerate(entries):
+            interval = interval_of(entry)
+            if interval is None:
+                accepted.append(entry)
+                continue
+            if existing is not None:
+                found = [known[p] for p in existing.find(*interval)]
+            else:
+                found = self.overlaps(entry)
+            found = found or [accepted[p] for p in batch.find(*interval)]
+            if found:
+                rejected.append((i, self._overlap_reason(entry, found)))
+            else:
+                batch.insert(*interval, len(accepted))
+                accepted.append(entry)
+        return accepted, rejected
+
+    def audit(self):
+        """Sprawdza cały rejestr w O(n log n); zwraca listę kolizji.
+
+        Kolizja to krotka (pozycja_a, pozycja_b, minuty_wspólne).
+        """
+        return find_overlaps(self.iter_entries())
+
+    # --- sumy czasu pracy ---
+
+    def aggregates(self):
+        """Zwraca bieżące sumy czasu pracy (Aggregates).
+
+        Sumy są wczytywane z pliku *.agg, jeśli odpowiada on migawce
+        i dziennikowi, a w pamięci nie ma niezapisanych zmian (plik ich
+        nie obejmuje); w przeciwnym razie liczone w jednym przebiegu.
+        """
+        if self._aggregates is None:
+            if not self.loaded:
+                # Stan plików sprzed odczytu: zmiana w trakcie odczytu też
+                # unieważni sumy
+                self._aggregates_stamp = self._stamp()
+            if self.storage is not None and not self._replace_storage:
+                self._aggregates = self.storage.aggregates()
+            elif not (self._pending or self._replaced):
+                self._aggregates = self._load_aggregates()
+        if self._aggregates is None:
+            self._aggregates = Aggregates(self.iter_entries())
+        return self._aggregates
+
+    def project_report(self, period="month"):
+        """Zwraca tabelę przestawną projekt × okres (PivotReport).
+
+        Miesiące, kwartały i lata składane są z utrzymywanych sum projekt
+        × miesiąc (bez czytania wpisów), dni i tygodnie liczone w jednym
+        przebiegu po wpisach.
+        """
+        if period in MONTHLY_PERIODS:
+            return pivot_from_aggregates(self.aggregates(), period)
+        return pivot(self.iter_entries(), period)
+
+    def rollup(self, norm=DAILY_NORM, anchor=BIWEEK_ANCHOR):
+        """Zwraca drzewo podsumowań okresów (Rollup) dla dziennej normy
+        `norm` godzin.
+
+        Drzewo składane jest z dziennych sum (bez czytania wpisów)
+        i zapamiętywane pod bieżącą wersją danych, więc kolejne raporty
+        aż do zmiany wpisów nie liczą niczego od nowa.
+        """
+        key = (self.version, norm, anchor)
+        if self._rollup is None or self._rollup[0] != key:
+            self._rollup = (key, Rollup.from_aggregates(self.aggregates(),
+                                                        norm, anchor))
+        return self._rollup[1]
+
+    def _fingerprint(self):
+        """Zwraca [rozmiar, mtime] migawki i liczbę rekordów dziennika."""
+        snapshot = None
+        if os.path.exists(self.filepath):
+            st = os.stat(self.filepath)
+            snapshot = [st.st_size, st.st_mtime_ns]
+        if self.loaded:
+            journal = self._journal_size
+        else:
+            journal = self._count_journal()
+        # Lista wymiarów unieważnia pliki *.agg sprzed zmiany wymiarów
+        return {"snapshot": snapshot, "journal": journal,
+                "dimensions": list(DIMENSIONS)}
+
+    def _load_aggregates(self):
+        """Wczytuje sumy z pliku *.agg (None gdy brak lub nieaktualne)."""
+        if not os.path.exists(self.aggregates_path):
+            return None
+        try:
+            with open(self.aggregates_path, "r") as f:
+                data = json.load(f)
+            if data["fingerprint"] != self._fingerprint():
+                return None
+            return Aggregates.from_dict(data["aggregates"])
+        except Exception as e:
+            print(f"Błąd wczytywania sum: {e}")
+            return None
+
+    def _save_aggregates(self):
+        """Zapisuje sumy wraz z odciskiem migawki i dziennika."""
+        data = {"fingerprint": self._fingerprint(),
+                "aggregates": self.aggregates().to_dict()}
+        atomic_write(self.aggregates_path, lambda f: json.dump(data, f))
+
+    # --- operacje na wpisach ---
+
+    def _insert(self, entry):
+        """Dopisuje wpis w pamięci (nadając mu id) i w indeksach."""
+        pos = self._table.append(entry)
+        if self._date_index is not None:
+            self._date_index.add(pos, ordinal_of(entry.date))
+        if self._interval_index is not None:
+            self._interval_index.add(pos, entry)
+
+    def _id_floor(self):
+        """Zwraca najmniejsze id, jakie może dostać nowy wpis (większe od
+        id wszystkich wpisów, także usuniętych)."""
+        if self._table is not None:
+            return self._table.next_id
+        if self.storage is not None:
+            return self.storage.next_id()
+        return self._lock.next_id()
+
+    def _claim_stored(self, entries):
+        """Sprawdza id wpisów dodawanych do magazynu zewnętrznego (bez
+        wczytywania wpisów do pamięci): zajęte lub powtórzone id są
+        usuwane, a brakujące nada magazyn przy wstawianiu."""
+        batch = set()
+        for entry in entries:
+            if entry.id is not None and (
+                    entry.id in batch
+                    or self.storage.get(entry.id) is not None):
+                entry.id = None
+            batch.add(entry.id)
+
+    def _appending(self, entries):
+        """Czy wpisy można dopisać bez wczytywania pliku: tryb dziennika,
+        dane niewczytane, znane następne wolne id i wpisy bez id.
+
+        Tak dodawane wpisy sprawdzane są tylko z wpisami z sąsiednich dni
+        (_scan), a ich id potwierdza save() pod blokadą wyłączną.
+        """
+        return (self.storage is None and self.journal and not self.loaded
+                and self._lock.next_id() > 0
+                and all(entry.id is None for entry in entries))
+
+    def _append_ids(self, entries):
+        """Nadaje kolejne id wpisom dopisywanym bez wczytywania pliku."""
+        next_id = max(self._lock.next_id(), self._append_id)
+        for entry in entries:
+            entry.id = next_id
+            next_id += 1
+        self._append_id = next_id
+
+    def _add(self, entries):
+        """Nadaje id i dopisuje wpisy w pamięci, w magazynie lub (przed
+        wczytaniem pliku) tylko do zmian oczekujących na zapis."""
+        if self._appending(entries):
+            self._drop_stale_aggregates()
+            self._append_ids(entries)
+        elif self._in_memory():
+            self._loaded()
+            for entry in entries:
+                self._insert(entry)
+        else:
+            self._claim_stored(entries)
+
+    def add_entry(self, entry):
+        """Dodaje wpis i zwraca jego id (OverlapError, gdy nachodzi na
+        istniejący). Wolne id podane we wpisie jest zachowywane.
+
+        W leniwym trybie dziennika wpis dopisywany jest bez wczytywania
+        pliku, a jego id może się zmienić przy zapisie, gdy w międzyczasie
+        inny proces dodał wpisy.
+        """
+        self._check_overlap(entry)
+        self._add([entry])
+        if self._aggregates is not None:
+            self._aggregates.add(entry)
+        self._record("add", entry=entry)
+        return entry.id
+
+    def add_entries(self, entries, checked=False):
+        """Dodaje wiele wpisów naraz (jeden rekord dziennika); zwraca
+        listę ich id.
+
+        Gdy którykolwiek wpis nachodzi na inny, nie jest dodawany żaden
+        (OverlapError); partition_overlaps() pozwala odsiać takie wpisy
+        wcześniej (wtedy `checked` pomija ponowne sprawdzanie).
+        """
+        if not entries:
+            return []
+        _, rejected = ([], []) if checked else \
+            self.partition_overlaps(entries)
+        if rejected:
+            i, reason = rejected[0]
+            raise OverlapError(f"Wpis nr {i + 1}: {reason}")
+        self._add(entries)
+        if self._aggregates is not None:
+            for entry in entries:
+                self._aggregates.add(entry)
+        self._record("add_many", entries=entries)
+        return [entry.id for entry in entries]
+
+    def get_entry(self, entry_id):
+        """Zwraca wpis o podanym id w O(1) (KeyError, gdy go nie ma)."""
+        if self._in_memory():
+            return self._loaded().get(entry_id)
+        entry = self.storage.get(entry_id)
+        if entry is None:
+            raise KeyError(entry_id)
+        return entry
+
+    def edit_by_id(self, entry_id, start, end):
+        """Zmienia godziny wpisu o podanym id w O(1).
+
+        Zgłasza KeyError, gdy wpisu nie ma, i OverlapError, gdy nowe
+        godziny nachodzą na inny wpis.
+        """
+        entry = self.get_entry(entry_id)
+        self._check_overlap(WorkEntry(entry.date, start, end),
+                            ignore=entry_id)
+        if self._aggregates is not None:
+            self._aggregates.remove(entry)
+        in_memory = self._in_memory()
+        if in_memory:
+            pos = self._table.position(entry_id)
+            if self._interval_index is not None:
+                self._interval_index.remove(pos, entry, shift=False)
+        entry.start = start
+        entry.end = end
+        if in_memory:
+            # Zapis zwrotny (EntryStore zwraca kopie wpisów)
+            self._table.entries[pos] = entry
+            if self._interval_index is not None:
+                self._interval_index.add(pos, entry)
+        if self._aggregates is not None:
+            self._aggregates.add(entry)
+        self._record("edit", id=entry_id, start=start, end=end)
+        return entry
+
+    def remove_by_id(self, entry_id):
+        """Usuwa i zwraca wpis o podanym id w O(1).
+
+        Wpis zostaje w pamięci jako nagrobek (pozycje innych wpisów się
+        nie zmieniają) aż do kompaktowania lub odczytu self.entries.
+        Zgłasza KeyError, gdy wpisu nie ma.
+        """
+        removed = self.get_entry(entry_id)
+        if self._in_memory():
+            pos = self._table.remove(entry_id)
+            if self._date_index is not None:
+                self._date_index.remove(pos, ordinal_of(removed.date),
+                                        shift=False)
+            if self._interval_index is not None:
+                self._interval_index.remove(pos, removed, shift=False)
+        if self._aggregates is not None:
+            self._aggregates.remove(removed)
+        self._record("remove", id=entry_id)
+        return removed
+
+    def _id_at(self, index):
+        """Zwraca id wpisu z pozycji `index` na liście self.entries."""
+        if self._in_memory():
+            return self.entries[index].id
+        return self.storage.entry_at(index).id
+
+    def edit_entry(self, index, start, end):
+        """Zmienia godziny wpisu o podanym indeksie (pozycji w entries);
+        zob. edit_by_id()."""
+        return self.edit_by_id(self._id_at(index), start, end)
+
+    def remove_entry(self, index):
+        """Usuwa i zwraca wpis o podanym indeksie (pozycji w entries);
+        zob. remove_by_id()."""
+        return self.remove_by_id(self._id_at(index))
+
+    # --- zapis ---
+
+    @instrument("data.save", entries=_loaded_count)
     def save(self):
-        """Zapisuje dane do pliku."""
+        """Zapisuje dane do pliku.
+
+        Zapis odbywa się pod blokadą wyłączną. Jeśli od wczytania inny
+        proces zmienił dane, niezapisane zmiany są nanoszone na jego dane
+        (edycje i usunięcia wskazują wpisy po id). ConflictError oznacza,
+        że edytowany wpis usunął inny proces.
+        """
         try:
-            with open(self.filepath, "w") as f:
-                # Zapis listy wpisów jako listy słowników
-                json.dump([e.to_dict() for e in self.entries], f, indent=4)
+            if self.storage is not None:
+                self._commit_storage()
+                return
+            with self._lock.hold(exclusive=True):
+                self._finish_compaction()
+                self._resolve_conflict()
+                if not self.journal:
+                    if self.loaded:
+                        self._compact()
+                        self._bump_generation()
+                    return
+                if not self._pending:
+                    return
+                current = False
+                if not self.loaded:
+                    # Sumy sprzed wczytania pozostają aktualne po własnym
+                    # zapisie, chyba że wcześniej zapisał inny proces
+                    current = not self._drop_stale_aggregates()
+                    self._confirm_ids()
+                self._append_journal()
+                if not self.loaded:
+                    self._journal_size = self._count_journal()
+                if self._journal_size >= self.compact_every:
+                    self._compact()
+                elif self._aggregates is not None:
+                    self._save_aggregates()
+                self._bump_generation()
+                if current and self._aggregates is not None:
+                    self._aggregates_stamp = self._seen
+        except ConflictError:
+            raise
         except Exception as e:
             print(f"Błąd zapisu danych: {e}")
+
+    # --- praca wielu procesów na jednym pliku ---
+
+    def _stamp(self):
+        """Tani odcisk stanu danych: rozmiar i mtime migawki oraz
+        dziennika i numer generacji (bez czytania wpisów)."""
+        stamp = [self._lock.generation()]
+        for path in (self.filepath, self.journal_path):
+            try:
+                st = os.stat(path)
+                stamp += [st.st_size, st.st_mtime_ns]
+            except FileNotFoundError:
+                stamp += [None, None]
+        return stamp
+
+    def _bump_generation(self):
+        """Zwiększa numer generacji po zapisie i utrwala następne wolne
+        id (pod blokadą wyłączną)."""
+        self._lock.set_generation(self._lock.generation() + 1)
+        if self._table is not None:
+            self._lock.set_next_id(max(self._lock.next_id(),
+                                       self._table.next_id))
+        self._seen = self._stamp()
+
+    def _confirm_ids(self):
+        """Nadaje ostateczne id wpisom dopisanym bez wczytywania pliku,
+        od następnego wolnego id z pliku blokady (pod blokadą wyłączną,
+        więc inny proces nie nada tych samych)."""
+        self._append_id = 0
+        self._append_ids([entry for record in self._pending
+                          for entry in _added(record)])
+        self._lock.set_next_id(self._append_id)
+
+    def _count_journal(self):
+        """Zwraca liczbę rekordów dziennika (bez ich odtwarzania)."""
+        if not os.path.exists(self.journal_path):
+            return 0
+        with open(self.journal_path, "rb") as f:
+            return sum(1 for _ in f)
+
+    def _mergeable(self):
+        """Czy niezapisane zmiany da się nanieść na dane innego procesu
+        (nie, gdy całą listę wpisów zastąpiono)."""
+        return not self._replaced
+
+    def _reload_merged(self):
+        """Wczytuje aktualne dane i nanosi na nie niezapisane zmiany.
+
+        Dodany wpis, którego id zajął w międzyczasie inny proces, dostaje
+        nowe id (zmienia się też w obiekcie wpisu i w dalszych rekordach).
+        """
+        table = self.load()
+        renamed = {}
+        for record in self._pending:
+            if record.get("id") in renamed:
+                record["id"] = renamed[record["id"]]
+            added = _added(record)
+            old_ids = [entry.id for entry in added]
+            try:
+                self._apply(table, record)
+            except KeyError:
+                raise ConflictError(
+                    f"Wpis o id {record['id']} usunął inny proces - "
+                    f"odśwież dane (reload) i powtórz zmiany.")
+            renamed.update((old, entry.id)
+                           for old, entry in zip(old_ids, added)
+                           if old != entry.id)
+        self._table = table
+        self._date_index = None
+        self._interval_index = None
+        self._aggregates = None
+        self.version += 1
+
+    def _resolve_conflict(self):
+        """Sprawdza zmiany innych procesów (pod blokadą wyłączną)."""
+        if not self.loaded or self._stamp() == self._seen:
+            return
+        if not self._mergeable():
+            raise ConflictError("Dane zmienił inny proces - odśwież je "
+                                "(reload) i powtórz zmiany.")
+        self._reload_merged()
+
+    def refresh(self):
+        """Wczytuje dane ponownie tylko wtedy, gdy zmienił je inny proces.
+
+        Niezapisane zmiany są nanoszone na wczytane dane; gdy się nie da
+        (konflikt zgłosi save()), dane nie są przeładowywane. Przed
+        wczytaniem wpisów (tryb leniwy) porzucane są tylko nieaktualne
+        sumy. Zwraca True, gdy dane wczytano ponownie lub porzucono sumy.
+        """
+        if self.storage is not None:
+            return False
+        if not self.loaded:
+            return self._drop_stale_aggregates()
+        if self._stamp() == self._seen:
+            return False
+        with self._lock.hold():
+            if self._stamp() == self._seen or not self._mergeable():
+                return False
+            try:
+                self._reload_merged()
+            except ConflictError:
+                return False
+        return True
+
+    def reload(self):
+        """Odrzuca niezapisane zmiany i wczytuje dane z pliku."""
+        self._pending = []
+        self._replaced = False
+        self._table = None
+        self._date_index = None
+        self._interval_index = None
+        self._aggregates = None
+        self.version += 1
+        if self.storage is None:
+            self._table = self.load()
+
+    def _append_journal(self):
+        """Dopisuje oczekujące zmiany na koniec dziennika."""
+        if not self._pending:
+            return
+        # Nowe rekordy nie mogą trafić do wiersza z urwanym rekordem
+        self._repair_journal()
+        with open(self.journal_path, "a") as f:
+            for record in self._pending:
+                f.write(_serialize(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_size += len(self._pending)
+        self._pending = []
+
+    def _finish_compaction(self):
+        """Dokańcza kompaktowanie (także przerwane awarią): usuwa scalony
+        dziennik i przenosi migawkę *.compacting na miejsce pliku
+        głównego (wywoływane pod blokadą wyłączną)."""
+        if not os.path.exists(self.compacting_path):
+            return
+        # Dane wczytane z migawki *.compacting nie są przez to nieaktualne
+        current = self._seen == self._stamp()
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        os.replace(self.compacting_path, self.filepath)
+        sync_directory(os.path.dirname(os.path.abspath(self.filepath)))
+        if current:
+            self._seen = self._stamp()
+
+    def _commit_storage(self):
+        """Zatwierdza zmiany w magazynie (jedna transakcja na zapis)."""
+        if self._replace_storage:
+            self.storage.replace_all(self.entries)
+            self._replace_storage = False
+        else:
+            self.storage.commit()
+
+    def compact(self):
+        """Zapisuje pełną migawkę i usuwa scalony dziennik."""
+        if self.storage is not None:
+            self._commit_storage()
+            return
+        with self._lock.hold(exclusive=True):
+            self._finish_compaction()
+            self._resolve_conflict()
+            self._compact()
+            self._bump_generation()
+
+    def _compact(self):
+        """Zapisuje pełną migawkę i usuwa scalony dziennik.
+
+        Migawka trafia najpierw do pliku *.compacting, dopiero potem
+        usuwany jest dziennik, a migawka zastępuje plik główny. Awaria
+        w dowolnym miejscu nie powoduje ponownego odtworzenia dziennika
+        na migawce, która go już zawiera.
+        """
+        # self.entries usuwa nagrobki usuniętych wpisów
+        def write(f):
+            if self.json_lines:
+                for e in self.entries:
+                    f.write(json.dumps(e.to_dict()) + "\n")
+                return
+            # Zapis listy wpisów jako listy słowników
+            json.dump([e.to_dict() for e in self.entries], f, indent=4)
+        atomic_write(self.compacting_path, write)
+        self._finish_compaction()
+        self._pending = []
+        self._replaced = False
+        self._journal_size = 0
+        self._journal_tear = None
+        self._save_aggregates()
@@ -0,0 +1,90 @@
+# services/date_index.py
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from functools import lru_cache
+from utils.validators import date_to_ordinal
+
+# Daty powtarzają się w wielu wpisach, więc wyniki parsowania są zapamiętywane
+ordinal_of = lru_cache(maxsize=8192)(date_to_ordinal)
+
+
+@lru_cache(maxsize=8192)
+def ordinal_to_str(ordinal):
+    """Zamienia numer dnia na datę YYYY-MM-DD (z pamięcią podręczną)."""
+    return date.fromordinal(ordinal).isoformat()
+
+
+def month_bounds(month):
+    """Zwraca (pierwszy, ostatni) numer dnia miesiąca YYYY-MM."""
+    year, mon = int(month[:4]), int(month[5:7])
+    first = date(year, mon, 1).toordinal()
+    if mon == 12:
+        return first, date(year + 1, 1, 1).toordinal() - 1
+    return first, date(year, mon + 1, 1).toordinal() - 1
+
+
+class DateIndex:
+    """Indeks dat: numer dnia -> pozycje wpisów w DataManager.entries.
+
+    Posortowana lista dni pozwala wyszukać zakres dat przez bisect
+    w czasie O(log n + k).
+    """
+
+    def __init__(self, ordinals=()):
+        # Konstruktor: budowa indeksu z kolejnych numerów dni wpisów
+        self._positions = {}
+        for pos, ordinal in enumerate(ordinals):
+            if ordinal is not None:
+                self._positions.setdefault(ordinal, []).append(pos)
+        self._days = sorted(self._positions)
+
+    def add(self, pos, ordinal):
+        """Dodaje wpis z pozycji `pos` (dopisany na końcu listy)."""
+        if ordinal is None:
+            return
+        positions = self._positions.get(ordinal)
+        if positions is None:
+            self._positions[ordinal] = [pos]
+            insort(self._days, ordinal)
+        else:
+            positions.append(pos)
+
+    def remove(self, pos, ordinal, shift=True):
+        """Usuwa wpis z pozycji `pos`.
+
+        Przy `shift` kolejne pozycje cofają się o jeden (O(n)); bez niego
+        (nagrobek w SlotTable) pozycje się nie zmieniają.
+        """
+        if ordinal is not None:
+            positions = self._positions[ordinal]
+            positions.remove(pos)
+            if not positions:
+                del self._positions[ordinal]
+                del self._days[bisect_left(self._days, ordinal)]
+        if not shift:
+            return
+        for positions in self._positions.values():
+            for i, p in enumerate(positions):
+                if p > pos:
+                    positions[i] = p - 1
+
+    def find(self, ordinal):
+        """Zwraca pozycje wpisów z danego dnia."""
+        return list(self._positions.get(ordinal, ()))
+
+    def first_from(self, ordinal):
+        """Zwraca najmniejszą pozycję wpisu z pierwszego dnia >= `ordinal`
+        (None, gdy takiego dnia nie ma)."""
+        i = bisect_left(self._days, ordinal)
+        if i == len(self._days):
+            return None
+        return min(self._positions[self._days[i]])
+
+    def find_range(self, first, last):
+        """Zwraca pozycje wpisów z dni od `first` do `last` włącznie."""
+        lo = bisect_left(self._days, first)
+        hi = bisect_right(self._days, last)
+        result = []
+        for day in self._days[lo:hi]:
+            result.extend(self._positions[day])
+        return result
@@ -0,0 +1,240 @@
+# services/entry_store.py
+from array import array
+from collections import defaultdict
+from collections.abc import MutableSequence
+import operator
+from models.entry import WorkEntry, ProjectWorkEntry, parse_minutes
+from models.entry import MINUTES_PER_DAY, span_minutes
+from services.date_index import ordinal_of, ordinal_to_str
+from utils.lazy_import import optional_import
+
+# Kod projektu oznaczający zwykły WorkEntry (bez projektu)
+NO_PROJECT = -1
+# Wartość kolumny id dla wpisu bez id (id nadawane są od 1)
+NO_ID = -1
+# Numer dnia wpisu z błędną datą (jak w analytics.to_arrays)
+NO_DAY = -1
+# Wartość kolumny surowych wierszy dla poprawnego wpisu
+NO_RAW = -1
+
+
+def _minutes_to_str(minutes):
+    """Zamienia liczbę minut od północy na czas HH:MM."""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class EntryStore(MutableSequence):
+    """Kolumnowy magazyn wpisów czasu pracy.
+
+    Daty trzymane są jako numery dni, godziny jako minuty od północy,
+    a projekty jako kody słownika. Obiekty WorkEntry/ProjectWorkEntry
+    tworzone są dopiero przy odczycie pojedynczego wpisu.
+
+    Wpis z błędną datą lub godziną zostaje w magazynie (jak na liście):
+    jego napisy trzymane są osobno, a w kolumnach ma dzień NO_DAY, gdy
+    data jest błędna, i 0 minut, gdy błędna jest godzina.
+    """
+
+    def __init__(self, entries=()):
+        # Kolumny w spakowanych tablicach
+        self._dates = array("i")
+        self._starts = array("h")
+        self._ends = array("h")
+        self._projects = array("i")
+        self._ids = array("q")
+        # Indeks napisów (data, start, koniec) błędnego wpisu lub NO_RAW
+        self._raws = array("i")
+        self._raw_rows = []
+        # Słownik projektów: kod -> nazwa i nazwa -> kod
+        self._project_names = []
+        self._project_codes = {}
+        self.extend(entries)
+
+    # --- kodowanie i widoki ---
+
+    def _project_code(self, project):
+        """Zwraca kod projektu, dopisując go do słownika w razie potrzeby."""
+        code = self._project_codes.get(project)
+        if code is None:
+            code = len(self._project_names)
+            self._project_names.append(project)
+            self._project_codes[project] = code
+        return code
+
+    def _encode(self, entry):
+        """Zamienia wpis na krotkę wartości kolumn."""
+        ordinal = ordinal_of(entry.date)
+        start = parse_minutes(entry.start)
+        end = parse_minutes(entry.end)
+        raw = NO_RAW
+        if ordinal is None or start is None or end is None:
+            raw = len(self._raw_rows)
+            self._raw_rows.append((entry.date, entry.start, entry.end))
+            if ordinal is None:
+                ordinal = NO_DAY
+            if start is None or end is None:
+                start = end = 0
+        if isinstance(entry, ProjectWorkEntry):
+            project = self._project_code(entry.project)
+        else:
+            project = NO_PROJECT
+        entry_id = NO_ID if entry.id is None else entry.id
+        return ordinal, start, end, project, entry_id, raw
+
+    def _view(self, index):
+        """Tworzy obiekt wpisu na podstawie wiersza kolumn."""
+        raw = self._raws[index]
+        if raw == NO_RAW:
+            date_str = ordinal_to_str(self._dates[index])
+            start = _minutes_to_str(self._starts[index])
+            end = _minutes_to_str(self._ends[index])
+        else:
+            date_str, start, end = self._raw_rows[raw]
+        project = self._projects[index]
+        if project == NO_PROJECT:
+            entry = WorkEntry(date_str, start, end)
+        else:
+            entry = ProjectWorkEntry(date_str, start, end,
+                                     self._project_names[project])
+        entry.id = self.id_at(index)
+        return entry
+
+    # --- interfejs sekwencji ---
+
+    def __len__(self):
+        return len(self._dates)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._view(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("indeks poza zakresem")
+        return self._view(index)
+
+    def __setitem__(self, index, entry):
+        if isinstance(index, slice):
+            raise TypeError("EntryStore nie obsługuje przypisania wycinków")
+        (self._dates[index], self._starts[index], self._ends[index],
+         self._projects[index], self._ids[index],
+         self._raws[index]) = self._encode(entry)
+
+    def __delitem__(self, index):
+        for column in self._columns():
+            del column[index]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._view(i)
+
+    def insert(self, index, entry):
+        values = self._encode(entry)
+        for column, value in zip(self._columns(), values):
+            column.insert(index, value)
+
+    def append(self, entry):
+        # Szybsza ścieżka niż insert(len(self), entry)
+        values = self._encode(entry)
+        for column, value in zip(self._columns(), values):
+            column.append(value)
+
+    def _columns(self):
+        return (self._dates, self._starts, self._ends, self._projects,
+                self._ids, self._raws)
+
+    # --- id wpisów ---
+
+    def ids(self):
+        """Zwraca listę id kolejnych wpisów (None = wpis bez id)."""
+        return [None if i == NO_ID else i for i in self._ids]
+
+    def id_at(self, index):
+        """Zwraca id wpisu z pozycji `index` (None = brak id)."""
+        entry_id = self._ids[index]
+        return None if entry_id == NO_ID else entry_id
+
+    def set_id(self, index, entry_id):
+        """Ustawia id wpisu z pozycji `index` bez tworzenia obiektu."""
+        self._ids[index] = NO_ID if entry_id is None else entry_id
+
+    def drop(self, positions):
+        """Usuwa wpisy z podanych pozycji w jednym przebiegu (O(n))."""
+        keep = [i for i in range(len(self)) if i not in positions]
+        for column in self._columns():
+            column[:] = array(column.typecode, map(column.__getitem__, keep))
+
+    # --- agregaty na surowych kolumnach ---
+
+    def ordinals(self):
+        """Zwraca kolumnę dat (numery dni) w kolejności wpisów.
+
+        Wpis z błędną datą ma numer dnia NO_DAY.
+        """
+        return self._dates
+
+    def total_minutes(self):
+        """Zwraca łączny czas pracy w minutach."""
+        # Każda zmiana przez północ (koniec < początek) dodaje dobę
+        overnight = sum(map(operator.lt, self._ends, self._starts))
+        return (sum(self._ends) - sum(self._starts) +
+                overnight * MINUTES_PER_DAY)
+
+    def durations(self):
+        """Generator czasu trwania kolejnych wpisów w godzinach."""
+        for start, end in zip(self._starts, self._ends):
+            yield span_minutes(start, end) / 60
+
+    def daily_minutes(self):
+        """Zwraca słownik numer dnia -> suma minut."""
+        daily = defaultdict(int)
+        for day, start, end in zip(self._dates, self._starts, self._ends):
+            if day != NO_DAY:
+                daily[day] += span_minutes(start, end)
+        return daily
+
+    def project_day_minutes(self):
+        """Zwraca słownik (numer dnia, projekt) -> [minuty, liczba wpisów].
+
+        Wpisy bez projektu mają projekt "". Wpisy z błędną godziną liczą
+        się z 0 minut, wpisy z błędną datą są pomijane. Jeden przebieg po
+        kolumnach, bez tworzenia obiektów wpisów.
+        """
+        cells = {}
+        for day, start, end, code in zip(self._dates, self._starts,
+                                         self._ends, self._projects):
+            if day == NO_DAY:
+                continue
+            cell = cells.get((day, code))
+            if cell is None:
+                cell = cells[(day, code)] = [0, 0]
+            cell[0] += span_minutes(start, end)
+            cell[1] += 1
+        names = self._project_names
+        return {(day, "" if code == NO_PROJECT else names[code]): cell
+                for (day, code), cell in cells.items()}
+
+    def daily_hours(self):
+        """Zwraca słownik data YYYY-MM-DD -> suma godzin."""
+        return {ordinal_to_str(day): minutes / 60
+                for day, minutes in self.daily_minutes().items()}
+
+    def monthly_hours(self):
+        """Zwraca słownik miesiąc YYYY-MM -> suma godzin."""
+        monthly = defaultdict(int)
+        for day, minutes in self.daily_minutes().items():
+            monthly[ordinal_to_str(day)[:7]] += minutes
+        return {month: minutes / 60 for month, minutes in monthly.items()}
+
+    def as_numpy(self):
+        """Zwraca kolumny jako tablice NumPy (bez kopiowania danych)."""
+        np = optional_import("numpy")
+        if np is None:
+            raise RuntimeError("NumPy nie jest zainstalowany")
+        return {
+            "date": np.frombuffer(self._dates, dtype=np.int32),
+            "start": np.frombuffer(self._starts, dtype=np.int16),
+            "end": np.frombuffer(self._ends, dtype=np.int16),
+            "project": np.frombuffer(self._projects, dtype=np.int32),
+            "id": np.frombuffer(self._ids, dtype=np.int64),
+        }
@@ -0,0 +1,81 @@
+# services/exporter.py
+import csv
+import gzip
+import io
+import time
+from utils.instrumentation import instrument
+
+try:
+    import zstandard
+except ImportError:  # zstandard jest opcjonalny
+    zstandard = None
+
+# Dostępne kolumny eksportu i funkcje wyliczające ich wartości
+COLUMNS = {
+    "id": lambda e: e.id,
+    "date": lambda e: e.date,
+    "start": lambda e: e.start,
+    "end": lambda e: e.end,
+    "duration": lambda e: f"{e.duration():.2f}",
+    "project": lambda e: getattr(e, "project", ""),
+}
+DEFAULT_COLUMNS = ("id", "date", "start", "end", "duration", "project")
+# Rozmiar bufora (w znakach) zapisywanego do pliku jednym wywołaniem
+BUFFER_SIZE = 1 << 20
+
+
+def iter_rows(entries, columns=DEFAULT_COLUMNS):
+    """Generator wierszy CSV (list wartości) dla wybranych kolumn."""
+    getters = [COLUMNS[c] for c in columns]
+    for e in entries:
+        yield [get(e) for get in getters]
+
+
+def _open(filename, compression):
+    """Otwiera plik wyjściowy w trybie tekstowym z opcjonalną kompresją."""
+    if compression == "auto":
+        if filename.endswith(".gz"):
+            compression = "gzip"
+        elif filename.endswith(".zst"):
+            compression = "zstd"
+        else:
+            compression = None
+    if compression is None:
+        return open(filename, "w", newline="", encoding="utf-8")
+    if compression == "gzip":
+        return gzip.open(filename, "wt", newline="", encoding="utf-8")
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("Kompresja zstd wymaga pakietu zstandard")
+        raw = zstandard.ZstdCompressor().stream_writer(open(filename, "wb"))
+        return io.TextIOWrapper(raw, newline="", encoding="utf-8")
+    raise ValueError(f"Nieznana kompresja: {compression}")
+
+
+@instrument("export.csv", entries=lambda result, args: result[0])
+def export_csv(entries, filename, columns=DEFAULT_COLUMNS,
+               buffer_size=BUFFER_SIZE, compression="auto"):
+    """Eksportuje wpisy strumieniowo do pliku CSV.
+
+    Wiersze trafiają do bufora w pamięci i są zapisywane do pliku, gdy
+    przekroczy on `buffer_size` znaków, więc zużycie pamięci nie zależy
+    od liczby wpisów. Zwraca (liczba wierszy, czas w sekundach).
+    """
+    unknown = [c for c in columns if c not in COLUMNS]
+    if unknown:
+        raise ValueError(f"Nieznane kolumny: {', '.join(unknown)}")
+    t0 = time.perf_counter()
+    count = 0
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    with _open(filename, compression) as f:
+        writer.writerow(columns)
+        for row in iter_rows(entries, columns):
+            writer.writerow(row)
+            count += 1
+            if buf.tell() >= buffer_size:
+                f.write(buf.getvalue())
+                buf.seek(0)
+                buf.truncate()
+        f.write(buf.getvalue())
+    return count, time.perf_counter() - t0
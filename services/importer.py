@@ -0,0 +1,116 @@
+# services/importer.py
+import csv
+from functools import partial
+from models.entry import make_entry, parse_id, parse_minutes
+from services.date_index import ordinal_of
+from utils.instrumentation import instrument
+from utils.parallel import bounded_map
+
+# Kolumny wymagane w pliku CSV (kolumny "project" i "id" są opcjonalne)
+REQUIRED = ("date", "start", "end")
+BATCH_SIZE = 10000
+
+
+def read_batches(f, batch_size=BATCH_SIZE):
+    """Czyta plik CSV porcjami krotek (nr wiersza, data, start, koniec,
+    projekt, id). Brakujące wartości w krótszych wierszach to None."""
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = {name.strip(): i for i, name in enumerate(header)}
+    missing = [c for c in REQUIRED if c not in columns]
+    if missing:
+        raise ValueError(f"Brak kolumn w pliku CSV: {', '.join(missing)}")
+    indexes = [columns[c] for c in REQUIRED] + [columns.get("project"),
+                                                columns.get("id")]
+    batch = []
+    for row in reader:
+        if not row:
+            continue
+        values = [row[i] if i is not None and i < len(row) else None
+                  for i in indexes]
+        batch.append((reader.line_num, *values))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def validate_batch(batch, lines=False):
+    """Waliduje porcję wierszy; zwraca (poprawne, odrzucone).
+
+    Poprawne to krotki (data, start, koniec, projekt, id) - przy `lines`
+    poprzedzone numerem wiersza, odrzucone to pary (nr wiersza, powód).
+    Puste id oznacza wpis bez id (DataManager nada nowe). Parsery dat
+    i godzin zapamiętują wyniki, więc powtarzające się wartości
+    sprawdzane są tylko raz.
+    """
+    valid, rejected = [], []
+    for line, date, start, end, project, entry_id in batch:
+        if entry_id is not None and entry_id != "":
+            entry_id = parse_id(entry_id)
+            if entry_id is None:
+                rejected.append((line, "niepoprawne id wpisu"))
+                continue
+        else:
+            entry_id = None
+        if date is None or start is None or end is None:
+            rejected.append((line, "za mało kolumn"))
+        elif ordinal_of(date) is None:
+            rejected.append((line, f"niepoprawna data '{date}'"))
+        elif parse_minutes(start) is None:
+            rejected.append((line, f"niepoprawna godzina '{start}'"))
+        elif parse_minutes(end) is None:
+            rejected.append((line, f"niepoprawna godzina '{end}'"))
+        else:
+            row = (date, start, end, project, entry_id)
+            valid.append((line, *row) if lines else row)
+    return valid, rejected
+
+
+@instrument("import.csv", entries=lambda result, args: result[0])
+def import_csv(data_manager, source, batch_size=BATCH_SIZE, workers=None):
+    """Importuje wpisy z pliku CSV porcjami; zwraca (liczba, odrzucone).
+
+    `source` to nazwa pliku lub otwarty plik tekstowy (np. sys.stdin).
+    Każda porcja jest walidowana (opcjonalnie w puli `workers` procesów)
+    i dodawana do DataManagera jedną operacją add_entries. Wiersze
+    nachodzące na istniejące wpisy trafiają do odrzuconych. Id z kolumny
+    "id" (np. z eksportu) są zachowywane, jeśli są wolne.
+    """
+    if not isinstance(source, str):
+        return _import_file(data_manager, source, batch_size, workers)
+    with open(source, "r", encoding="utf-8", newline="") as f:
+        return _import_file(data_manager, f, batch_size, workers)
+
+
+def _import_file(data_manager, f, batch_size, workers):
+    imported, rejected = 0, []
+    batches = read_batches(f, batch_size)
+    validate = partial(validate_batch, lines=True)
+    if workers and workers > 1:
+        # import w miejscu użycia: multiprocessing spowalnia start
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = bounded_map(pool, validate, batches, workers * 2)
+            imported = _insert(data_manager, results, rejected)
+    else:
+        results = map(validate, batches)
+        imported = _insert(data_manager, results, rejected)
+    return imported, rejected
+
+
+def _insert(data_manager, results, rejected):
+    """Dodaje poprawne wpisy z kolejnych porcji; zwraca ich liczbę."""
+    count = 0
+    for valid, bad in results:
+        entries, overlapping = data_manager.partition_overlaps(
+            [make_entry(*row[1:]) for row in valid])
+        data_manager.add_entries(entries, checked=True)
+        rejected.extend(bad)
+        rejected.extend((valid[i][0], reason) for i, reason in overlapping)
+        count += len(entries)
+    rejected.sort()
+    return count
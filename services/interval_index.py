@@ -0,0 +1,126 @@
+# services/interval_index.py
+from bisect import bisect_left, insort
+import heapq
+from models.entry import MINUTES_PER_DAY, parse_minutes, span_minutes
+from services.date_index import ordinal_of
+
+
+def interval_of(entry):
+    """Zwraca (początek, koniec) wpisu w minutach od początku ery.
+
+    Minuta absolutna to numer dnia * 1440 + minuty od północy, więc
+    zmiana przez północ kończy się po prostu następnego dnia. Zwraca
+    None dla wpisów z niepoprawną datą lub godziną.
+    """
+    day = ordinal_of(entry.date)
+    start, end = parse_minutes(entry.start), parse_minutes(entry.end)
+    if day is None or start is None or end is None:
+        return None
+    begin = day * MINUTES_PER_DAY + start
+    return begin, begin + span_minutes(start, end)
+
+
+class IntervalIndex:
+    """Indeks przedziałów czasu: numer dnia -> posortowane przedziały.
+
+    Każdy dzień przechowuje listę (początek, koniec, pozycja) posortowaną
+    wg początku. Wpis trwa krócej niż dobę, więc kolizję z nowym wpisem
+    mogą mieć tylko przedziały z dnia poprzedniego, tego samego
+    i następnego - wyszukiwanie to bisect w trzech listach.
+    """
+
+    def __init__(self, entries=()):
+        # Konstruktor: budowa indeksu z kolejnych wpisów (pozycja = nr)
+        self._days = {}
+        for pos, entry in enumerate(entries):
+            interval = interval_of(entry)
+            if interval is not None:
+                self._days.setdefault(interval[0] // MINUTES_PER_DAY,
+                                      []).append((*interval, pos))
+        for items in self._days.values():
+            items.sort()
+
+    def add(self, pos, entry):
+        """Dodaje przedział wpisu z pozycji `pos`."""
+        interval = interval_of(entry)
+        if interval is not None:
+            self.insert(*interval, pos)
+
+    def insert(self, begin, end, pos):
+        """Dodaje przedział [begin, end) w minutach absolutnych."""
+        insort(self._days.setdefault(begin // MINUTES_PER_DAY, []),
+               (begin, end, pos))
+
+    def remove(self, pos, entry, shift=True):
+        """Usuwa przedział wpisu z pozycji `pos`.
+
+        Przy `shift` (usunięcie z listy) kolejne pozycje cofają się o jeden,
+        jak w DateIndex; przy edycji wpisu pozycje się nie zmieniają.
+        """
+        interval = interval_of(entry)
+        if interval is not None:
+            day = interval[0] // MINUTES_PER_DAY
+            items = self._days[day]
+            items.remove((*interval, pos))
+            if not items:
+                del self._days[day]
+        if not shift:
+            return
+        for items in self._days.values():
+            for i, (begin, end, p) in enumerate(items):
+                if p > pos:
+                    items[i] = (begin, end, p - 1)
+
+    def conflicts(self, entry, ignore=None):
+        """Zwraca pozycje wpisów nachodzących na `entry`.
+
+        Pozycja `ignore` (np. edytowany wpis) jest pomijana. Przedziały
+        stykające się końcami (10:00-12:00 i 12:00-14:00) nie kolidują.
+        """
+        interval = interval_of(entry)
+        if interval is None:
+            return []
+        return self.find(*interval, ignore=ignore)
+
+    def find(self, begin, end, ignore=None):
+        """Zwraca pozycje przedziałów nachodzących na [begin, end)."""
+        if begin == end:
+            return []
+        day = begin // MINUTES_PER_DAY
+        found = []
+        for d in (day - 1, day, day + 1):
+            items = self._days.get(d)
+            if not items:
+                continue
+            # Tylko przedziały zaczynające się przed końcem nowego
+            for other_begin, other_end, pos in \
+                    items[:bisect_left(items, (end,))]:
+                if other_end > begin and other_end > other_begin \
+                        and pos != ignore:
+                    found.append(pos)
+        return found
+
+
+def find_overlaps(entries):
+    """Zwraca wszystkie pary nachodzących wpisów (przegląd zamiatający).
+
+    Wynik to krotki (pozycja_a, pozycja_b, minuty_wspólne) dla a < b.
+    Przedziały sortowane są raz wg początku, a aktywne (jeszcze trwające)
+    trzymane w kopcu wg końca: O(n log n + liczba kolizji).
+    """
+    intervals = []
+    for pos, entry in enumerate(entries):
+        interval = interval_of(entry)
+        if interval is not None and interval[0] < interval[1]:
+            intervals.append((*interval, pos))
+    intervals.sort()
+    active, found = [], []
+    for begin, end, pos in intervals:
+        while active and active[0][0] <= begin:
+            heapq.heappop(active)
+        for other_end, other in active:
+            found.append((min(pos, other), max(pos, other),
+                          min(end, other_end) - begin))
+        heapq.heappush(active, (end, pos))
+    found.sort()
+    return found
@@ -0,0 +1,100 @@
+# services/listing.py
+from bisect import bisect_left
+
+# Liczba wpisów na jednej stronie listy
+PAGE_SIZE = 20
+
+
+def matches(entry, text):
+    """Czy tekst występuje w dacie, godzinach lub projekcie wpisu."""
+    return (text in entry.date or text in entry.start or text in entry.end
+            or text in (getattr(entry, "project", None) or ""))
+
+
+class EntryPager:
+    """Stronicowany widok wpisów - formatowana jest tylko bieżąca strona.
+
+    Widok obejmuje cały kontener `entries` albo wybrane pozycje (np. wyniki
+    wyszukiwania, rosnąco). Numer wpisu to jego stałe id (dla wpisów bez
+    id - pozycja w `entries` + 1), taki sam na każdej stronie i w każdym
+    widoku.
+    """
+
+    def __init__(self, entries, positions=None, page_size=PAGE_SIZE):
+        # Konstruktor: widok zaczyna się od pierwszej strony
+        self.entries = entries
+        self.positions = positions
+        self.page_size = page_size
+        self.page = 0
+
+    def __len__(self):
+        if self.positions is None:
+            return len(self.entries)
+        return len(self.positions)
+
+    @property
+    def pages(self):
+        """Liczba stron (co najmniej jedna)."""
+        return max(1, -(-len(self) // self.page_size))
+
+    def visible(self):
+        """Zwraca pozycje wpisów z bieżącej strony."""
+        first = self.page * self.page_size
+        last = min(first + self.page_size, len(self))
+        if self.positions is None:
+            return range(first, last)
+        return self.positions[first:last]
+
+    def visible_all(self):
+        """Zwraca pozycje wszystkich wpisów widoku."""
+        if self.positions is None:
+            return range(len(self.entries))
+        return self.positions
+
+    def render(self):
+        """Zwraca tekst bieżącej strony jako jeden napis (jeden zapis)."""
+        lines = []
+        for p in self.visible():
+            entry = self.entries[p]
+            number = p + 1 if entry.id is None else entry.id
+            lines.append(f"{number:>7}. {entry}")
+        lines.append(f"--- strona {self.page + 1}/{self.pages}, "
+                     f"wpisów: {len(self)} ---")
+        return "\n".join(lines) + "\n"
+
+    def go(self, page):
+        """Przechodzi do strony `page` (liczonej od zera, w granicach)."""
+        self.page = min(max(page, 0), self.pages - 1)
+
+    def next(self):
+        self.go(self.page + 1)
+
+    def previous(self):
+        self.go(self.page - 1)
+
+    def show_position(self, pos):
+        """Przechodzi do strony z wpisem z pozycji `pos` (lub pierwszym
+        dalszym wpisem widoku)."""
+        if self.positions is None:
+            self.go(pos // self.page_size)
+        else:
+            self.go(bisect_left(self.positions, pos) // self.page_size)
+
+    def show_date(self, date_str):
+        """Przechodzi do pierwszego wpisu widoku z dnia >= `date_str`.
+
+        Przegląda widok liniowo; dla całego rejestru szybciej jest
+        wyznaczyć pozycję indeksem dat i wywołać show_position().
+        Zwraca False, gdy takiego wpisu nie ma.
+        """
+        for i, p in enumerate(self.visible_all()):
+            if self.entries[p].date >= date_str:
+                self.go(i // self.page_size)
+                return True
+        return False
+
+    def search(self, text):
+        """Zwraca nowy widok z wpisami tego widoku zawierającymi `text`."""
+        found = [p for p in self.visible_all()
+                 if matches(self.entries[p], text)]
+        return EntryPager(self.entries, found, self.page_size)
@@ -0,0 +1,95 @@
+# services/locking.py
+from contextlib import contextmanager
+import os
+
+try:
+    import fcntl
+except ImportError:  # fcntl jest niedostępny (np. Windows)
+    fcntl = None
+
+# Numer generacji zapisywany jako liczba o stałej szerokości, więc
+# nadpisanie go w miejscu nigdy nie zostawia pliku pustego
+GENERATION_WIDTH = 20
+
+
+class FileLock:
+    """Blokada doradcza (fcntl.flock) na pliku *.lock obok danych.
+
+    Plik blokady przechowuje też numer generacji danych, zwiększany przy
+    każdym zapisie, a za nim następne wolne id wpisu (id usuniętych
+    wpisów nie są ponownie nadawane). Blokada jest wielokrotnego
+    wejścia: zagnieżdżone hold() w obrębie jednego obiektu nie blokują
+    się nawzajem.
+    """
+
+    def __init__(self, path):
+        # Konstruktor: plik tworzony dopiero przy pierwszej blokadzie
+        self.path = path
+        self._fd = None
+        self._depth = 0
+        self._exclusive = False
+
+    @contextmanager
+    def hold(self, exclusive=False):
+        """Blokuje plik (współdzielona lub wyłączna) na czas bloku with."""
+        if self._depth:
+            if exclusive and not self._exclusive:
+                raise RuntimeError("Nie można podnieść blokady "
+                                   "współdzielonej do wyłącznej")
+            self._depth += 1
+            try:
+                yield self
+            finally:
+                self._depth -= 1
+            return
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd,
+                            fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._depth, self._exclusive = 1, exclusive
+            yield self
+        finally:
+            # Zamknięcie deskryptora zwalnia blokadę
+            self._depth = 0
+            os.close(self._fd)
+            self._fd = None
+
+    def _read(self, field):
+        """Odczytuje liczbę z pola nr `field` (0, gdy jej brak)."""
+        offset = field * GENERATION_WIDTH
+        try:
+            if self._fd is not None:
+                os.lseek(self._fd, offset, os.SEEK_SET)
+                data = os.read(self._fd, GENERATION_WIDTH)
+            else:
+                with open(self.path, "rb") as f:
+                    f.seek(offset)
+                    data = f.read(GENERATION_WIDTH)
+        except FileNotFoundError:
+            return 0
+        return int(data) if data.strip() else 0
+
+    def _write(self, field, value):
+        """Zapisuje liczbę w polu nr `field` (wymaga blokady wyłącznej)."""
+        if not (self._depth and self._exclusive):
+            raise RuntimeError("Zapis generacji wymaga blokady wyłącznej")
+        os.lseek(self._fd, field * GENERATION_WIDTH, os.SEEK_SET)
+        os.write(self._fd, f"{value:0{GENERATION_WIDTH}d}".encode())
+        os.fsync(self._fd)
+
+    def generation(self):
+        """Odczytuje numer generacji (0, gdy plik nie istnieje)."""
+        return self._read(0)
+
+    def set_generation(self, value):
+        """Zapisuje numer generacji (wymaga blokady wyłącznej)."""
+        self._write(0, value)
+
+    def next_id(self):
+        """Odczytuje następne wolne id wpisu (0, gdy nie zapisano)."""
+        return self._read(1)
+
+    def set_next_id(self, value):
+        """Zapisuje następne wolne id wpisu (wymaga blokady wyłącznej)."""
+        self._write(1, value)
@@ -0,0 +1,142 @@
+# services/reports.py
+from functools import lru_cache
+from services.aggregates import split_project_month, week_key
+from services.date_index import ordinal_of, ordinal_to_str
+from services.entry_store import EntryStore
+
+# Okresy raportu i miary w komórkach tabeli
+PERIODS = ("day", "week", "month", "quarter", "year")
+METRICS = ("hours", "count", "average")
+# Okresy, które da się złożyć z kubełków projekt × miesiąc
+MONTHLY_PERIODS = ("month", "quarter", "year")
+
+
+@lru_cache(maxsize=16384)
+def period_key(period, ordinal):
+    """Zwraca klucz okresu (np. 2024-W05, 2024-03, 2024-Q1) dla dnia."""
+    if period == "day":
+        return ordinal_to_str(ordinal)
+    if period == "week":
+        return week_key(ordinal)
+    return month_period_key(period, ordinal_to_str(ordinal)[:7])
+
+
+def month_period_key(period, month):
+    """Zwraca klucz okresu miesięcznego/kwartalnego/rocznego dla YYYY-MM."""
+    if period == "month":
+        return month
+    if period == "quarter":
+        return f"{month[:4]}-Q{(int(month[5:7]) - 1) // 3 + 1}"
+    if period == "year":
+        return month[:4]
+    raise ValueError(f"Nieznany okres: {period}")
+
+
+class PivotReport:
+    """Tabela przestawna projekt × okres.
+
+    Komórki to pary [minuty, liczba wpisów] pod kluczem (projekt, okres);
+    przechowywane są tylko niepuste komórki, więc tysiące projektów
+    i okresów nie tworzą pełnej macierzy.
+    """
+
+    def __init__(self, period="month"):
+        # Konstruktor: pusta tabela dla wybranego okresu
+        if period not in PERIODS:
+            raise ValueError(f"Nieznany okres: {period}")
+        self.period = period
+        self.cells = {}
+
+    def add(self, project, key, minutes, count=1):
+        """Dolicza minuty i liczbę wpisów do komórki (projekt, okres)."""
+        cell = self.cells.get((project, key))
+        if cell is None:
+            cell = self.cells[(project, key)] = [0, 0]
+        cell[0] += minutes
+        cell[1] += count
+
+    @property
+    def projects(self):
+        """Posortowana lista projektów ("" = wpisy bez projektu)."""
+        return sorted({project for project, _ in self.cells})
+
+    @property
+    def periods(self):
+        """Posortowana lista okresów."""
+        return sorted({key for _, key in self.cells})
+
+    @staticmethod
+    def _value(minutes, count, metric):
+        if metric == "hours":
+            return minutes / 60
+        if metric == "count":
+            return count
+        if metric == "average":
+            return minutes / 60 / count if count else 0.0
+        raise ValueError(f"Nieznana miara: {metric}")
+
+    def value(self, project, key, metric="hours"):
+        """Zwraca wartość miary w komórce (0 dla pustej)."""
+        minutes, count = self.cells.get((project, key), (0, 0))
+        return self._value(minutes, count, metric)
+
+    def totals(self, metric="hours", axis="project"):
+        """Zwraca sumy wierszy (axis="project") lub kolumn ("period")."""
+        sums = {}
+        for cell_key, (minutes, count) in self.cells.items():
+            key = cell_key[0] if axis == "project" else cell_key[1]
+            total = sums.setdefault(key, [0, 0])
+            total[0] += minutes
+            total[1] += count
+        return {key: self._value(minutes, count, metric)
+                for key, (minutes, count) in sums.items()}
+
+    def to_dict(self, metric="hours"):
+        """Tabela jako słownik JSON: wiersze projektów (tylko niepuste
+        komórki) oraz sumy wierszy."""
+        if metric not in METRICS:
+            raise ValueError(f"Nieznana miara: {metric}")
+        rows = {}
+        for (project, key), (minutes, count) in sorted(self.cells.items()):
+            rows.setdefault(project, {})[key] = self._value(
+                minutes, count, metric)
+        return {"period": self.period, "metric": metric,
+                "periods": self.periods, "rows": rows,
+                "totals": self.totals(metric)}
+
+
+def pivot(entries, period="month"):
+    """Buduje tabelę projekt × okres w jednym przebiegu po wpisach.
+
+    `entries` to lista, generator lub EntryStore (wtedy sumy liczone są
+    na kolumnach). Wpisy z błędną godziną liczą się z 0 minut (jak
+    w Aggregates), wpisy z błędną datą są pomijane.
+    """
+    report = PivotReport(period)
+    if isinstance(entries, EntryStore):
+        for (ordinal, project), (minutes, count) in \
+                entries.project_day_minutes().items():
+            report.add(project, period_key(period, ordinal), minutes, count)
+        return report
+    for e in entries:
+        ordinal = ordinal_of(e.date)
+        if ordinal is None:
+            continue
+        report.add(getattr(e, "project", None) or "",
+                   period_key(period, ordinal), e.minutes() or 0)
+    return report
+
+
+def pivot_from_aggregates(aggregates, period="month"):
+    """Buduje tabelę z kubełków projekt × miesiąc utrzymywanych przez
+    Aggregates (bez czytania wpisów); tylko okresy z MONTHLY_PERIODS."""
+    if period not in MONTHLY_PERIODS:
+        raise ValueError(f"Okresu {period} nie da się złożyć z miesięcy")
+    report = PivotReport(period)
+    for key, (minutes, count) in \
+            aggregates.buckets["project_month"].items():
+        month, project = split_project_month(key)
+        if ordinal_of(month + "-01") is None:
+            continue  # wpisy z błędną datą
+        report.add(project, month_period_key(period, month), minutes, count)
+    return report
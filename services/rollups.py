@@ -0,0 +1,232 @@
+# services/rollups.py
+import calendar
+from datetime import date
+from services.aggregates import week_key
+from services.date_index import month_bounds, ordinal_of, ordinal_to_str
+from services.entry_store import EntryStore
+from services.reports import month_period_key
+
+# Poziomy drzewa podsumowań: dzień -> tydzień ISO, dzień -> okres
+# dwutygodniowy oraz dzień -> miesiąc -> kwartał -> rok
+LEVELS = ("day", "week", "biweek", "month", "quarter", "year")
+# Domyślna dzienna norma czasu pracy (w godzinach)
+DAILY_NORM = 8.0
+# Poniedziałek, od którego liczone są okresy dwutygodniowe; kluczem
+# okresu jest data jego pierwszego dnia
+BIWEEK_ANCHOR = "2024-01-01"
+
+
+def _add(bucket, other):
+    for i, value in enumerate(other):
+        bucket[i] += value
+
+
+class Rollup:
+    """Drzewo podsumowań czasu pracy wg okresów (rozliczenia płac).
+
+    Kubełek to lista [minuty, liczba wpisów, minuty nadgodzin, dni pracy].
+    Nadgodziny to nadwyżka ponad dzienną normę `norm` godzin liczona dla
+    każdego dnia; wyższe poziomy sumują dzieci (tygodnie, okresy
+    dwutygodniowe i miesiące - dni, kwartały - miesiące, lata - kwartały).
+    Dowolny zakres dat składany jest z największych pełnych kubełków
+    (lata, kwartały, miesiące, tygodnie, a na brzegach dni), bez
+    czytania wpisów.
+    """
+
+    def __init__(self, days=(), norm=DAILY_NORM, anchor=BIWEEK_ANCHOR):
+        # Konstruktor: drzewo z trójek (numer dnia, minuty, liczba wpisów)
+        # budowane w jednym przebiegu po dniach
+        self.norm = norm
+        self.anchor = anchor
+        self._anchor = ordinal_of(anchor)
+        if self._anchor is None:
+            raise ValueError(f"Niepoprawna data początku okresów: {anchor}")
+        self.levels = {level: {} for level in LEVELS}
+        norm_minutes = norm * 60
+        day, week, biweek, month = (self.levels[level] for level in
+                                    ("day", "week", "biweek", "month"))
+        by_ordinal = {}
+        for ordinal, minutes, count in days:
+            if ordinal is None:
+                continue  # wpisy z błędną datą
+            bucket = by_ordinal.get(ordinal)
+            if bucket is None:
+                bucket = by_ordinal[ordinal] = [0, 0, 0, 1]
+            bucket[0] += minutes
+            bucket[1] += count
+        for ordinal, bucket in sorted(by_ordinal.items()):
+            key = ordinal_to_str(ordinal)
+            bucket[2] = max(bucket[0] - norm_minutes, 0)
+            day[key] = bucket
+            for level, parent in ((week, week_key(ordinal)),
+                                  (biweek, self._biweek_key(ordinal)),
+                                  (month, key[:7])):
+                _add(level.setdefault(parent, [0, 0, 0, 0]), bucket)
+        for child, level in (("month", "quarter"), ("quarter", "year")):
+            parents = self.levels[level]
+            for key, bucket in self.levels[child].items():
+                _add(parents.setdefault(self._parent_key(level, key),
+                                        [0, 0, 0, 0]), bucket)
+
+    @staticmethod
+    def from_entries(entries, norm=DAILY_NORM, anchor=BIWEEK_ANCHOR):
+        """Buduje drzewo w jednym przebiegu po wpisach (lista, generator
+        lub EntryStore - wtedy sumy liczone są na kolumnach)."""
+        if isinstance(entries, EntryStore):
+            days = ((ordinal, minutes, count) for (ordinal, _), (
+                minutes, count) in entries.project_day_minutes().items())
+            return Rollup(days, norm, anchor)
+        days = {}
+        for e in entries:
+            # Błędna godzina: wpis z 0 minut (jak w Aggregates)
+            bucket = days.setdefault(ordinal_of(e.date), [0, 0])
+            bucket[0] += e.minutes() or 0
+            bucket[1] += 1
+        return Rollup(((ordinal, minutes, count) for ordinal, (
+            minutes, count) in days.items()), norm, anchor)
+
+    @staticmethod
+    def from_aggregates(aggregates, norm=DAILY_NORM, anchor=BIWEEK_ANCHOR):
+        """Buduje drzewo z dziennych sum Aggregates (bez czytania wpisów)."""
+        return Rollup(((ordinal_of(key), minutes, count) for key, (
+            minutes, count) in aggregates.buckets["day"].items()),
+            norm, anchor)
+
+    def _biweek_key(self, ordinal):
+        return ordinal_to_str(ordinal - (ordinal - self._anchor) % 14)
+
+    @staticmethod
+    def _parent_key(level, key):
+        if level == "quarter":
+            return month_period_key("quarter", key)
+        return key[:4]
+
+    # --- okresy ---
+
+    def span(self, level, key):
+        """Zwraca (pierwszy, ostatni) numer dnia okresu `key` poziomu
+        `level`."""
+        if level == "day":
+            first = ordinal_of(key)
+            return first, first
+        if level == "week":
+            first = date.fromisocalendar(int(key[:4]), int(key[6:]),
+                                         1).toordinal()
+            return first, first + 6
+        if level == "biweek":
+            first = ordinal_of(key)
+            return first, first + 13
+        if level == "month":
+            return month_bounds(key)
+        if level == "quarter":
+            month = (int(key[6]) - 1) * 3 + 1
+            first = month_bounds(f"{key[:4]}-{month:02d}")[0]
+            return first, month_bounds(f"{key[:4]}-{month + 2:02d}")[1]
+        if level == "year":
+            return month_bounds(key + "-01")[0], month_bounds(key + "-12")[1]
+        raise ValueError(f"Nieznany okres: {level}")
+
+    def children(self, level, key):
+        """Zwraca posortowane klucze niepustych kubełków o poziom niżej
+        (kwartały roku, miesiące kwartału, dni miesiąca lub tygodnia)."""
+        if level == "day":
+            return []
+        child = {"year": "quarter", "quarter": "month"}.get(level, "day")
+        if child == "quarter":
+            keys = [f"{key}-Q{q}" for q in range(1, 5)]
+        elif child == "month":
+            first = int(key[6]) * 3 - 2
+            keys = [f"{key[:4]}-{m:02d}" for m in range(first, first + 3)]
+        else:
+            first, last = self.span(level, key)
+            keys = [ordinal_to_str(o) for o in range(first, last + 1)]
+        return [k for k in keys if k in self.levels[child]]
+
+    def _largest(self, ordinal, last):
+        """Zwraca (poziom, klucz, ostatni dzień) największego pełnego
+        kubełka zaczynającego się w dniu `ordinal` i kończącego <= last."""
+        d = date.fromordinal(ordinal)
+        month_end = ordinal + calendar.monthrange(d.year, d.month)[1] - d.day
+        if d.day == 1:
+            year_end = date(d.year, 12, 31).toordinal()
+            if d.month == 1 and year_end <= last:
+                return "year", f"{d.year:04d}", year_end
+            if d.month % 3 == 1:
+                quarter_end = month_bounds(
+                    f"{d.year:04d}-{d.month + 2:02d}")[1]
+                if quarter_end <= last:
+                    return ("quarter",
+                            f"{d.year:04d}-Q{(d.month - 1) // 3 + 1}",
+                            quarter_end)
+            if month_end <= last:
+                return "month", f"{d.year:04d}-{d.month:02d}", month_end
+        # Tydzień tylko w obrębie miesiąca, by nie przeskoczyć jego końca
+        if d.weekday() == 0 and ordinal + 6 <= min(last, month_end):
+            return "week", week_key(ordinal), ordinal + 6
+        return "day", ordinal_to_str(ordinal), ordinal
+
+    def query(self, start, end):
+        """Zwraca podsumowanie zakresu dat [start, end] (YYYY-MM-DD).
+
+        Zakres składany jest z pełnych kubełków, więc koszt zależy od
+        liczby lat i dni na brzegach zakresu, a nie od liczby wpisów.
+        """
+        first, last = ordinal_of(start), ordinal_of(end)
+        if first is None or last is None:
+            raise ValueError("Niepoprawna data zakresu")
+        return self._summary(self._combine(first, last))
+
+    def _combine(self, first, last):
+        total = [0, 0, 0, 0]
+        while first <= last:
+            level, key, end = self._largest(first, last)
+            bucket = self.levels[level].get(key)
+            if bucket is not None:
+                _add(total, bucket)
+            first = end + 1
+        return total
+
+    @staticmethod
+    def _summary(bucket):
+        minutes, count, overtime, days = bucket
+        return {"hours": minutes / 60, "count": count,
+                "overtime": overtime / 60, "days": days,
+                "average": minutes / 60 / count if count else 0.0}
+
+    def table(self, level, start=None, end=None):
+        """Zwraca słownik okres -> podsumowanie dla poziomu `level`.
+
+        Z zakresem dat zwraca tylko okresy, które go przecinają, a okresy
+        wychodzące poza zakres liczone są tylko z jego dni.
+        """
+        if level not in LEVELS:
+            raise ValueError(f"Nieznany okres: {level}")
+        first = ordinal_of(start) if start else None
+        last = ordinal_of(end) if end else None
+        if (start and first is None) or (end and last is None):
+            raise ValueError("Niepoprawna data zakresu")
+        result = {}
+        for key in sorted(self.levels[level]):
+            bucket = self.levels[level][key]
+            if first is not None or last is not None:
+                lo, hi = self.span(level, key)
+                if (last is not None and lo > last) or \
+                        (first is not None and hi < first):
+                    continue
+                clipped = (max(lo, first or lo), min(hi, last or hi))
+                if clipped != (lo, hi):
+                    bucket = self._combine(*clipped)
+            result[key] = self._summary(bucket)
+        return result
+
+    def to_dict(self, level="month", start=None, end=None):
+        """Raport JSON: norma, okresy poziomu `level` i suma zakresu."""
+        periods = self.table(level, start, end)
+        if start or end:
+            total = self.query(start or "0001-01-01", end or "9999-12-31")
+        else:
+            total = self._summary(
+                [sum(b[i] for b in self.levels["year"].values())
+                 for i in range(4)])
+        return {"period": level, "norm": self.norm, "periods": periods,
+                "total": total}
@@ -0,0 +1,135 @@
+# services/slots.py
+import operator
+from services.entry_store import EntryStore
+
+
+def entry_ids(entries):
+    """Zwraca listę id kolejnych wpisów kontenera (None = brak id)."""
+    if isinstance(entries, EntryStore):
+        return entries.ids()
+    return [e.id for e in entries]
+
+
+class SlotTable:
+    """Kontener wpisów ze stałymi id i nagrobkami.
+
+    Id wpisu nie zmienia się, gdy inne wpisy są dodawane lub usuwane.
+    Mapa id -> pozycja (slot) budowana jest przy pierwszym wyszukiwaniu
+    po id. Usunięty wpis zostaje w kontenerze jako nagrobek (pozycja
+    w `dead`), więc pozycje pozostałych się nie przesuwają, a dodanie,
+    edycja i usunięcie kosztują O(1). Nagrobki usuwa reclaim() - jeden
+    przebieg O(n) przy kompaktowaniu lub przed odczytem całej listy.
+
+    `next_id` to dolna granica nowych id (zapamiętana przez magazyn), by
+    id usuniętych wpisów nie były nadawane ponownie.
+    """
+
+    def __init__(self, entries, next_id=1):
+        # Konstruktor: wpisy bez id (lub z powtórzonym id) dostają nowe
+        self.entries = entries
+        self.dead = set()
+        self._slots = None
+        self.next_id = self._number(next_id)
+
+    def __len__(self):
+        """Liczba wpisów bez nagrobków."""
+        return len(self.entries) - len(self.dead)
+
+    def __contains__(self, entry_id):
+        return entry_id in self.slots
+
+    def _number(self, floor):
+        """Nadaje id wpisom bez id lub z powtórzonym id (od co najmniej
+        `floor`); zwraca następne wolne id."""
+        ids = entry_ids(self.entries)
+        # Zwykle id rosną razem z pozycją - wtedy nie trzeba zbioru
+        if None not in ids and all(map(operator.lt, ids, ids[1:])):
+            return max(ids[-1] + 1 if ids else 1, floor)
+        seen, missing = set(), []
+        for pos, entry_id in enumerate(ids):
+            if entry_id is None or entry_id in seen:
+                missing.append(pos)
+            else:
+                seen.add(entry_id)
+        next_id = max(max(seen, default=0) + 1, floor)
+        for pos in missing:
+            self._set_id(pos, next_id)
+            next_id += 1
+        return next_id
+
+    def _set_id(self, pos, entry_id):
+        if isinstance(self.entries, EntryStore):
+            self.entries.set_id(pos, entry_id)
+        else:
+            self.entries[pos].id = entry_id
+
+    def _id_at(self, pos):
+        if isinstance(self.entries, EntryStore):
+            return self.entries.id_at(pos)
+        return self.entries[pos].id
+
+    @property
+    def slots(self):
+        """Mapa id -> pozycja (budowana przy pierwszym użyciu)."""
+        if self._slots is None:
+            dead = self.dead
+            self._slots = {entry_id: pos for pos, entry_id
+                           in enumerate(entry_ids(self.entries))
+                           if pos not in dead}
+        return self._slots
+
+    def position(self, entry_id):
+        """Zwraca pozycję wpisu o podanym id (KeyError, gdy go nie ma)."""
+        return self.slots[entry_id]
+
+    def get(self, entry_id):
+        """Zwraca wpis o podanym id (KeyError, gdy go nie ma)."""
+        return self.entries[self.position(entry_id)]
+
+    def claim(self, entry):
+        """Nadaje wpisowi id: zachowuje podane, jeśli jest wolne, a w
+        przeciwnym razie przydziela kolejne. Zwraca id."""
+        entry_id = entry.id
+        # Id >= next_id są zawsze wolne, mapy nie trzeba wtedy budować
+        if entry_id is None or (entry_id < self.next_id
+                                and entry_id in self.slots):
+            entry_id = self.next_id
+        entry.id = entry_id
+        self.next_id = max(self.next_id, entry_id + 1)
+        return entry_id
+
+    def append(self, entry):
+        """Dopisuje wpis na końcu (nadając mu id); zwraca jego pozycję."""
+        self.claim(entry)
+        self.entries.append(entry)
+        pos = len(self.entries) - 1
+        if self._slots is not None:
+            self._slots[entry.id] = pos
+        return pos
+
+    def remove(self, entry_id):
+        """Zamienia wpis o podanym id w nagrobek; zwraca jego pozycję."""
+        pos = self.slots.pop(entry_id)
+        self.dead.add(pos)
+        return pos
+
+    def remove_at(self, pos):
+        """Zamienia wpis z pozycji `pos` w nagrobek."""
+        if self._slots is not None:
+            self._slots.pop(self._id_at(pos), None)
+        self.dead.add(pos)
+
+    def reclaim(self):
+        """Usuwa nagrobki z kontenera w jednym przebiegu (pozycje dalszych
+        wpisów się przesuwają). Zwraca True, gdy jakieś były."""
+        if not self.dead:
+            return False
+        dead = self.dead
+        if isinstance(self.entries, EntryStore):
+            self.entries.drop(dead)
+        else:
+            self.entries[:] = [e for pos, e in enumerate(self.entries)
+                               if pos not in dead]
+        self.dead = set()
+        self._slots = None
+        return True
@@ -0,0 +1,282 @@
+# services/storage.py
+from abc import ABC, abstractmethod
+import json
+import os
+import sys
+from models.entry import make_entry, parse_minutes, span_minutes
+from services.aggregates import Aggregates, project_month_key, week_key
+from services.date_index import ordinal_of
+
+# Rozszerzenia plików obsługiwanych przez SqliteStorage
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    ordinal INTEGER,
+    start TEXT NOT NULL,
+    "end" TEXT NOT NULL,
+    minutes INTEGER,
+    project TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_entries_ordinal ON entries (ordinal);
+CREATE INDEX IF NOT EXISTS idx_entries_project ON entries (project);
+"""
+COLUMNS = 'id, date, start, "end", project'
+
+
+class Storage(ABC):
+    """Interfejs magazynu wpisów używanego przez DataManager.
+
+    Zmiany (rekordy jak w dzienniku: add, add_many, edit, remove) są
+    stosowane od razu przez apply(), a utrwalane przez commit().
+    Wyszukiwanie i sumy wykonywane są po stronie magazynu. Metody
+    abstrakcyjne muszą być zaimplementowane, inaczej utworzenie
+    magazynu kończy się błędem TypeError.
+    """
+
+    @abstractmethod
+    def iter_entries(self):
+        """Generator wszystkich wpisów w kolejności dodania."""
+
+    @abstractmethod
+    def count(self):
+        """Zwraca liczbę wpisów."""
+
+    @abstractmethod
+    def get(self, entry_id):
+        """Zwraca wpis o podanym id (None, gdy go nie ma)."""
+
+    @abstractmethod
+    def next_id(self):
+        """Zwraca id, które dostanie następny wpis."""
+
+    @abstractmethod
+    def entry_at(self, index):
+        """Zwraca wpis na pozycji `index`."""
+
+    @abstractmethod
+    def apply(self, record):
+        """Stosuje rekord zmiany."""
+
+    @abstractmethod
+    def commit(self):
+        """Utrwala zastosowane zmiany."""
+
+    @abstractmethod
+    def replace_all(self, entries):
+        """Zastępuje wszystkie wpisy podanymi i utrwala zmianę."""
+
+    @abstractmethod
+    def find_range(self, first, last):
+        """Zwraca wpisy z zakresu numerów dni [first, last]."""
+
+    @abstractmethod
+    def filter_min_minutes(self, minutes):
+        """Zwraca wpisy trwające co najmniej `minutes` minut."""
+
+    @abstractmethod
+    def aggregates(self):
+        """Zwraca sumy wpisów (Aggregates)."""
+
+    def close(self):
+        pass
+
+
+def is_sqlite_path(filepath):
+    """Czy plik powinien być obsłużony przez SqliteStorage."""
+    return filepath.endswith(SQLITE_EXTENSIONS)
+
+
+def _row(entry):
+    """Zamienia wpis na krotkę wartości kolumn tabeli entries."""
+    return (entry.id, entry.date, ordinal_of(entry.date), entry.start,
+            entry.end, entry.minutes(),
+            getattr(entry, "project", None) or None)
+
+
+class SqliteStorage(Storage):
+    """Magazyn wpisów w bazie SQLite (tryb WAL, indeksy na datę i projekt).
+
+    Kolumna id to stałe id wpisu, a kolejność wpisów wyznacza
+    `ORDER BY id`. Wpisom bez id nadaje je baza (AUTOINCREMENT), więc id
+    usuniętych wpisów nie wracają; wpis z wolnym id zachowuje je.
+    """
+
+    def __init__(self, path):
+        # Konstruktor: połączenie i utworzenie schematu
+        # sqlite3 ładowany dopiero przy otwarciu bazy (nie przy starcie)
+        import sqlite3
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def _entries(self, sql, params=()):
+        for entry_id, date, start, end, project in \
+                self.conn.execute(sql, params):
+            yield make_entry(date, start, end, project, entry_id)
+
+    def iter_entries(self):
+        """Generator wszystkich wpisów w kolejności dodania."""
+        return self._entries(f"SELECT {COLUMNS} FROM entries ORDER BY id")
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def get(self, entry_id):
+        """Zwraca wpis o podanym id (None, gdy go nie ma)."""
+        return next(self._entries(
+            f"SELECT {COLUMNS} FROM entries WHERE id = ?", (entry_id,)),
+            None)
+
+    def next_id(self):
+        """Zwraca id, które dostanie następny wpis: większe od id
+        wszystkich wpisów, także usuniętych (tabela sqlite_sequence)."""
+        row = self.conn.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'entries'"
+        ).fetchone()
+        largest = self.conn.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM entries").fetchone()[0]
+        return max(row[0] if row else 0, largest) + 1
+
+    def entry_at(self, index):
+        """Zwraca wpis na pozycji `index`."""
+        return next(self._entries(
+            f"SELECT {COLUMNS} FROM entries WHERE id = ?",
+            (self._id_at(index),)))
+
+    def _id_at(self, index):
+        """Zwraca id wpisu na pozycji `index` (w kolejności id)."""
+        if index < 0:
+            index += self.count()
+        row = self.conn.execute(
+            "SELECT id FROM entries ORDER BY id LIMIT 1 OFFSET ?",
+            (index,)).fetchone()
+        if row is None:
+            raise IndexError("indeks poza zakresem")
+        return row[0]
+
+    def apply(self, record):
+        """Stosuje rekord zmiany w bieżącej transakcji."""
+        op = record["op"]
+        insert = ('INSERT INTO entries (id, date, ordinal, start, "end", '
+                  'minutes, project) VALUES (?, ?, ?, ?, ?, ?, ?)')
+        if op in ("add", "add_many"):
+            entries = ([record["entry"]] if op == "add"
+                       else record["entries"])
+            # Najpierw wpisy z id, by id nadane przez bazę nie zajęło id
+            # wpisu dalej w porcji; wpis bez id dostaje id od bazy
+            self.conn.executemany(
+                insert, [_row(e) for e in entries if e.id is not None])
+            for entry in entries:
+                if entry.id is None:
+                    entry.id = self.conn.execute(insert,
+                                                 _row(entry)).lastrowid
+        elif op == "edit":
+            start, end = record["start"], record["end"]
+            minutes = None
+            if parse_minutes(start) is not None and \
+                    parse_minutes(end) is not None:
+                minutes = span_minutes(parse_minutes(start),
+                                       parse_minutes(end))
+            self.conn.execute(
+                'UPDATE entries SET start = ?, "end" = ?, minutes = ? '
+                'WHERE id = ?',
+                (start, end, minutes, record["id"]))
+        elif op == "remove":
+            self.conn.execute("DELETE FROM entries WHERE id = ?",
+                              (record["id"],))
+        else:
+            raise ValueError(f"Nieznana operacja: {op}")
+
+    def commit(self):
+        """Zatwierdza wszystkie zmiany od ostatniego zapisu."""
+        self.conn.commit()
+
+    def replace_all(self, entries, batch_size=10000):
+        """Zastępuje zawartość tabeli podanymi wpisami (jedna transakcja)."""
+        self.conn.execute("DELETE FROM entries")
+        batch = []
+        for entry in entries:
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                self.apply({"op": "add_many", "entries": batch})
+                batch = []
+        self.apply({"op": "add_many", "entries": batch})
+        self.commit()
+
+    # --- zapytania wykonywane w SQL ---
+
+    def find_range(self, first, last):
+        """Wpisy z dni o numerach od `first` do `last` włącznie."""
+        return self._entries(
+            f"SELECT {COLUMNS} FROM entries WHERE ordinal BETWEEN ? AND ? "
+            "ORDER BY ordinal, id", (first, last))
+
+    def filter_min_minutes(self, minutes):
+        """Wpisy trwające co najmniej `minutes` minut."""
+        return self._entries(
+            f"SELECT {COLUMNS} FROM entries "
+            "WHERE COALESCE(minutes, 0) >= ? ORDER BY id", (minutes,))
+
+    def aggregates(self):
+        """Buduje Aggregates z zapytań GROUP BY (bez czytania wpisów)."""
+        agg = Aggregates()
+        agg.count, agg.minutes = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(minutes), 0) FROM entries"
+        ).fetchone()
+        days = self.conn.execute(
+            "SELECT date, ordinal, COALESCE(SUM(minutes), 0), COUNT(*) "
+            "FROM entries GROUP BY date ORDER BY MIN(id)")
+        for date, ordinal, minutes, count in days:
+            agg.merge("day", date, minutes, count)
+            agg.merge("month", date[:7], minutes, count)
+            if ordinal is not None:
+                agg.merge("week", week_key(ordinal), minutes, count)
+        projects = self.conn.execute(
+            "SELECT COALESCE(project, ''), COALESCE(SUM(minutes), 0), "
+            "COUNT(*) FROM entries GROUP BY 1 ORDER BY MIN(id)")
+        for project, minutes, count in projects:
+            agg.merge("project", project, minutes, count)
+        cells = self.conn.execute(
+            "SELECT substr(date, 1, 7), COALESCE(project, ''), "
+            "COALESCE(SUM(minutes), 0), COUNT(*) FROM entries "
+            "GROUP BY 1, 2")
+        for month, project, minutes, count in cells:
+            agg.merge("project_month", project_month_key(month, project),
+                      minutes, count)
+        return agg
+
+    def close(self):
+        self.conn.close()
+
+
+def migrate_json_to_sqlite(json_path, db_path):
+    """Przenosi wpisy z pliku JSON/JSON Lines do bazy SQLite.
+
+    Zwraca liczbę przeniesionych wpisów.
+    """
+    from services.data_manager import DataManager
+    source = DataManager(json_path, lazy=True)
+    storage = SqliteStorage(db_path)
+    try:
+        storage.replace_all(source.iter_entries())
+        return storage.count()
+    finally:
+        storage.close()
+
+
+if __name__ == "__main__":
+    # python -m services.storage data/work_log.json data/work_log.db
+    if len(sys.argv) != 3 or not is_sqlite_path(sys.argv[2]):
+        print("Użycie: python -m services.storage PLIK.json PLIK.db")
+        sys.exit(1)
+    if not os.path.exists(sys.argv[1]):
+        print(f"❌ Brak pliku {sys.argv[1]}")
+        sys.exit(1)
+    migrated = migrate_json_to_sqlite(sys.argv[1], sys.argv[2])
+    print(json.dumps({"migrated": migrated, "database": sys.argv[2]}))
@@ -0,0 +1,61 @@
+# services/summation.py
+from itertools import islice
+from services.entry_store import EntryStore
+from utils.parallel import bounded_map
+
+# Domyślny rozmiar bloku wpisów
+CHUNK_SIZE = 65536
+
+
+def chunks(entries, size=CHUNK_SIZE):
+    """Dzieli dowolny iterowalny zbiór wpisów na listy po `size` elementów."""
+    it = iter(entries)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def chunk_minutes(chunk):
+    """Zwraca sumę minut pracy w bloku wpisów (błędne godziny = 0)."""
+    return sum(e.minutes() or 0 for e in chunk)
+
+
+def tree_sum(partials, lo=0, hi=None):
+    """Rekurencyjnie sumuje wyniki bloków parami (głębokość O(log n))."""
+    if hi is None:
+        hi = len(partials)
+    if hi - lo == 0:
+        return 0
+    if hi - lo == 1:
+        return partials[lo]
+    mid = (lo + hi) // 2
+    return tree_sum(partials, lo, mid) + tree_sum(partials, mid, hi)
+
+
+def total_minutes(entries, chunk_size=CHUNK_SIZE, workers=None):
+    """Sumuje czas pracy wpisów w minutach, blok po bloku.
+
+    Sumowanie odbywa się na liczbach całkowitych, więc wynik jest
+    dokładny niezależnie od liczby wpisów. Przy `workers` > 1 bloki
+    są przeliczane w puli procesów, a w kolejce czeka najwyżej
+    2 * `workers` bloków (generator nie trafia naraz do pamięci).
+    """
+    if isinstance(entries, EntryStore):
+        return entries.total_minutes()
+    blocks = chunks(entries, chunk_size)
+    if workers and workers > 1:
+        # import w miejscu użycia: multiprocessing spowalnia start programu
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = list(bounded_map(pool, chunk_minutes, blocks,
+                                        workers * 2))
+    else:
+        partials = [chunk_minutes(block) for block in blocks]
+    return tree_sum(partials)
+
+
+def total_hours(entries, chunk_size=CHUNK_SIZE, workers=None):
+    """Sumuje czas pracy wpisów w godzinach (zob. total_minutes)."""
+    return total_minutes(entries, chunk_size, workers) / 60
@@ -2,10 +2,38 @@
 import unittest
 from models.entry import WorkEntry
 from utils.validators import validate_date, validate_time, log_operation
-from services.data_manager import DataManager
+from utils.validators import validate_dates, times_to_minutes
+from services.data_manager import DataManager, iter_json_array, ConflictError
+from services.data_manager import OverlapError
+import io
 import os
 from models.entry import ProjectWorkEntry
+from services.entry_store import EntryStore
+from services.aggregates import Aggregates
+from services import analytics
+from services.summation import total_hours, tree_sum
+from utils.parallel import bounded_map
+from services.importer import import_csv
+from services.exporter import export_csv
+from services.storage import Storage, migrate_json_to_sqlite
+from services import charts
+from services.analyzer import Analyzer, safe_name
+import cli
+import asyncio
+from services.api_server import ApiServer
+from benchmarks import bench_api, bench_suite, generator
+import json
+from utils.lazy_import import optional_import
+from utils import instrumentation
+import gzip
 import timeit
+import random
+from services.interval_index import find_overlaps, interval_of
+from services.reports import pivot, pivot_from_aggregates
+from services.listing import EntryPager
+from models.entry import make_entry
+from services.rollups import Rollup
+from services.date_index import ordinal_to_str
 
 
 # Testy walidatorów i dekoratora
@@ -22,6 +50,35 @@ class TestValidators(unittest.TestCase):
     def test_validate_time_incorrect(self):
         self.assertFalse(validate_time("800"))
 
+    def test_fast_path_matches_strptime(self):
+        from datetime import datetime
+
+        def reference(value, fmt):
+            try:
+                datetime.strptime(value, fmt)
+                return True
+            except ValueError:
+                return False
+        dates = ["2024-02-29", "2023-02-29", "1900-02-29", "2000-02-29",
+                 "2024-04-31", "2024-12-31", "0000-01-01", "2024-00-10",
+                 "2024-1-5", "2024-01- 5", " 2024-01-05", "2024/01/05"]
+        times = ["00:00", "23:59", "24:00", "12:60", "9:05", "09:5", "1234"]
+        for value in dates:
+            self.assertEqual(validate_date(value),
+                             reference(value, "%Y-%m-%d"), value)
+        for value in times:
+            self.assertEqual(validate_time(value),
+                             reference(value, "%H:%M"), value)
+        with self.assertRaises(TypeError):
+            validate_date(None)
+
+    def test_column_validation(self):
+        self.assertEqual(validate_dates(["2024-02-29", "2023-02-29",
+                                         "2024-02-29", None]),
+                         [True, False, True, False])
+        self.assertEqual(times_to_minutes(["08:30", "8:30", "24:00"]),
+                         [510, 510, None])
+
     def test_log_operation_decorator(self):
         calls = []
 
@@ -34,6 +91,63 @@ class TestValidators(unittest.TestCase):
         self.assertEqual(len(calls), 1)
 
 
+# Testy pomiarów wydajności (utils.instrumentation)
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        self.log_file = os.path.join(base_dir, "data", "test_trace.jsonl")
+        instrumentation.reset()
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+        for suffix in ("", ".1", ".2"):
+            if os.path.exists(self.log_file + suffix):
+                os.remove(self.log_file + suffix)
+
+    def test_disabled_records_nothing(self):
+        @instrumentation.instrument("test.op")
+        def op():
+            return 1
+        self.assertEqual(op(), 1)
+        self.assertEqual(instrumentation.summary(), {})
+
+    def test_records_calls_entries_and_errors(self):
+        @instrumentation.instrument("test.op",
+                                    entries=lambda result, args: result)
+        def op(n):
+            if n < 0:
+                raise ValueError("ujemne")
+            return n
+        instrumentation.enable()
+        op(3)
+        op(4)
+        with self.assertRaises(ValueError):
+            op(-1)
+        with instrumentation.span("test.block") as record:
+            record.entries = 5
+        stats = instrumentation.summary()
+        self.assertEqual((stats["test.op"]["calls"],
+                          stats["test.op"]["entries"],
+                          stats["test.op"]["errors"]), (3, 7, 1))
+        self.assertEqual(stats["test.block"]["entries"], 5)
+        self.assertIn("test.op", instrumentation.format_summary())
+
+    def test_rotating_json_log(self):
+        instrumentation.enable(self.log_file, max_bytes=300, backups=2)
+        manager = DataManager(":memory:")
+        for i in range(20):
+            manager.add_entry(WorkEntry("2024-01-01", f"{i:02d}:00",
+                                        f"{i:02d}:30"))
+            Analyzer().analyze(manager.entries)
+        instrumentation.disable()
+        self.assertTrue(os.path.exists(self.log_file + ".1"))
+        with open(self.log_file, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records[-1]["op"], "analyzer.analyze")
+        self.assertEqual(records[-1]["entries"], 20)
+
+
 # Testy klasy WorkEntry
 class TestWorkEntry(unittest.TestCase):
     def test_duration_valid(self):
@@ -56,14 +170,24 @@ class TestWorkEntry(unittest.TestCase):
         self.assertEqual(entry.start, "08:00")
         self.assertEqual(entry.end, "16:00")
 
-    def test_duration_negative(self):
+    def test_duration_end_before_start_is_overnight(self):
         entry = WorkEntry("2024-01-01", "16:00", "08:00")
-        self.assertEqual(entry.duration(), -8)
+        self.assertEqual(entry.duration(), 16)
 
     def test_duration_invalid_time(self):
         entry = WorkEntry("2024-01-01", "xx:yy", "16:00")
         self.assertEqual(entry.duration(), 0)
 
+    def test_duration_after_reassignment(self):
+        entry = WorkEntry("2024-01-01", "08:00", "16:00")
+        entry.start = "10:00"
+        entry.end = "12:30"
+        self.assertEqual(entry.duration(), 2.5)
+
+    def test_slots(self):
+        entry = ProjectWorkEntry("2024-01-01", "08:00", "16:00", "P")
+        self.assertFalse(hasattr(entry, "__dict__"))
+
 
 # Testy DataManagera
 class TestDataManager(unittest.TestCase):
@@ -81,8 +205,10 @@ class TestDataManager(unittest.TestCase):
         ]
 
     def tearDown(self):
-        if os.path.exists(self.test_file):
-            os.remove(self.test_file)
+        for path in (self.test_file, self.test_file + ".agg",
+                     self.test_file + ".lock"):
+            if os.path.exists(path):
+                os.remove(path)
 
     def test_save_and_load(self):
         self.manager.save()
@@ -91,6 +217,1088 @@ class TestDataManager(unittest.TestCase):
         self.assertEqual(new_manager.entries[0].date, "2024-01-01")
         self.assertEqual(new_manager.entries[1].start, "09:00")
 
+    def test_save_and_load_columnar(self):
+        self.manager.save()
+        new_manager = DataManager(self.test_file, columnar=True)
+        self.assertIsInstance(new_manager.entries, EntryStore)
+        self.assertEqual(new_manager.entries[1].start, "09:00")
+        self.assertEqual(new_manager.entries.total_minutes(), 960)
+
+    def test_columnar_keeps_invalid_records(self):
+        records = [{"date": "2024-01-01", "start": "08:00", "end": "16:00"},
+                   {"date": "2024-01-02", "start": "xx:yy", "end": "16:00"},
+                   {"date": "2024-02-30", "start": "08:00", "end": "09:00"}]
+        with open(self.test_file, "w") as f:
+            json.dump(records, f)
+        manager = DataManager(self.test_file, columnar=True)
+        self.assertEqual(len(manager.entries), 3)
+        self.assertIsNone(manager.entries[1].minutes())
+        self.assertEqual(manager.entries.total_minutes(), 540)
+        found = manager.find_range("2024-01-01", "2024-12-31")
+        self.assertEqual([e.date for e in found],
+                         ["2024-01-01", "2024-01-02"])
+        manager.add_entry(WorkEntry("2024-01-03", "08:00", "09:00"))
+        manager.save()
+        saved = [e.to_dict() for e in DataManager(self.test_file).entries]
+        self.assertEqual([{k: d[k] for k in ("date", "start", "end")}
+                          for d in saved[:3]], records)
+
+
+# Testy trybu dziennika zmian (journal)
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        self.test_file = os.path.join(base_dir, "data", "test_journal.json")
+        self.manager = DataManager(self.test_file, journal=True)
+
+    def tearDown(self):
+        for path in (self.test_file, self.manager.journal_path,
+                     self.manager.aggregates_path, self.test_file + ".lock",
+                     self.manager.compacting_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_changes_are_journaled(self):
+        self.manager.add_entry(WorkEntry("2024-01-01", "08:00", "16:00"))
+        self.manager.add_entry(WorkEntry("2024-01-02", "09:00", "17:00"))
+        self.manager.edit_entry(0, "10:00", "12:00")
+        self.manager.remove_entry(1)
+        self.manager.save()
+        self.assertFalse(os.path.exists(self.test_file))
+        reloaded = DataManager(self.test_file, journal=True)
+        self.assertEqual(len(reloaded.entries), 1)
+        self.assertEqual(reloaded.entries[0].duration(), 2.0)
+
+    def test_compaction(self):
+        self.manager.compact_every = 2
+        self.manager.add_entry(WorkEntry("2024-01-01", "08:00", "16:00"))
+        self.manager.save()
+        self.assertTrue(os.path.exists(self.manager.journal_path))
+        self.manager.add_entry(WorkEntry("2024-01-02", "09:00", "17:00"))
+        self.manager.save()
+        self.assertFalse(os.path.exists(self.manager.journal_path))
+        reloaded = DataManager(self.test_file)
+        self.assertEqual(len(reloaded.entries), 2)
+
+    def test_torn_journal_record(self):
+        self.manager.add_entry(WorkEntry("2024-01-01", "08:00", "16:00"))
+        self.manager.save()
+        with open(self.manager.journal_path, "a") as f:
+            f.write('{"op": "add", "entry": {"da')
+        reloaded = DataManager(self.test_file, journal=True)
+        self.assertEqual(len(reloaded.entries), 1)
+
+    def test_append_after_torn_record(self):
+        self.manager.add_entry(WorkEntry("2024-01-01", "08:00", "16:00"))
+        self.manager.save()
+        with open(self.manager.journal_path, "a") as f:
+            f.write('{"op": "add", "entry": {"da')
+        manager = DataManager(self.test_file, journal=True)
+        manager.add_entry(WorkEntry("2024-01-02", "08:00", "16:00"))
+        manager.save()
+        manager.add_entry(WorkEntry("2024-01-03", "08:00", "16:00"))
+        manager.save()
+        reloaded = DataManager(self.test_file, journal=True)
+        self.assertEqual([e.date for e in reloaded.entries],
+                         ["2024-01-01", "2024-01-02", "2024-01-03"])
+        # Rekord bez końcowego znaku nowego wiersza jest zachowywany
+        with open(self.manager.journal_path, "rb+") as f:
+            f.truncate(f.seek(0, os.SEEK_END) - 1)
+        manager = DataManager(self.test_file, journal=True)
+        manager.add_entry(WorkEntry("2024-01-04", "08:00", "16:00"))
+        manager.save()
+        reloaded = DataManager(self.test_file, journal=True)
+        self.assertEqual(len(reloaded.entries), 4)
+
+    def test_crash_during_compaction(self):
+        from unittest import mock
+        for day in ("2024-01-01", "2024-01-02", "2024-01-03"):
+            self.manager.add_entry(WorkEntry(day, "08:00", "16:00"))
+        self.manager.save()
+        # Awaria po zapisaniu migawki, przed usunięciem dziennika
+        with mock.patch("os.remove", side_effect=OSError("awaria")), \
+                self.assertRaises(OSError):
+            self.manager.compact()
+        self.assertTrue(os.path.exists(self.manager.journal_path))
+        reloaded = DataManager(self.test_file, journal=True)
+        self.assertEqual([e.id for e in reloaded.entries], [1, 2, 3])
+        self.assertEqual(reloaded.audit(), [])
+        # Najbliższy zapis dokańcza kompaktowanie
+        reloaded.add_entry(WorkEntry("2024-01-04", "08:00", "16:00"))
+        reloaded.save()
+        self.assertFalse(os.path.exists(self.manager.compacting_path))
+        reloaded = DataManager(self.test_file, journal=True)
+        self.assertEqual([e.id for e in reloaded.entries], [1, 2, 3, 4])
+
+    def test_lazy_append_without_loading(self):
+        self.manager.add_entry(WorkEntry("2024-01-01", "08:00", "16:00"))
+        self.manager.save()
+        self.manager.compact()
+        self.manager.add_entry(WorkEntry("2024-01-02", "22:00", "02:00"))
+        self.manager.save()
+        lazy = DataManager(self.test_file, journal=True, lazy=True)
+        # Kolizje z migawką, z dziennikiem i z wpisem z poprzedniego dnia
+        for day, start, end in (("2024-01-01", "15:00", "17:00"),
+                                ("2024-01-02", "23:00", "23:30"),
+                                ("2024-01-03", "01:00", "03:00")):
+            with self.assertRaises(OverlapError):
+                lazy.add_entry(WorkEntry(day, start, end))
+        accepted, rejected = lazy.partition_overlaps([
+            WorkEntry("2024-01-03", "03:00", "04:00"),
+            WorkEntry("2024-01-01", "07:00", "09:00")])
+        self.assertEqual((len(accepted), [i for i, _ in rejected]), (1, [1]))
+        self.assertEqual(lazy.add_entries(accepted, checked=True), [3])
+        lazy.save()
+        self.assertFalse(lazy.loaded)
+        reloaded = DataManager(self.test_file, journal=True)
+        self.assertEqual([e.id for e in reloaded.entries], [1, 2, 3])
+        self.assertEqual(reloaded.audit(), [])
+        # Po wczytaniu niezapisane wpisy zostają w danych
+        lazy.add_entry(WorkEntry("2024-01-04", "08:00", "09:00"))
+        self.assertEqual(len(lazy.entries), 4)
+
+    def test_lazy_appends_from_two_processes(self):
+        self.manager.add_entry(WorkEntry("2024-01-01", "08:00", "16:00"))
+        self.manager.save()
+        first = DataManager(self.test_file, journal=True, lazy=True)
+        second = DataManager(self.test_file, journal=True, lazy=True)
+        first.add_entry(WorkEntry("2024-01-02", "08:00", "16:00"))
+        second.add_entries([WorkEntry("2024-01-03", "08:00", "16:00"),
+                            WorkEntry("2024-01-04", "08:00", "16:00")])
+        first.save()
+        second.save()
+        self.assertFalse(first.loaded or second.loaded)
+        reloaded = DataManager(self.test_file, journal=True)
+        self.assertEqual([(e.id, e.date) for e in reloaded.entries],
+                         [(1, "2024-01-01"), (2, "2024-01-02"),
+                          (3, "2024-01-03"), (4, "2024-01-04")])
+        reloaded.add_entry(WorkEntry("2024-01-05", "08:00", "16:00"))
+        self.assertEqual(reloaded.entries[-1].id, 5)
+
+    def test_range_streams_without_loading(self):
+        def ranged(manager):
+            return sorted((e.id, e.start) for e in manager.iter_range(
+                "2024-01-02", "2024-01-04"))
+        for day in range(1, 6):
+            self.manager.add_entry(WorkEntry(f"2024-01-0{day}", "08:00",
+                                             "16:00"))
+        self.manager.compact()
+        lazy = DataManager(self.test_file, journal=True, lazy=True)
+        self.assertEqual(ranged(lazy), [(2, "08:00"), (3, "08:00"),
+                                        (4, "08:00")])
+        self.assertFalse(lazy.loaded)
+        # Edycja, usunięcie i dodanie zapisane w dzienniku
+        self.manager.edit_by_id(2, "09:00", "10:00")
+        self.manager.remove_by_id(3)
+        self.manager.add_entry(WorkEntry("2024-01-02", "12:00", "13:00"))
+        self.manager.save()
+        lazy = DataManager(self.test_file, journal=True, lazy=True)
+        self.assertEqual(ranged(lazy), [(2, "09:00"), (4, "08:00"),
+                                        (6, "12:00")])
+        self.assertFalse(lazy.loaded)
+        self.assertEqual([e.date for e in lazy.iter_range("2024-01-02",
+                                                          "2024-01-04")],
+                         [e.date for e in self.manager.find_range(
+                             "2024-01-02", "2024-01-04")])
+
+    def test_lazy_append_after_torn_record(self):
+        self.manager.add_entry(WorkEntry("2024-01-01", "08:00", "16:00"))
+        self.manager.save()
+        with open(self.manager.journal_path, "a") as f:
+            f.write('{"op": "add", "entry": {"da')
+        lazy = DataManager(self.test_file, journal=True, lazy=True)
+        lazy.add_entry(WorkEntry("2024-01-02", "08:00", "16:00"))
+        lazy.save()
+        reloaded = DataManager(self.test_file, journal=True)
+        self.assertEqual([e.date for e in reloaded.entries],
+                         ["2024-01-01", "2024-01-02"])
+
+
+def add_in_process(args):
+    """Dodaje wpisy w osobnym procesie (test blokad między procesami)."""
+    path, day, count = args
+    for hour in range(count):
+        manager = DataManager(path)
+        manager.add_entry(WorkEntry(day, f"{hour:02d}:00", f"{hour:02d}:30"))
+        manager.save()
+
+
+# Testy pracy wielu procesów na jednym pliku
+class TestConcurrency(unittest.TestCase):
+    def setUp(self):
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        self.test_file = os.path.join(base_dir, "data", "test_lock.json")
+        seed = DataManager(self.test_file)
+        seed.entries = [WorkEntry("2024-01-01", "08:00", "16:00")]
+        seed.save()
+        self.first = DataManager(self.test_file)
+        self.second = DataManager(self.test_file)
+
+    def tearDown(self):
+        for suffix in ("", ".journal", ".agg", ".lock"):
+            if os.path.exists(self.test_file + suffix):
+                os.remove(self.test_file + suffix)
+
+    def test_adds_are_merged(self):
+        self.first.add_entry(WorkEntry("2024-01-02", "08:00", "10:00"))
+        self.first.save()
+        self.second.add_entry(WorkEntry("2024-01-03", "08:00", "11:00"))
+        self.second.save()
+        dates = [e.date for e in DataManager(self.test_file).entries]
+        self.assertEqual(dates, ["2024-01-01", "2024-01-02", "2024-01-03"])
+
+    def test_stale_edit_is_rejected(self):
+        self.first.remove_entry(0)
+        self.first.save()
+        self.second.edit_entry(0, "09:00", "10:00")
+        with self.assertRaises(ConflictError):
+            self.second.save()
+        self.second.reload()
+        self.assertEqual(len(self.second.entries), 0)
+
+    def test_refresh_only_after_change(self):
+        self.assertFalse(self.second.refresh())
+        self.first.add_entry(WorkEntry("2024-01-02", "08:00", "10:00"))
+        self.first.save()
+        self.assertTrue(self.second.refresh())
+        self.assertEqual(len(self.second.entries), 2)
+        self.assertFalse(self.second.refresh())
+
+    def test_parallel_processes(self):
+        from concurrent.futures import ProcessPoolExecutor
+        jobs = [(self.test_file, f"2024-02-0{i}", 10) for i in range(1, 5)]
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            list(pool.map(add_in_process, jobs))
+        self.assertEqual(len(DataManager(self.test_file).entries), 41)
+
+
+# Testy strumieniowego i leniwego wczytywania
+class TestStreamingLoad(unittest.TestCase):
+    def setUp(self):
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        self.test_file = os.path.join(base_dir, "data", "test_stream.jsonl")
+
+    def tearDown(self):
+        for path in (self.test_file, self.test_file + ".agg",
+                     self.test_file + ".lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_iter_json_array_small_chunks(self):
+        data = '[ {"a": "x]"}, {"b": [1, 2]} ,{"c": {}} ]'
+        items = list(iter_json_array(io.StringIO(data), chunk_size=3))
+        self.assertEqual(items, [{"a": "x]"}, {"b": [1, 2]}, {"c": {}}])
+
+    def test_iter_json_array_truncated(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array(io.StringIO('[{"a": 1}, {"b"'), 4))
+
+    def test_lazy_json_lines(self):
+        manager = DataManager(self.test_file)
+        manager.entries = [WorkEntry("2024-01-01", "08:00", "16:00"),
+                           WorkEntry("2024-01-02", "09:00", "17:00")]
+        manager.save()
+        lazy = DataManager(self.test_file, lazy=True)
+        self.assertFalse(lazy.loaded)
+        hours = [e.duration() for e in lazy.iter_entries()]
+        self.assertEqual(hours, [8.0, 8.0])
+        self.assertFalse(lazy.loaded)
+        lazy.remove_entry(0)
+        self.assertTrue(lazy.loaded)
+        self.assertEqual(len(lazy.entries), 1)
+
+
+# Testy indeksu dat w DataManagerze
+class TestDateIndex(unittest.TestCase):
+    def setUp(self):
+        # Wpisy o tych samych godzinach: testy dotyczą tylko indeksu dat
+        self.manager = DataManager(":memory:", allow_overlaps=True)
+        for date in ("2024-03-01", "2024-02-28", "2024-03-01", "2024-04-02"):
+            self.manager.add_entry(WorkEntry(date, "08:00", "16:00"))
+
+    def test_find_by_date(self):
+        self.assertEqual(len(self.manager.find_by_date("2024-03-01")), 2)
+        self.assertEqual(self.manager.find_by_date("2024-03-02"), [])
+        self.assertEqual(self.manager.find_by_date("zła data"), [])
+
+    def test_find_range_and_month(self):
+        found = self.manager.find_range("2024-02-01", "2024-03-31")
+        self.assertEqual(sorted(e.date for e in found),
+                         ["2024-02-28", "2024-03-01", "2024-03-01"])
+        self.assertEqual(len(self.manager.find_month("2024-04")), 1)
+
+    def test_index_follows_changes(self):
+        self.manager.find_by_date("2024-03-01")  # budowa indeksu
+        self.manager.remove_entry(0)
+        self.manager.add_entry(WorkEntry("2024-04-02", "09:00", "10:00"))
+        found = self.manager.find_by_date("2024-04-02")
+        self.assertEqual([e.start for e in found], ["08:00", "09:00"])
+        self.assertEqual(len(self.manager.find_by_date("2024-03-01")), 1)
+
+    def test_columnar_index(self):
+        manager = DataManager(":memory:", columnar=True)
+        manager.add_entry(WorkEntry("2024-03-01", "08:00", "16:00"))
+        self.assertEqual(manager.find_month("2024-03")[0].duration(), 8.0)
+
+
+# Testy wykrywania nakładających się wpisów
+class TestOverlaps(unittest.TestCase):
+    def setUp(self):
+        self.manager = DataManager(":memory:")
+        self.manager.add_entry(WorkEntry("2024-05-01", "08:00", "12:00"))
+        self.manager.add_entry(WorkEntry("2024-05-01", "22:00", "06:00"))
+
+    def test_overnight_duration(self):
+        entry = WorkEntry("2024-05-01", "22:00", "06:00")
+        self.assertEqual(entry.duration(), 8.0)
+        store = EntryStore([entry, WorkEntry("2024-05-02", "08:00", "09:00")])
+        self.assertEqual(store.total_minutes(), 540)
+
+    def test_add_rejects_overlap(self):
+        with self.assertRaises(OverlapError):
+            self.manager.add_entry(WorkEntry("2024-05-01", "11:00", "13:00"))
+        # Zmiana nocna sięga następnego dnia
+        with self.assertRaises(OverlapError):
+            self.manager.add_entry(WorkEntry("2024-05-02", "05:00", "07:00"))
+        # Przedziały stykające się końcami nie kolidują
+        self.manager.add_entry(WorkEntry("2024-05-01", "12:00", "14:00"))
+        self.manager.add_entry(WorkEntry("2024-05-02", "06:00", "07:00"))
+        self.assertEqual(len(self.manager.entries), 4)
+
+    def test_edit_and_remove_follow_index(self):
+        with self.assertRaises(OverlapError):
+            self.manager.edit_entry(0, "07:00", "23:00")
+        self.manager.edit_entry(0, "09:00", "13:00")  # pomija samego siebie
+        self.manager.remove_entry(0)
+        self.manager.add_entry(WorkEntry("2024-05-01", "08:00", "12:00"))
+        with self.assertRaises(OverlapError):
+            self.manager.add_entry(WorkEntry("2024-05-01", "23:00", "23:30"))
+
+    def test_batch_rejects_whole_list(self):
+        batch = [WorkEntry("2024-05-03", "08:00", "10:00"),
+                 WorkEntry("2024-05-03", "09:00", "11:00")]
+        with self.assertRaises(OverlapError):
+            self.manager.add_entries(batch)
+        self.assertEqual(len(self.manager.entries), 2)
+        accepted, rejected = self.manager.partition_overlaps(batch)
+        self.assertEqual((len(accepted), [i for i, _ in rejected]), (1, [1]))
+
+    def test_import_reports_overlapping_lines(self):
+        csv_data = io.StringIO("date,start,end\n2024-05-01,10:00,11:00\n"
+                               "2024-05-02,08:00,09:00\n"
+                               "2024-05-02,08:30,09:30\n")
+        count, rejected = import_csv(self.manager, csv_data)
+        self.assertEqual(count, 1)
+        self.assertEqual([line for line, _ in rejected], [2, 4])
+
+    def test_audit_matches_pairwise_check(self):
+        rng = random.Random(7)
+        entries = [WorkEntry(f"2024-05-0{rng.randint(1, 3)}",
+                             f"{rng.randint(0, 23):02d}:00",
+                             f"{rng.randint(0, 23):02d}:30")
+                   for _ in range(60)]
+        manager = DataManager(":memory:", allow_overlaps=True)
+        manager.add_entries(entries)
+        expected = []
+        for a in range(len(entries)):
+            for b in range(a + 1, len(entries)):
+                (s1, e1), (s2, e2) = interval_of(entries[a]), \
+                    interval_of(entries[b])
+                if min(e1, e2) > max(s1, s2):
+                    expected.append((a, b, min(e1, e2) - max(s1, s2)))
+        self.assertEqual(manager.audit(), expected)
+        self.assertEqual(find_overlaps(entries[:1]), [])
+
+
+# Testy stałych id wpisów (mapa id -> slot, nagrobki)
+class TestEntryIds(unittest.TestCase):
+    def setUp(self):
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        self.test_file = os.path.join(base_dir, "data", "test_ids.json")
+        self.csv_file = os.path.join(base_dir, "data", "test_ids.csv")
+        self.manager = DataManager(self.test_file, journal=True)
+        self.manager.add_entries([
+            WorkEntry(f"2024-07-0{day}", "08:00", "12:00")
+            for day in range(1, 6)])
+
+    def tearDown(self):
+        for suffix in ("", ".journal", ".agg", ".lock"):
+            if os.path.exists(self.test_file + suffix):
+                os.remove(self.test_file + suffix)
+        if os.path.exists(self.csv_file):
+            os.remove(self.csv_file)
+
+    def test_ids_are_stable(self):
+        self.assertEqual([e.id for e in self.manager.entries],
+                         [1, 2, 3, 4, 5])
+        self.manager.remove_by_id(2)
+        # Nagrobek: pozycje pozostałych wpisów jeszcze się nie zmieniły
+        self.assertEqual(len(self.manager._table.entries), 5)
+        self.manager.edit_by_id(4, "09:00", "10:00")
+        self.assertEqual(self.manager.get_entry(4).date, "2024-07-04")
+        with self.assertRaises(KeyError):
+            self.manager.get_entry(2)
+        self.assertEqual(self.manager.add_entry(
+            WorkEntry("2024-07-09", "08:00", "09:00")), 6)
+        self.assertEqual(self.manager.find_by_date("2024-07-04")[0].end,
+                         "10:00")
+        self.assertEqual([e.id for e in self.manager.entries],
+                         [1, 3, 4, 5, 6])
+
+    def test_ids_persist(self):
+        self.manager.remove_by_id(1)
+        self.manager.edit_by_id(3, "13:00", "14:00")
+        self.manager.save()
+        for columnar in (False, True):
+            reloaded = DataManager(self.test_file, journal=True,
+                                   columnar=columnar)
+            self.assertEqual(reloaded.get_entry(3).start, "13:00")
+            self.assertEqual([e.id for e in reloaded.entries], [2, 3, 4, 5])
+        self.manager.compact()
+        with open(self.test_file) as f:
+            self.assertEqual([d["id"] for d in json.load(f)], [2, 3, 4, 5])
+
+    def test_removed_ids_are_not_reused(self):
+        # Usunięcie wpisu o największym id i kompaktowanie migawki
+        self.manager.remove_by_id(5)
+        self.manager.save()
+        self.manager.compact()
+        for journal, expected in ((True, 6), (False, 7)):
+            manager = DataManager(self.test_file, journal=journal)
+            entry_id = manager.add_entry(
+                WorkEntry("2024-07-09", "08:00", "09:00"))
+            self.assertEqual(entry_id, expected)
+            manager.remove_by_id(entry_id)
+            manager.save()
+            manager.compact()
+        self.assertEqual(DataManager(self.test_file).add_entry(
+            WorkEntry("2024-07-09", "08:00", "09:00")), 8)
+
+    def test_removed_ids_are_not_reused_sqlite(self):
+        db_file = self.test_file[:-5] + ".db"
+        try:
+            for lazy, expected in ((True, 1), (False, 2), (True, 3)):
+                manager = DataManager(db_file, lazy=lazy)
+                entry_id = manager.add_entry(
+                    WorkEntry("2024-07-10", "08:00", "09:00"))
+                self.assertEqual(entry_id, expected)
+                manager.remove_by_id(entry_id)
+                manager.save()
+                manager.storage.close()
+            manager = DataManager(db_file, lazy=True)
+            # Wolne id podane we wpisie jest zachowywane, pozostałe nadaje
+            # baza (także gdy wpis z id jest dalej w porcji)
+            self.assertEqual(manager.add_entries([
+                WorkEntry("2024-07-11", "08:00", "09:00"),
+                make_entry("2024-07-12", "08:00", "09:00", entry_id=10)]),
+                [11, 10])
+            manager.save()
+            self.assertEqual([e.id for e in manager.storage.iter_entries()],
+                             [10, 11])
+        finally:
+            manager.storage.close()
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(db_file + suffix):
+                    os.remove(db_file + suffix)
+
+    def test_legacy_file_gets_ids(self):
+        with open(self.test_file, "w") as f:
+            json.dump([{"date": "2024-07-01", "start": "08:00",
+                        "end": "09:00"}] * 2, f)
+        with open(self.test_file + ".journal", "w") as f:
+            f.write('{"op": "remove", "index": 0}\n')
+        manager = DataManager(self.test_file, journal=True,
+                              allow_overlaps=True)
+        self.assertEqual([e.id for e in manager.entries], [2])
+
+    def test_csv_round_trip(self):
+        self.manager.remove_by_id(2)
+        export_csv(self.manager.entries, self.csv_file)
+        target = DataManager(":memory:")
+        target.add_entry(WorkEntry("2024-08-01", "08:00", "09:00"))
+        count, rejected = import_csv(target, self.csv_file)
+        self.assertEqual((count, rejected), (4, []))
+        # Zajęte id 1 zastąpiło kolejne wolne, pozostałe są zachowane
+        self.assertEqual([e.id for e in target.entries], [1, 2, 3, 4, 5])
+        self.assertEqual(target.get_entry(2).date, "2024-07-01")
+        self.assertEqual(target.get_entry(3).date, "2024-07-03")
+
+
+# Testy stronicowanej listy wpisów
+class TestListing(unittest.TestCase):
+    def setUp(self):
+        self.manager = DataManager(":memory:")
+        self.manager.add_entries([
+            make_entry(f"2024-01-{day:02d}", "08:00", "16:00",
+                       "ProjX" if day % 10 == 0 else None)
+            for day in range(1, 31)])
+
+    def test_pages_render_only_visible_entries(self):
+        pager = EntryPager(self.manager.entries, page_size=7)
+        self.assertEqual(pager.pages, 5)
+        pager.go(4)
+        text = pager.render()
+        self.assertEqual(text.count("\n"), 3)
+        self.assertIn("29. 2024-01-29", text)
+        pager.next()
+        self.assertEqual(pager.page, 4)
+
+    def test_jump_and_search(self):
+        pager = EntryPager(self.manager.entries, page_size=7)
+        pager.show_position(self.manager.position_from_date("2024-01-16"))
+        self.assertEqual(list(pager.visible())[0], 14)
+        found = pager.search("ProjX")
+        self.assertEqual(list(found.visible()), [9, 19, 29])
+        self.assertTrue(found.show_date("2024-01-15"))
+        self.assertIsNone(self.manager.position_from_date("2025-01-01"))
+
+    def test_select_by_number_after_search(self):
+        from unittest import mock
+        from main import browse_entries
+        with mock.patch("builtins.input", side_effect=["s ProjX", "20"]), \
+                mock.patch("sys.stdout", new_callable=io.StringIO):
+            entry_id = browse_entries(self.manager.entries, self.manager,
+                                      select="numer")
+        self.assertEqual(self.manager.get_entry(entry_id).date, "2024-01-20")
+
+
+# Testy przyrostowych sum czasu pracy
+class TestAggregates(unittest.TestCase):
+    def setUp(self):
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        self.test_file = os.path.join(base_dir, "data", "test_agg.json")
+        self.manager = DataManager(self.test_file, journal=True)
+        self.manager.add_entry(WorkEntry("2024-01-01", "08:00", "16:00"))
+        self.manager.add_entry(
+            ProjectWorkEntry("2024-01-08", "09:00", "12:00", "ProjX"))
+
+    def tearDown(self):
+        for path in (self.test_file, self.manager.journal_path,
+                     self.manager.aggregates_path, self.test_file + ".lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_buckets(self):
+        agg = self.manager.aggregates()
+        self.assertEqual(len(agg), 2)
+        self.assertEqual(agg.total_minutes(), 660)
+        self.assertEqual(agg.monthly_hours(), {"2024-01": 11.0})
+        self.assertEqual(agg.hours("week"),
+                         {"2024-W01": 8.0, "2024-W02": 3.0})
+        self.assertEqual(agg.hours("project"), {"": 8.0, "ProjX": 3.0})
+
+    def test_incremental_matches_recomputed(self):
+        self.manager.aggregates()
+        self.manager.edit_entry(0, "10:00", "11:30")
+        self.manager.remove_entry(1)
+        self.manager.add_entry(WorkEntry("2024-02-01", "07:00", "08:00"))
+        expected = Aggregates(self.manager.entries)
+        self.assertEqual(self.manager.aggregates().to_dict(),
+                         expected.to_dict())
+
+    def test_persisted_with_snapshot(self):
+        self.manager.aggregates()
+        self.manager.save()
+        lazy = DataManager(self.test_file, journal=True, lazy=True)
+        self.assertEqual(lazy.aggregates().total_minutes(), 660)
+        self.assertFalse(lazy.loaded)
+        self.manager.add_entry(WorkEntry("2024-02-01", "07:00", "08:00"))
+        self.manager.save()
+        self.manager.compact()
+        lazy = DataManager(self.test_file, journal=True, lazy=True)
+        self.assertEqual(lazy.aggregates().total_minutes(), 720)
+        self.assertFalse(lazy.loaded)
+
+    def test_unsaved_changes_skip_sidecar(self):
+        self.manager.aggregates()
+        self.manager.save()
+        self.assertTrue(os.path.exists(self.manager.aggregates_path))
+        for change in ("add", "edit", "remove", "replace"):
+            manager = DataManager(self.test_file, journal=True, lazy=True)
+            if change == "add":
+                manager.add_entry(WorkEntry("2024-02-01", "08:00", "12:00"))
+            elif change == "edit":
+                manager.edit_by_id(1, "08:00", "09:00")
+            elif change == "remove":
+                manager.remove_by_id(2)
+            else:
+                manager.entries = manager.entries[:1]
+            expected = Aggregates(manager.entries).to_dict()
+            self.assertEqual(manager.aggregates().to_dict(), expected,
+                             change)
+            self.assertEqual(manager.rollup().to_dict()["total"]["count"],
+                             expected["count"], change)
+
+    def test_lazy_totals_follow_other_process(self):
+        self.manager.aggregates()
+        self.manager.save()
+        for refresh in (False, True):
+            lazy = DataManager(self.test_file, journal=True, lazy=True)
+            total = lazy.aggregates().total_minutes()
+            lazy.rollup()
+            other = DataManager(self.test_file, journal=True)
+            other.add_entry(WorkEntry(f"2024-03-0{refresh + 1}", "08:00",
+                                      "12:00"))
+            other.save()
+            if refresh:
+                self.assertTrue(lazy.refresh())
+                self.assertEqual(lazy.aggregates().total_minutes(),
+                                 total + 240)
+            lazy.add_entry(WorkEntry(f"2024-04-0{refresh + 1}", "08:00",
+                                     "09:00"))
+            self.assertEqual(lazy.aggregates().total_minutes(), total + 300)
+            self.assertEqual(lazy.rollup().to_dict()["total"]["hours"],
+                             (total + 300) / 60)
+            lazy.compact()
+            fresh = DataManager(self.test_file, journal=True, lazy=True)
+            self.assertEqual(fresh.aggregates().total_minutes(), total + 300)
+
+
+# Testy statystyk (Python i NumPy)
+class TestAnalytics(unittest.TestCase):
+    def setUp(self):
+        self.entries = [
+            WorkEntry("2024-01-01", "08:00", "18:00"),  # poniedziałek
+            WorkEntry("2024-01-01", "19:00", "20:00"),
+            WorkEntry("2024-01-06", "09:00", "13:00"),  # sobota
+            WorkEntry("2024-02-01", "08:00", "14:00"),
+            WorkEntry("zła data", "08:00", "09:00"),
+        ]
+
+    def test_python_stats(self):
+        stats = analytics.python_stats(self.entries, percentiles=(50,))
+        self.assertEqual(stats["total"], 22.0)
+        self.assertEqual(stats["count"], 5)
+        self.assertEqual(stats["monthly"], {"2024-01": 15.0, "2024-02": 6.0})
+        self.assertEqual(stats["overtime"], 3.0)
+        self.assertEqual(stats["percentiles"], {50: 4.0})
+        self.assertEqual(stats["weekday"]["pon"], 11.0)
+        self.assertEqual(stats["weekday"]["sob"], 4.0)
+
+    @unittest.skipUnless(optional_import("numpy"),
+                         "NumPy nie jest zainstalowany")
+    def test_numpy_matches_python(self):
+        expected = analytics.python_stats(self.entries)
+        self.assertEqual(analytics.numpy_stats(self.entries), expected)
+        store = EntryStore(self.entries[:-1])
+        result = analytics.numpy_stats(store)
+        self.assertEqual(result["daily"], expected["daily"])
+        self.assertEqual(result["weekday"], expected["weekday"])
+
+
+# Testy sumowania blokowego (zastępuje rekurencję po wpisach)
+class TestSummation(unittest.TestCase):
+    def test_small_input(self):
+        entries = [WorkEntry("2024-01-01", "08:00", "16:00"),
+                   WorkEntry("2024-01-02", "09:00", "12:30"),
+                   WorkEntry("2024-01-03", "xx", "12:30")]
+        self.assertEqual(total_hours(entries), 11.5)
+        self.assertEqual(total_hours([]), 0)
+
+    def test_large_input_without_recursion_error(self):
+        entries = [WorkEntry("2024-01-01", "08:00", "08:07")] * 60000
+        self.assertEqual(total_hours(entries, chunk_size=7), 7000.0)
+        self.assertEqual(total_hours(iter(entries)), 7000.0)
+
+    def test_process_pool(self):
+        entries = [WorkEntry("2024-01-01", "08:00", "09:15")] * 1000
+        self.assertEqual(total_hours(entries, chunk_size=100, workers=2),
+                         1250.0)
+
+    def test_tree_sum(self):
+        self.assertEqual(tree_sum(list(range(1001))), 500500)
+
+    def test_bounded_map_limits_pending_blocks(self):
+        from concurrent.futures import ThreadPoolExecutor
+        taken = []
+
+        def blocks():
+            for i in range(100):
+                taken.append(i)
+                yield i
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = bounded_map(pool, lambda x: x * 2, blocks(), 4)
+            self.assertEqual(next(results), 0)
+            # Po pierwszym wyniku pobrano tylko tyle bloków, ile mieści okno
+            self.assertEqual(len(taken), 4)
+            self.assertEqual(sum(results), 9900)
+
+
+# Testy importu CSV
+class TestImporter(unittest.TestCase):
+    def setUp(self):
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        self.csv_file = os.path.join(base_dir, "data", "test_import.csv")
+        with open(self.csv_file, "w", encoding="utf-8") as f:
+            f.write("date,start,end,project\n"
+                    "2024-06-01,08:00,16:00,ProjektA\n"
+                    "2024-06-31,08:00,16:00,ProjektA\n"
+                    "2024-06-02,09:00,17:00,\n"
+                    "2024-06-03,25:00,17:00,ProjektB\n"
+                    "2024-06-04,09:00\n")
+
+    def tearDown(self):
+        os.remove(self.csv_file)
+
+    def test_import(self):
+        manager = DataManager(":memory:")
+        count, rejected = import_csv(manager, self.csv_file, batch_size=2)
+        self.assertEqual(count, 2)
+        self.assertEqual([line for line, _ in rejected], [3, 5, 6])
+        self.assertIsInstance(manager.entries[0], ProjectWorkEntry)
+        self.assertEqual(manager.entries[0].project, "ProjektA")
+        self.assertNotIsInstance(manager.entries[1], ProjectWorkEntry)
+
+    def test_import_with_process_pool(self):
+        manager = DataManager(":memory:")
+        count, rejected = import_csv(manager, self.csv_file,
+                                     batch_size=1, workers=2)
+        self.assertEqual(count, 2)
+        self.assertEqual(len(rejected), 3)
+
+    def test_missing_column(self):
+        with open(self.csv_file, "w", encoding="utf-8") as f:
+            f.write("date,start\n2024-06-01,08:00\n")
+        with self.assertRaises(ValueError):
+            import_csv(DataManager(":memory:"), self.csv_file)
+
+
+# Testy eksportu CSV
+class TestExporter(unittest.TestCase):
+    def setUp(self):
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        self.csv_file = os.path.join(base_dir, "data", "test_export.csv")
+        self.entries = [
+            WorkEntry("2024-06-01", "08:00", "16:00"),
+            ProjectWorkEntry("2024-06-02", "09:00", "12:30", "ProjektA"),
+        ]
+
+    def tearDown(self):
+        for path in (self.csv_file, self.csv_file + ".gz"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_export_all_columns(self):
+        count, _ = export_csv(iter(self.entries), self.csv_file,
+                              buffer_size=10)
+        self.assertEqual(count, 2)
+        with open(self.csv_file, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        # Wpisy spoza DataManagera nie mają id (pusta kolumna)
+        self.assertEqual(lines, ["id,date,start,end,duration,project",
+                                 ",2024-06-01,08:00,16:00,8.00,",
+                                 ",2024-06-02,09:00,12:30,3.50,ProjektA"])
+
+    def test_export_gzip_and_reimport(self):
+        path = self.csv_file + ".gz"
+        export_csv(self.entries, path, columns=("project", "date"))
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            self.assertEqual(f.readline().strip(), "project,date")
+        export_csv(self.entries, self.csv_file)
+        manager = DataManager(":memory:")
+        self.assertEqual(import_csv(manager, self.csv_file), (2, []))
+
+    def test_unknown_column(self):
+        with self.assertRaises(ValueError):
+            export_csv(self.entries, self.csv_file, columns=("foo",))
+
+
+# Testy magazynu SQLite
+class TestSqliteStorage(unittest.TestCase):
+    def setUp(self):
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        self.db_file = os.path.join(base_dir, "data", "test_storage.db")
+        self.json_file = os.path.join(base_dir, "data", "test_storage.json")
+        self.manager = DataManager(self.db_file)
+        self.manager.add_entries([
+            WorkEntry("2024-03-01", "08:00", "16:00"),
+            ProjectWorkEntry("2024-03-02", "09:00", "12:00", "ProjX"),
+            WorkEntry("2024-04-01", "10:00", "11:00"),
+        ])
+        self.manager.save()
+
+    def tearDown(self):
+        self.manager.storage.close()
+        for path in (self.db_file, self.db_file + "-wal",
+                     self.db_file + "-shm", self.json_file,
+                     self.json_file + ".agg", self.json_file + ".lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_queries_pushed_down(self):
+        self.assertEqual(len(self.manager.find_month("2024-03")), 2)
+        self.assertEqual(self.manager.find_by_date("2024-03-02")[0].project,
+                         "ProjX")
+        self.assertEqual(len(self.manager.filter_min_hours(3)), 2)
+        self.assertEqual(self.manager.aggregates().to_dict(),
+                         Aggregates(self.manager.iter_entries()).to_dict())
+        self.assertFalse(self.manager.loaded)
+
+    def test_changes_and_reload(self):
+        self.manager.edit_entry(0, "08:00", "09:30")
+        removed = self.manager.remove_entry(1)
+        self.assertEqual(removed.project, "ProjX")
+        self.manager.add_entry(WorkEntry("2024-05-01", "07:00", "08:00"))
+        self.manager.save()
+        self.manager.storage.close()
+        self.manager = DataManager(self.db_file)
+        hours = [e.duration() for e in self.manager.entries]
+        self.assertEqual(hours, [1.5, 1.0, 1.0])
+
+    def test_migration(self):
+        source = DataManager(self.json_file)
+        source.entries = list(self.manager.iter_entries())
+        source.save()
+        self.manager.storage.close()
+        os.remove(self.db_file)
+        self.assertEqual(migrate_json_to_sqlite(self.json_file,
+                                                self.db_file), 3)
+        self.manager = DataManager(self.db_file)
+        self.assertEqual(len(self.manager.find_range("2024-01-01",
+                                                     "2024-12-31")), 3)
+
+    def test_incomplete_backend_fails_on_creation(self):
+        class PartialStorage(Storage):
+            def iter_entries(self):
+                return iter([])
+        with self.assertRaises(TypeError):
+            PartialStorage()
+
+
+# Testy przygotowania danych do wykresów
+class TestCharts(unittest.TestCase):
+    def setUp(self):
+        self.daily = {f"2024-{m:02d}-{d:02d}": 8.0
+                      for m in range(1, 13) for d in range(1, 29)}
+
+    def test_granularity(self):
+        self.assertEqual(charts.choose_granularity(self.daily, 400), "day")
+        self.assertEqual(charts.choose_granularity(self.daily, 60), "week")
+        self.assertEqual(charts.choose_granularity(self.daily, 12), "month")
+
+    def test_downsample_keeps_total(self):
+        for granularity in charts.GRANULARITIES:
+            series = charts.downsample(self.daily, granularity)
+            self.assertEqual(sum(series.values()), 8.0 * 12 * 28)
+        job = charts.chart_job(self.daily, "x.png", "Test", max_points=12)
+        self.assertEqual(job["keys"][0], "2024-01")
+        self.assertEqual(len(job["hours"]), 12)
+
+    def test_group_daily(self):
+        entries = [ProjectWorkEntry("2024-01-01", "08:00", "10:00", "A/B"),
+                   WorkEntry("2024-01-01", "10:00", "11:00"),
+                   ProjectWorkEntry("2024-02-01", "08:00", "09:00", "A/B")]
+        groups = charts.group_daily(entries, "project")
+        self.assertEqual(dict(groups["A/B"]),
+                         {"2024-01-01": 2.0, "2024-02-01": 1.0})
+        self.assertIn("bez_projektu", groups)
+        self.assertEqual(sorted(charts.group_daily(entries, "month")),
+                         ["2024-01", "2024-02"])
+        self.assertEqual(safe_name("A/B"), "A_B")
+
+
+# Testy nieinteraktywnego interfejsu (cli.py)
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        self.test_file = os.path.join(base_dir, "data", "test_cli.json")
+        self.batch_file = os.path.join(base_dir, "data", "test_cli.jsonl")
+        with open(self.batch_file, "w", encoding="utf-8") as f:
+            f.write('{"date": "2024-01-01", "start": "08:00", '
+                    '"end": "16:00", "project": "A"}\n'
+                    '{"date": "2024-01-02", "start": "9", "end": "17:00"}\n'
+                    '{"date": "2024-01-03", "start": "09:00", '
+                    '"end": "10:30"}\n')
+
+    def tearDown(self):
+        for path in (self.test_file, self.test_file + ".journal",
+                     self.test_file + ".agg", self.test_file + ".lock",
+                     self.batch_file):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def run_cli(self, *argv):
+        out = io.StringIO()
+        code = cli.run(["--data", self.test_file, *argv], out=out)
+        return code, json.loads(out.getvalue())
+
+    def test_add_batch_and_queries(self):
+        code, result = self.run_cli("add", "--batch", self.batch_file)
+        self.assertEqual(code, 0)
+        self.assertEqual(result["added"], 2)
+        self.assertEqual(result["rejected"][0]["line"], 2)
+        self.assertEqual(self.run_cli("sum")[1], {"total_hours": 9.5})
+        _, result = self.run_cli("filter", "--min-hours", "2")
+        self.assertEqual(result["entries"][0]["project"], "A")
+        _, result = self.run_cli("report", "--period", "year")
+        self.assertEqual(result["rows"], {"": {"2024": 1.5},
+                                          "A": {"2024": 8.0}})
+        _, result = self.run_cli("analyze", "--from", "2024-01-02")
+        self.assertEqual(result["total"], 1.5)
+        # Wpis nachodzący na istniejący jest odrzucany, audyt jest pusty
+        _, result = self.run_cli("add", "2024-01-01", "15:00", "18:00")
+        self.assertEqual((result["added"], len(result["rejected"])), (0, 1))
+        self.assertEqual(self.run_cli("audit")[1]["count"], 0)
+        _, result = self.run_cli("payroll", "--period", "week",
+                                 "--norm", "1")
+        self.assertEqual(result["periods"]["2024-W01"]["overtime"], 7.5)
+
+    def test_add_batch_reports_bad_json(self):
+        with open(self.batch_file, "a", encoding="utf-8") as f:
+            f.write('{"date": "2024-01-04", "start": \n[1, 2]\n')
+        _, result = self.run_cli("add", "--batch", self.batch_file)
+        self.assertEqual(result["added"], 2)
+        self.assertEqual(result["rejected"][1:], [
+            {"line": 4, "reason": "niepoprawny JSON"},
+            {"line": 5, "reason": "oczekiwano obiektu JSON"}])
+
+    def test_edit_and_remove_by_id(self):
+        _, result = self.run_cli("add", "--batch", self.batch_file)
+        self.assertEqual(result["ids"], [1, 2])
+        _, result = self.run_cli("edit", "2", "09:00", "12:00")
+        self.assertEqual(result["edited"]["end"], "12:00")
+        self.assertEqual(self.run_cli("remove", "1")[1]["removed"]["id"], 1)
+        self.assertEqual(self.run_cli("sum")[1], {"total_hours": 3.0})
+        self.assertEqual(self.run_cli("remove", "1")[0], 1)
+
+    def test_error_is_reported_as_json(self):
+        code, result = self.run_cli("add", "2024-01-01")
+        self.assertEqual(code, 1)
+        self.assertIn("error", result)
+
+
+# Testy serwera HTTP API
+class TestApiServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        self.test_file = os.path.join(base_dir, "data", "test_api.json")
+        self.server = ApiServer(DataManager(self.test_file, journal=True))
+        host, port = await self.server.start("127.0.0.1", 0)
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        await self.server.close()
+        for path in (self.test_file, self.test_file + ".journal",
+                     self.test_file + ".agg", self.test_file + ".lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def call(self, method, path, body=None):
+        return await bench_api.request(self.reader, self.writer, method,
+                                       path, body)
+
+    async def test_crud_and_search(self):
+        status, result = await self.call("POST", "/entries", [
+            {"date": "2024-01-01", "start": "08:00", "end": "16:00"},
+            {"date": "2024-01-02", "start": "09:00", "end": "12:00"}])
+        self.assertEqual((status, result["ids"]), (201, [1, 2]))
+        status, result = await self.call("PUT", "/entries/2",
+                                         {"start": "09:00", "end": "10:00"})
+        self.assertEqual(result["end"], "10:00")
+        status, result = await self.call("GET", "/entries?date=2024-01-02")
+        self.assertEqual(result["entries"][0]["id"], 2)
+        status, result = await self.call("GET", "/analyze")
+        self.assertEqual(result["total"], 9.0)
+        status, _ = await self.call("DELETE", "/entries/1")
+        self.assertEqual(status, 200)
+        self.assertEqual(len(DataManager(self.test_file,
+                                         journal=True).entries), 1)
+
+    async def test_errors(self):
+        status, result = await self.call("POST", "/entries",
+                                         {"date": "2024-13-01",
+                                          "start": "08:00", "end": "9:00"})
+        self.assertEqual(status, 422)
+        self.assertEqual(len(result["details"]), 1)
+        self.assertEqual((await self.call("DELETE", "/entries/5"))[0], 404)
+        self.assertEqual((await self.call("GET", "/nope"))[0], 404)
+
+    async def test_unexpected_error_keeps_writer(self):
+        from unittest import mock
+        import threading
+        manager = self.server.data_manager
+        save, threads = manager.save, []
+
+        def tracked_save():
+            threads.append(threading.current_thread())
+            save()
+        await self.call("POST", "/entries", {"date": "2024-01-01",
+                                             "start": "08:00",
+                                             "end": "10:00"})
+        with mock.patch.object(manager, "edit_by_id",
+                               side_effect=RuntimeError("awaria")):
+            status, result = await self.call("PUT", "/entries/1",
+                                             {"start": "09:00",
+                                              "end": "10:00"})
+        self.assertEqual(status, 500)
+        self.assertIn("awaria", result["error"])
+        with mock.patch.object(manager, "refresh",
+                               side_effect=OSError("dysk")):
+            status, _ = await self.call("DELETE", "/entries/1")
+        self.assertEqual(status, 500)
+        # Zadanie zapisujące działa dalej, a save() biegnie poza pętlą
+        with mock.patch.object(manager, "save", tracked_save):
+            status, result = await self.call("PUT", "/entries/1",
+                                             {"start": "08:00",
+                                              "end": "09:00"})
+        self.assertEqual((status, result["end"]), (200, "09:00"))
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+
+    async def test_reads_do_not_wait_for_save(self):
+        from unittest import mock
+        import threading
+        manager = self.server.data_manager
+        save, release = manager.save, threading.Event()
+
+        def slow_save():
+            release.wait(5)
+            save()
+        await self.call("POST", "/entries", {"date": "2024-01-01",
+                                             "start": "08:00",
+                                             "end": "10:00"})
+        with mock.patch.object(manager, "save", slow_save):
+            pending = asyncio.ensure_future(self.server._submit(
+                self.server._add, [WorkEntry("2024-01-02", "08:00",
+                                             "09:00")]))
+            await asyncio.sleep(0.05)
+            # Zapis trwa, a odczyty korzystają z poprzedniego widoku
+            _, result = await asyncio.wait_for(
+                self.call("GET", "/entries"), 1)
+            self.assertEqual(result["count"], 1)
+            status, _ = await self.call("GET", "/analyze?detailed=1")
+            self.assertEqual(status, 200)
+            release.set()
+            self.assertEqual((await pending)["ids"], [2])
+        _, result = await self.call("GET", "/entries")
+        self.assertEqual(result["count"], 2)
+
+    async def test_snapshot_matches_full_build(self):
+        from services.api_server import ReadSnapshot
+        await self.call("POST", "/entries", [
+            {"date": f"2024-01-0{day}", "start": "08:00", "end": "10:00"}
+            for day in range(1, 6)])
+        await self.call("DELETE", "/entries/2")
+        await self.call("PUT", "/entries/3", {"start": "07:00",
+                                              "end": "08:00"})
+        await self.call("POST", "/entries", {"date": "2024-01-01",
+                                             "start": "12:00",
+                                             "end": "13:00"})
+        await self.call("DELETE", "/entries/5")
+        snapshot = self.server.snapshot
+        full = ReadSnapshot.build(self.server.data_manager)
+        self.assertEqual([e.to_dict() for e in snapshot.by_id.values()],
+                         [e.to_dict() for e in full.by_id.values()])
+        self.assertEqual(snapshot.days, full.days)
+        self.assertEqual(snapshot.summary, full.summary)
+        _, result = await self.call("GET", "/entries?from=2024-01-01&"
+                                           "to=2024-01-03")
+        self.assertEqual([e["id"] for e in result["entries"]], [1, 6, 3])
+        self.assertEqual((await self.call("GET", "/entries/2"))[0], 404)
+        _, result = await self.call("GET", "/entries/3")
+        self.assertEqual(result["start"], "07:00")
+
 
 # Testy klasy dziedziczącej ProjectWorkEntry
 class TestProjectWorkEntry(unittest.TestCase):
@@ -103,6 +1311,122 @@ class TestProjectWorkEntry(unittest.TestCase):
         self.assertEqual(str(entry2), str(entry))
 
 
+# Testy raportów projekt × okres
+class TestReports(unittest.TestCase):
+    def setUp(self):
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        self.test_file = os.path.join(base_dir, "data", "test_report.json")
+        self.entries = [
+            ProjectWorkEntry("2024-01-05", "08:00", "12:00", "A"),
+            ProjectWorkEntry("2024-02-05", "08:00", "10:00", "A"),
+            ProjectWorkEntry("2024-04-01", "08:00", "09:00", "B"),
+            WorkEntry("2024-04-02", "08:00", "16:00"),
+        ]
+
+    def tearDown(self):
+        for suffix in ("", ".journal", ".agg", ".lock"):
+            if os.path.exists(self.test_file + suffix):
+                os.remove(self.test_file + suffix)
+
+    def test_projects_survive_reload(self):
+        for journal in (False, True):
+            manager = DataManager(self.test_file, journal=journal)
+            manager.add_entries(self.entries[:2])
+            manager.save()
+            loaded = DataManager(self.test_file).entries
+            self.assertEqual([e.project for e in loaded], ["A", "A"])
+            self.tearDown()
+
+    def test_pivot_metrics(self):
+        report = pivot(self.entries, "quarter")
+        self.assertEqual(report.projects, ["", "A", "B"])
+        self.assertEqual(report.value("A", "2024-Q1"), 6.0)
+        self.assertEqual(report.value("A", "2024-Q1", "count"), 2)
+        self.assertEqual(report.value("A", "2024-Q1", "average"), 3.0)
+        self.assertEqual(report.value("B", "2024-Q1"), 0)
+        self.assertEqual(report.totals(axis="period"),
+                         {"2024-Q1": 6.0, "2024-Q2": 9.0})
+
+    def test_sources_agree(self):
+        expected = pivot(self.entries, "month").to_dict()
+        self.assertEqual(pivot(EntryStore(self.entries)).to_dict(), expected)
+        agg = Aggregates(self.entries)
+        self.assertEqual(pivot_from_aggregates(agg).to_dict(), expected)
+
+    def test_sources_agree_on_invalid_entries(self):
+        entries = self.entries + [
+            ProjectWorkEntry("2024-01-06", "xx:yy", "12:00", "A"),
+            WorkEntry("2024-13-01", "08:00", "09:00"),
+        ]
+        expected = pivot(entries).to_dict("count")
+        self.assertEqual(expected["rows"]["A"], {"2024-01": 2,
+                                                 "2024-02": 1})
+        self.assertEqual(pivot(EntryStore(entries)).to_dict("count"),
+                         expected)
+        agg = Aggregates(entries)
+        self.assertEqual(pivot_from_aggregates(agg).to_dict("count"),
+                         expected)
+        self.assertEqual(pivot(entries).value("A", "2024-01"), 4.0)
+        manager = DataManager(":memory:")
+        manager.add_entries(self.entries)
+        self.assertEqual(manager.project_report("week").to_dict(),
+                         pivot(self.entries, "week").to_dict())
+
+
+# Testy podsumowań okresów (rollup) i nadgodzin
+class TestRollups(unittest.TestCase):
+    def setUp(self):
+        self.entries = [
+            WorkEntry("2024-01-01", "08:00", "18:00"),
+            WorkEntry("2024-01-01", "19:00", "20:00"),
+            ProjectWorkEntry("2024-01-15", "08:00", "12:00", "A"),
+            WorkEntry("2024-03-31", "08:00", "17:00"),
+            WorkEntry("2024-04-01", "08:00", "16:00"),
+            WorkEntry("2025-02-10", "22:00", "08:00"),
+        ]
+        self.rollup = Rollup.from_entries(self.entries, norm=8.0)
+
+    def test_levels_and_overtime(self):
+        levels = self.rollup.levels
+        self.assertEqual(levels["day"]["2024-01-01"], [660, 2, 180, 1])
+        self.assertEqual(levels["week"]["2024-W01"][0], 660)
+        self.assertEqual(levels["biweek"]["2024-01-15"][1], 1)
+        self.assertEqual(levels["month"]["2024-01"], [900, 3, 180, 2])
+        self.assertEqual(levels["quarter"]["2024-Q1"], [1440, 4, 240, 3])
+        self.assertEqual(levels["year"]["2025"], [600, 1, 120, 1])
+        self.assertEqual(self.rollup.children("year", "2024"),
+                         ["2024-Q1", "2024-Q2"])
+        self.assertEqual(self.rollup.to_dict("year")["total"]["overtime"],
+                         6.0)
+
+    def test_query_matches_scan(self):
+        rng = random.Random(3)
+        for _ in range(200):
+            first = rng.randrange(738880, 739400)
+            last = first + rng.randrange(200)
+            start = ordinal_to_str(first)
+            end = ordinal_to_str(last)
+            selected = [e for e in self.entries if start <= e.date <= end]
+            result = self.rollup.query(start, end)
+            self.assertEqual(result["count"], len(selected))
+            self.assertAlmostEqual(result["hours"],
+                                   sum(e.duration() for e in selected))
+        table = self.rollup.table("month", "2024-01-10", "2024-03-31")
+        self.assertEqual(table["2024-01"]["hours"], 4.0)
+        self.assertEqual(list(table), ["2024-01", "2024-03"])
+
+    def test_cached_per_version(self):
+        manager = DataManager(":memory:")
+        manager.add_entries(self.entries)
+        rollup = manager.rollup()
+        self.assertIs(manager.rollup(), rollup)
+        self.assertEqual(rollup.levels, self.rollup.levels)
+        manager.remove_by_id(1)
+        self.assertEqual(manager.rollup().levels["day"]["2024-01-01"],
+                         [60, 1, 0, 1])
+        self.assertEqual(manager.rollup(10.0).norm, 10.0)
+
+
 # Test funkcjonalny (dodanie i usunięcie wpisu)
 class TestFunctional(unittest.TestCase):
     def test_add_and_remove_entry(self):
@@ -132,8 +1456,107 @@ class TestFunctional(unittest.TestCase):
         self.assertEqual(manager2.entries[0].date, "2024-01-01")
 
         # Clean up
-        if os.path.exists(test_file):
-            os.remove(test_file)
+        for path in (test_file, test_file + ".agg", test_file + ".lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+# Testy kolumnowego magazynu wpisów
+class TestEntryStore(unittest.TestCase):
+    def setUp(self):
+        self.store = EntryStore([
+            WorkEntry("2024-01-01", "08:00", "16:00"),
+            ProjectWorkEntry("2024-01-02", "09:00", "13:30", "ProjX"),
+            WorkEntry("2024-02-01", "10:00", "12:00"),
+        ])
+
+    def test_views(self):
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(str(self.store[0]),
+                         "2024-01-01: 08:00 - 16:00 (8.00h)")
+        self.assertEqual(self.store[1].project, "ProjX")
+        self.assertEqual(self.store[-1].date, "2024-02-01")
+
+    def test_aggregates(self):
+        self.assertEqual(self.store.total_minutes(), 870)
+        self.assertEqual(self.store.monthly_hours(),
+                         {"2024-01": 12.5, "2024-02": 2.0})
+        self.assertEqual(list(self.store.durations()), [8.0, 4.5, 2.0])
+
+    def test_edit_and_remove(self):
+        entry = self.store[0]
+        entry.end = "12:00"
+        self.store[0] = entry
+        self.assertEqual(self.store[0].duration(), 4.0)
+        removed = self.store.pop(1)
+        self.assertEqual(removed.project, "ProjX")
+        self.assertEqual(len(self.store), 2)
+
+    def test_invalid_entry(self):
+        self.store.append(WorkEntry("2024-01-01", "xx:yy", "16:00"))
+        self.store.append(WorkEntry("2024-13-01", "08:00", "09:00"))
+        self.assertEqual(self.store[3].start, "xx:yy")
+        self.assertIsNone(self.store[3].minutes())
+        self.assertEqual(self.store[4].date, "2024-13-01")
+        self.assertEqual(self.store.total_minutes(), 930)
+        self.assertEqual(self.store.monthly_hours(),
+                         {"2024-01": 12.5, "2024-02": 2.0})
+
+
+# Testy generatora danych i zestawu benchmarków
+class TestBenchmarkSuite(unittest.TestCase):
+    def setUp(self):
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        self.json_file = os.path.join(base_dir, "data", "test_gen.json")
+        self.csv_file = os.path.join(base_dir, "data", "test_gen.csv")
+
+    def tearDown(self):
+        for path in (self.json_file, self.json_file + ".agg",
+                     self.json_file + ".lock", self.csv_file):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_generator_is_reproducible(self):
+        first = [e.to_dict() for e in generator.generate_entries(50, seed=7)]
+        again = [e.to_dict() for e in generator.generate_entries(50, seed=7)]
+        self.assertEqual(first, again)
+        self.assertEqual([d["id"] for d in first], list(range(1, 51)))
+        self.assertEqual(len({d["date"] for d in first}), 7)
+
+    def test_overlap_rate(self):
+        manager = DataManager(self.json_file)
+        clean = list(generator.generate_entries(2000, days=100))
+        self.assertEqual(manager.partition_overlaps(clean)[1], [])
+        mixed = list(generator.generate_entries(2000, days=100,
+                                                overlap=0.2))
+        rejected = len(manager.partition_overlaps(mixed)[1])
+        self.assertTrue(300 < rejected < 500)
+        with self.assertRaises(ValueError):
+            list(generator.generate_entries(100, days=1))
+
+    def test_written_files_load(self):
+        generator.write_json(generator.generate_entries(30, projects=2),
+                             self.json_file)
+        generator.write_csv(generator.generate_entries(30, projects=2),
+                            self.csv_file)
+        manager = DataManager(self.json_file)
+        self.assertEqual([e.id for e in manager.entries], list(range(1, 31)))
+        imported = DataManager(self.json_file + ".new")
+        count, rejected = import_csv(imported, self.csv_file)
+        self.assertEqual((count, rejected), (30, []))
+        self.assertEqual([e.to_dict() for e in imported.entries],
+                         [e.to_dict() for e in manager.entries])
+
+    def test_compare_finds_regressions(self):
+        baseline = {"results": [
+            {"scenario": "data.load", "entries": 1000, "best": 0.5},
+            {"scenario": "recursive_sum", "entries": 1000, "best": 0.0001}]}
+        results = [
+            {"scenario": "data.load", "entries": 1000, "best": 0.7},
+            {"scenario": "recursive_sum", "entries": 1000, "best": 0.001}]
+        slower = bench_suite.compare(results, baseline, tolerance=0.2)
+        self.assertEqual([(s, n) for s, n, _ in slower],
+                         [("data.load", 1000)])
 
 
 # Test wydajnościowy (timeit)
@@ -143,6 +1566,15 @@ class TestPerformance(unittest.TestCase):
         duration = timeit.timeit(lambda: entry.duration(), number=10000)
         self.assertLess(duration, 1)  # powinno być szybkie
 
+    def test_startup_skips_plotting(self):
+        import subprocess
+        import sys
+        code = ("import sys, main; print(sorted({'numpy', 'matplotlib', "
+                "'sqlite3'} & {m.split('.')[0] for m in sys.modules}))")
+        result = subprocess.run([sys.executable, "-c", code],
+                                capture_output=True, text=True)
+        self.assertEqual(result.stdout.strip(), "[]")
+
     # Test pamięci i jakości kodu – tylko szkielet (do uruchomienia z zewnątrz)
     def test_memory_usage(self):
         from memory_profiler import memory_usage
@@ -0,0 +1,179 @@
+# utils/instrumentation.py
+"""Pomiary wydajności: liczba wywołań, czas rzeczywisty i CPU, liczba
+przetworzonych wpisów.
+
+Pomiary są domyślnie wyłączone - udekorowana funkcja sprawdza wtedy
+tylko jedną flagę. Po włączeniu (enable() lub zmienna środowiskowa
+WORKTIME_TRACE=plik) każde wywołanie trafia do podsumowania w pamięci
+(summary(), format_summary()) i, gdy podano plik, do rotowanego logu
+JSON Lines.
+
+Przykład:
+    @instrument("data.load", entries=lambda result, args: len(result))
+    def load(self): ...
+
+    with span("import.batch") as record:
+        record.entries = len(batch)
+"""
+from contextlib import contextmanager
+import functools
+import json
+import os
+import time
+
+ENV_VAR = "WORKTIME_TRACE"
+DEFAULT_LOG = "data/trace.jsonl"
+MAX_BYTES = 5 << 20
+BACKUPS = 3
+
+
+class _State:
+    enabled = False
+    logger = None
+    handler = None
+    # nazwa operacji -> [wywołania, czas, czas CPU, wpisy, błędy]
+    stats = {}
+
+
+def enable(path=None, max_bytes=MAX_BYTES, backups=BACKUPS):
+    """Włącza pomiary; przy `path` zapisuje je też do rotowanego logu."""
+    disable()
+    if path:
+        # logging ładowany dopiero przy włączeniu (krótszy start programu)
+        import logging.handlers
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger = logging.getLogger("worktime.trace")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        _State.logger, _State.handler = logger, handler
+    _State.enabled = True
+
+
+def disable():
+    """Wyłącza pomiary i zamyka plik logu (podsumowanie zostaje)."""
+    _State.enabled = False
+    if _State.handler is not None:
+        _State.logger.removeHandler(_State.handler)
+        _State.handler.close()
+        _State.handler = None
+
+
+def enabled():
+    """Czy pomiary są włączone."""
+    return _State.enabled
+
+
+def reset():
+    """Czyści podsumowanie w pamięci."""
+    _State.stats = {}
+
+
+class Record:
+    """Pomiar jednego wywołania; `entries` ustawia mierzony kod."""
+
+    __slots__ = ("name", "entries")
+
+    def __init__(self, name):
+        self.name = name
+        self.entries = None
+
+
+def _finish(record, wall, cpu, ok):
+    stats = _State.stats.get(record.name)
+    if stats is None:
+        stats = _State.stats[record.name] = [0, 0.0, 0.0, 0, 0]
+    stats[0] += 1
+    stats[1] += wall
+    stats[2] += cpu
+    stats[3] += record.entries or 0
+    stats[4] += not ok
+    if _State.handler is not None:
+        _State.logger.info(json.dumps({
+            "ts": round(time.time(), 3), "op": record.name,
+            "wall_ms": round(wall * 1000, 3),
+            "cpu_ms": round(cpu * 1000, 3),
+            "entries": record.entries, "ok": ok}))
+
+
+@contextmanager
+def span(name):
+    """Mierzy blok with; zwraca Record (do ustawienia liczby wpisów)."""
+    record = Record(name)
+    if not _State.enabled:
+        yield record
+        return
+    wall, cpu = time.perf_counter(), time.process_time()
+    ok = False
+    try:
+        yield record
+        ok = True
+    finally:
+        _finish(record, time.perf_counter() - wall,
+                time.process_time() - cpu, ok)
+
+
+def instrument(name=None, entries=None):
+    """Dekorator mierzący wywołania funkcji.
+
+    `entries(result, args)` zwraca liczbę przetworzonych wpisów (liczona
+    tylko przy włączonych pomiarach). Domyślna nazwa to nazwa funkcji.
+    """
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _State.enabled:
+                return func(*args, **kwargs)
+            record = Record(label)
+            wall, cpu = time.perf_counter(), time.process_time()
+            ok = False
+            try:
+                result = func(*args, **kwargs)
+                ok = True
+            finally:
+                if ok and entries is not None:
+                    try:
+                        record.entries = entries(result, args)
+                    except Exception:
+                        record.entries = None
+                _finish(record, time.perf_counter() - wall,
+                        time.process_time() - cpu, ok)
+            return result
+        return wrapper
+    return decorator
+
+
+def summary():
+    """Zwraca podsumowanie: operacja -> słownik liczników i czasów."""
+    return {name: {"calls": calls, "wall_s": wall, "cpu_s": cpu,
+                   "entries": count, "errors": errors}
+            for name, (calls, wall, cpu, count, errors)
+            in _State.stats.items()}
+
+
+def format_summary():
+    """Zwraca tabelę podsumowania (operacje wg łącznego czasu)."""
+    if not _State.stats:
+        return "Brak pomiarów."
+    rows = sorted(_State.stats.items(), key=lambda item: -item[1][1])
+    width = max(len("operacja"), *(len(name) for name, _ in rows)) + 2
+    lines = ["operacja".ljust(width) + f"{'wywołania':>10}{'czas [s]':>11}"
+             f"{'CPU [s]':>10}{'śr. [ms]':>10}{'wpisy':>10}{'błędy':>7}"]
+    for name, (calls, wall, cpu, count, errors) in rows:
+        lines.append(f"{name.ljust(width)}{calls:>10}{wall:>11.3f}"
+                     f"{cpu:>10.3f}{wall / calls * 1000:>10.2f}"
+                     f"{count:>10}{errors:>7}")
+    return "\n".join(lines)
+
+
+if os.environ.get(ENV_VAR):
+    # WORKTIME_TRACE=1 - log domyślny, inna wartość - ścieżka logu
+    value = os.environ[ENV_VAR]
+    enable(DEFAULT_LOG if value == "1" else value)
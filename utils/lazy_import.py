@@ -0,0 +1,17 @@
+# utils/lazy_import.py
+import importlib
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def optional_import(name):
+    """Importuje moduł przy pierwszym użyciu.
+
+    Ciężkie zależności (NumPy, matplotlib) ładowane są dopiero wtedy,
+    gdy są potrzebne, a nie przy starcie programu. Zwraca moduł lub None,
+    gdy pakiet nie jest zainstalowany.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
@@ -0,0 +1,18 @@
+# utils/parallel.py
+from collections import deque
+
+
+def bounded_map(pool, func, items, window):
+    """Jak pool.map, ale trzyma w kolejce najwyżej `window` zadań.
+
+    pool.map pobiera od razu wszystkie elementy `items`, więc przy
+    generatorze bloków cały zbiór trafiałby naraz do pamięci; tu kolejne
+    elementy pobierane są dopiero po odebraniu wcześniejszych wyników.
+    """
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(func, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
@@ -1,30 +1,147 @@
 # utils/validators.py
-from datetime import datetime
+from datetime import date, datetime
 import functools
+from utils.instrumentation import instrument
+
+DATE_FORMAT = "%Y-%m-%d"
+TIME_FORMAT = "%H:%M"
+# Rozmiar pamięci podręcznej walidacji (daty z ok. 20 lat lub wszystkie
+# 1440 godzin HH:MM mieszczą się w całości)
+VALIDATION_CACHE = 8192
+DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
 
 
 def log_operation(func):
-    """Dekorator logujący operacje na wpisach."""
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        print(f"[LOG] Wywołano: {func.__name__}")
-        return func(*args, **kwargs)
-    return wrapper
+    """Dekorator mierzący operacje menu (operacja "menu.<nazwa>" w
+    utils.instrumentation; bez kosztu, gdy pomiary są wyłączone)."""
+    return instrument(f"menu.{func.__name__}")(func)
+
+
+# --- szybkie parsery (strptime tylko dla nietypowych postaci) ---
+
+def is_leap(year):
+    """Czy rok jest przestępny (kalendarz gregoriański)."""
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def _fast_date(date_str):
+    """Parsuje postać YYYY-MM-DD z cyframi ASCII bez strptime.
+
+    Zwraca (rok, miesiąc, dzień), False dla nieistniejącej daty albo
+    None, gdy napis ma inną postać - wtedy rozstrzyga strptime, który
+    przyjmuje też np. "2024-1-5", więc wyniki są identyczne.
+    """
+    if len(date_str) != 10 or date_str[4] != "-" or date_str[7] != "-" \
+            or not date_str.isascii():
+        return None
+    y, m, d = date_str[:4], date_str[5:7], date_str[8:]
+    if not (y.isdigit() and m.isdigit() and d.isdigit()):
+        return None
+    year, month, day = int(y), int(m), int(d)
+    if year == 0 or not 1 <= month <= 12 or day == 0:
+        return False
+    if day > DAYS_IN_MONTH[month] and not (
+            month == 2 and day == 29 and is_leap(year)):
+        return False
+    return year, month, day
+
+
+def _fast_time(time_str):
+    """Parsuje postać HH:MM z cyframi ASCII; zwraca minuty, False dla
+    błędnej godziny lub None dla innej postaci (rozstrzyga strptime)."""
+    if len(time_str) != 5 or time_str[2] != ":" or not time_str.isascii():
+        return None
+    h, m = time_str[:2], time_str[3:]
+    if not (h.isdigit() and m.isdigit()):
+        return None
+    hour, minute = int(h), int(m)
+    if hour > 23 or minute > 59:
+        return False
+    return hour * 60 + minute
+
+
+def date_to_ordinal(date_str):
+    """Zamienia datę YYYY-MM-DD na numer dnia (None gdy błędna)."""
+    if not isinstance(date_str, str):
+        return None
+    parts = _fast_date(date_str)
+    if parts is None:
+        try:
+            return datetime.strptime(date_str, DATE_FORMAT).toordinal()
+        except ValueError:
+            return None
+    return date(*parts).toordinal() if parts else None
+
+
+def time_to_minutes(time_str):
+    """Zamienia czas HH:MM na liczbę minut od północy (None gdy błędny)."""
+    if not isinstance(time_str, str):
+        return None
+    minutes = _fast_time(time_str)
+    if minutes is None:
+        try:
+            t = datetime.strptime(time_str, TIME_FORMAT)
+        except ValueError:
+            return None
+        return t.hour * 60 + t.minute
+    return None if minutes is False else minutes
+
+
+# --- walidacja (z pamięcią podręczną) ---
+
+_cached_date = functools.lru_cache(maxsize=VALIDATION_CACHE)(date_to_ordinal)
+_cached_time = functools.lru_cache(maxsize=VALIDATION_CACHE)(time_to_minutes)
 
 
 def validate_date(date_str):
     """Waliduj datę w formacie YYYY-MM-DD."""
-    try:
-        datetime.strptime(date_str, "%Y-%m-%d")
-        return True
-    except ValueError:
-        return False
+    if not isinstance(date_str, str):
+        # Ten sam TypeError co wcześniej (np. dla None)
+        datetime.strptime(date_str, DATE_FORMAT)
+    return _cached_date(date_str) is not None
 
 
 def validate_time(time_str):
     """Waliduj czas w formacie HH:MM."""
+    if not isinstance(time_str, str):
+        datetime.strptime(time_str, TIME_FORMAT)
+    return _cached_time(time_str) is not None
+
+
+# --- walidacja całych kolumn ---
+
+def _map_unique(func, column):
+    """Stosuje `func` raz do każdej różnej wartości kolumny."""
+    column = list(column)
     try:
-        datetime.strptime(time_str, "%H:%M")
-        return True
-    except ValueError:
-        return False
+        parsed = {value: func(value) for value in set(column)}
+    except TypeError:  # wartości niehaszowalne (lub nienapisy)
+        return [func(value) if isinstance(value, str) else None
+                for value in column]
+    return list(map(parsed.__getitem__, column))
+
+
+def dates_to_ordinals(column):
+    """Zamienia kolumnę dat na listę numerów dni (None dla błędnych).
+
+    Każda różna wartość sprawdzana jest raz (a parsowana tylko przy
+    braku w pamięci podręcznej), więc koszt zależy głównie od liczby
+    różnych dat, a nie wierszy.
+    """
+    return _map_unique(_cached_date, column)
+
+
+def times_to_minutes(column):
+    """Zamienia kolumnę godzin HH:MM na minuty (None dla błędnych)."""
+    return _map_unique(_cached_time, column)
+
+
+def validate_dates(column):
+    """Zwraca listę wyników validate_date dla kolumny dat (False także
+    dla wartości niebędących napisem, np. None)."""
+    return [o is not None for o in dates_to_ordinals(column)]
+
+
+def validate_times(column):
+    """Zwraca listę wyników validate_time dla kolumny godzin."""
+    return [m is not None for m in times_to_minutes(column)]